@@ -0,0 +1,22 @@
+'''
+Heads
+
+Produces the `head`, `nhead`, `obj_prep`, and `sem_set`
+features for the BHSA. Each module in this package is
+one stage of the production line that was formerly run
+by hand in generate_phrase_heads.ipynb:
+
+    • iphrase_atom - independent phrase atoms
+    • quantifiers - custom quantifier sets
+    • prepositions - custom preposition sets
+    • dwords - dependent words missed by BHSA subphrases
+    • wordflags - words flagged by the checks the templates repeat
+    • phrase_heads - per-type head queries
+    • obj_prep - objects of prepositions
+    • nhead - nominal heads
+    • export - writing the TF features
+
+The stages are run in order by `heads.pipeline.Build`.
+'''
+
+from heads.pipeline import Build, STAGES
@@ -0,0 +1,229 @@
+'''
+A binary distribution of the heads features.
+
+Parsing the `.tf` files takes most of the start up time of a
+process that only needs the heads features. The features can also
+be stored as flat arrays in the `arrays` folder next to the `.tf`
+files, which are memory mapped when loaded, so nothing is parsed:
+
+    • every edge feature as `Edges` arrays in both directions,
+      `<feature>.offsets.npy` and `<feature>.targets.npy` from the
+      node to its targets, and `<feature>.inv.offsets.npy` and
+      `<feature>.inv.targets.npy` back from the targets
+    • `sem_set.codes.npy`, a code per node, whose values are
+      listed in `heads.json`, with code 0 for no value
+
+The arrays are `.npy` files, so they can be loaded with
+`numpy.load(path, mmap_mode='r')` as well, but NumPy is not
+needed to write or read them.
+'''
+
+import os
+import ast
+import sys
+import json
+import mmap
+import array
+import struct
+from types import SimpleNamespace
+
+from heads import export
+from heads.edges import Edges, NODE_TYPE
+
+# the version of the layout of the arrays folder
+FORMAT = 1
+
+# the .npy dtypes of the array typecodes
+DTYPES = {'I': '<u4', 'H': '<u2', 'B': '|u1'}
+
+EDGE_FEATURES = ('head', 'nhead', 'obj_prep')
+
+def write_array(path, values):
+    '''
+    Writes an array as a .npy file.
+    '''
+    header = f"{{'descr': '{DTYPES[values.typecode]}', 'fortran_order': False, 'shape': ({len(values)},), }}"
+    # the data start is aligned to 64 bytes, as NumPy does
+    header += ' ' * (63 - (10 + len(header)) % 64) + '\n'
+    with open(path, 'wb') as outfile:
+        outfile.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+        if sys.byteorder == 'big' and values.itemsize > 1:
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        values.tofile(outfile)
+
+def read_array(path):
+    '''
+    Memory maps a .npy file written by write_array,
+    and returns it as a memoryview of its items.
+    '''
+    with open(path, 'rb') as infile:
+        data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    header_length, = struct.unpack('<H', data[8:10])
+    header = ast.literal_eval(data[10:10+header_length].decode('latin1'))
+    typecode = {dtype: code for code, dtype in DTYPES.items()}[header['descr']]
+    values = memoryview(data)[10+header_length:]
+    if sys.byteorder == 'big' and typecode != 'B':
+        values = array.array(typecode, values)
+        values.byteswap()
+        return values
+    return values.cast(typecode)
+
+class EdgeArrays:
+    '''
+    An edge feature with TF's E.feature.f/t lookups.
+    '''
+
+    def __init__(self, forward, inverse):
+        self.forward = forward
+        self.inverse = inverse
+
+    def f(self, node):
+        return self.forward.f(node)
+
+    def t(self, node):
+        return self.inverse.f(node)
+
+class NodeArrays:
+    '''
+    A node feature with TF's F.feature.v/s lookups.
+    '''
+
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = values
+
+    def v(self, node):
+        if not 0 < node < len(self.codes):
+            return None
+        return self.values[self.codes[node]]
+
+    def s(self, value):
+        code = self.values.index(value) if value in self.values[1:] else None
+        if code is None:
+            return ()
+        return tuple(node for node, node_code in enumerate(self.codes) if node_code == code)
+
+class Features:
+    '''
+    Loaded heads features, with their
+    edge features under E and node features under F.
+    '''
+
+    def __init__(self, manifest, edges, nodes):
+        self.manifest = manifest
+        self.version = manifest['version']
+        self.max_node = manifest['max_node']
+        self.E = SimpleNamespace(**edges)
+        self.F = SimpleNamespace(**nodes)
+
+def write(directory, version, edges, sem_set, max_node):
+    '''
+    Writes the arrays of the features to directory.
+
+    edges - dict of edge features to their Edges
+    sem_set - (node, value) pairs
+    '''
+    os.makedirs(directory, exist_ok=True)
+    for feature, forward in edges.items():
+        for direction, feature_edges in (('', forward), ('.inv', forward.inverse())):
+            write_array(os.path.join(directory, f'{feature}{direction}.offsets.npy'), feature_edges.offsets)
+            write_array(os.path.join(directory, f'{feature}{direction}.targets.npy'), feature_edges.targets)
+
+    values = [None]
+    codes = array.array('B', bytes(max_node + 1))
+    for node, value in sem_set:
+        if value not in values:
+            values.append(value)
+        codes[node] = values.index(value)
+    write_array(os.path.join(directory, 'sem_set.codes.npy'), codes)
+
+    manifest = {'format': FORMAT,
+                'version': version,
+                'max_node': max_node,
+                'edges': sorted(edges),
+                'nodes': {'sem_set': values}}
+    with open(os.path.join(directory, 'heads.json'), 'w') as outfile:
+        json.dump(manifest, outfile, indent=1)
+
+def save(build, location='tf'):
+    '''
+    Writes the arrays of a build into location/version/arrays.
+    '''
+    max_node = build.api.F.otype.maxNode
+    edges = {feature: export.edges(build, feature) for feature in EDGE_FEATURES}
+    write(os.path.join(os.path.expanduser(location), build.version, 'arrays'),
+          build.version, edges, export.sem_set(build), max_node)
+    build.report(f'BHSA {build.version} arrays written...')
+
+def parse_spec(spec):
+    '''
+    Returns the nodes of a TF spec such as 1-3,7.
+    '''
+    nodes = []
+    for part in spec.split(','):
+        start, _, end = part.partition('-')
+        nodes.extend(range(int(start), int(end or start) + 1))
+    return nodes
+
+def read_tf(path):
+    '''
+    Yields (node, value) pairs of a TF feature file,
+    where the value is the spec of the targets
+    for edge features, or the string for node features.
+    '''
+    with open(path) as infile:
+        for line in infile:
+            if not line.startswith('@'):
+                break
+        node = 0
+        for line in infile:
+            parts = line.rstrip('\n').split('\t')
+            nodes = [node + 1] if len(parts) == 1 else parse_spec(parts[0])
+            value = '\\'.join(part.replace('\\t', '\t').replace('\\n', '\n')
+                                for part in parts[-1].split('\\\\'))
+            for node in nodes:
+                yield node, value
+
+def convert(location):
+    '''
+    Writes the arrays of the .tf files in location,
+    e.g. tf/2021, into location/arrays.
+    '''
+    version = os.path.basename(os.path.normpath(location))
+    pairs = {}
+    max_node = 0
+    for feature in EDGE_FEATURES:
+        sources, targets = array.array(NODE_TYPE), array.array(NODE_TYPE)
+        for node, spec in read_tf(os.path.join(location, f'{feature}.tf')):
+            for target in parse_spec(spec):
+                sources.append(node)
+                targets.append(target)
+        pairs[feature] = (sources, targets)
+        max_node = max(max_node, max(sources, default=0), max(targets, default=0))
+    sem_set = list(read_tf(os.path.join(location, 'sem_set.tf')))
+    max_node = max([max_node] + [node for node, _ in sem_set])
+
+    edges = {feature: Edges.from_pairs(lambda sources=sources, targets=targets: zip(sources, targets), max_node)
+                for feature, (sources, targets) in pairs.items()}
+    write(os.path.join(location, 'arrays'), version, edges, sem_set, max_node)
+
+def load(directory):
+    '''
+    Memory maps the arrays in directory,
+    e.g. tf/2021/arrays, and returns their Features.
+    '''
+    with open(os.path.join(directory, 'heads.json')) as infile:
+        manifest = json.load(infile)
+    if manifest['format'] != FORMAT:
+        raise Exception(f"arrays of format {manifest['format']} cannot be read, expected {FORMAT}")
+
+    def edges(name):
+        return Edges(read_array(os.path.join(directory, f'{name}.offsets.npy')),
+                     read_array(os.path.join(directory, f'{name}.targets.npy')))
+
+    edge_features = {feature: EdgeArrays(edges(feature), edges(f'{feature}.inv'))
+                        for feature in manifest['edges']}
+    node_features = {'sem_set': NodeArrays(read_array(os.path.join(directory, 'sem_set.codes.npy')),
+                                           manifest['nodes']['sem_set'])}
+    return Features(manifest, edge_features, node_features)
@@ -0,0 +1,120 @@
+'''
+Builds of several BHSA versions at once.
+
+Each version is loaded and built in a process of its own, and
+exported to `tf/<version>`. The workers are forked after the
+stage modules are imported, so the templates and lexeme lists
+are read once; TF compiles a template against the corpus it
+searches, so that is done per version. A shared `--cache` keeps
+the sets and rule results of every version apart, under its own
+folder, so a new release only builds what it does not have yet.
+
+When all versions are built, their counts are compared: the heads
+found per rule, the phrases with and without a head per type, the
+objects of prepositions per rule, and the counts of each stage. A
+count that differs by more than the tolerance between two versions
+is reported, since the versions of the BHSA should give nearly the
+same features.
+'''
+
+import time
+import collections
+import multiprocessing
+import concurrent.futures
+
+from heads import corpus, export, arrays, provenance
+from heads.bench import stage_counts
+from heads.pipeline import Build, STAGES
+
+def summary(build, seconds):
+    '''
+    Returns the counts of a build.
+    '''
+    coverage = build.coverage.counts()
+    return {
+        'version': build.version,
+        'seconds': seconds,
+        'rules': dict(collections.Counter(str(rule) for rule in build.head_rules.values())),
+        'types': {typ: counts['covered'] for typ, counts in coverage.items() if counts['covered']},
+        'uncovered': {typ: counts['remaining'] for typ, counts in coverage.items() if counts['remaining']},
+        'objects': dict(collections.Counter(build.obj_rules.values())),
+        'stages': {name: stage_counts(build, name, stage) for name, stage in STAGES},
+    }
+
+def build_version(version, load=corpus.load, output='tf', workers=1, cache=None,
+                  compress=False, with_arrays=False, with_provenance=False):
+    '''
+    Loads, builds, and exports a version,
+    and returns the summary of the build.
+    '''
+    start = time.perf_counter()
+    A = load(version)
+    build = Build(A, version, workers=workers, cache=cache).run()
+    export.save(build, location=output, compress=compress)
+    if with_arrays:
+        arrays.save(build, location=output)
+    if with_provenance:
+        provenance.save(build, location=output)
+    return summary(build, time.perf_counter() - start)
+
+def run(versions, load=corpus.load, workers=1, **options):
+    '''
+    Builds the versions in parallel processes and
+    returns their summaries in the order of versions.
+
+    workers - the number of search processes in all; each
+        version is built in a process of its own, which gets
+        an equal share of them for its searches
+    options - passed on to build_version
+    '''
+    share = max(1, workers // len(versions))
+    # the builds fork pools of their own, which needs
+    # the non-daemonic executor processes of Python 3.9
+    context = multiprocessing.get_context('fork')
+    with concurrent.futures.ProcessPoolExecutor(len(versions), mp_context=context) as pool:
+        futures = [pool.submit(build_version, version, load=load, workers=share, **options)
+                      for version in versions]
+        return [future.result() for future in futures]
+
+def counts(summary):
+    '''
+    Yields (name, count) for all counts of a summary.
+    '''
+    for group in ('rules', 'types', 'uncovered', 'objects'):
+        for key, count in summary[group].items():
+            yield f'{group}/{key}', count
+    for stage, stage_count in summary['stages'].items():
+        for key, count in stage_count.items():
+            yield f'stages/{stage}/{key}', count
+
+def consistency(summaries, tolerance=0.05):
+    '''
+    Returns a table of all counts per version, and messages
+    for counts that differ between versions by more than the
+    tolerance, as a fraction of the largest count.
+    '''
+    table = collections.defaultdict(dict)
+    for summary in summaries:
+        for name, count in counts(summary):
+            table[name][summary['version']] = count
+
+    flags = []
+    versions = [summary['version'] for summary in summaries]
+    for name, row in sorted(table.items()):
+        values = [row.get(version, 0) for version in versions]
+        if max(values) and (max(values) - min(values)) / max(values) > tolerance:
+            flags.append(f"{name}: " + ', '.join(f'{version}={value}' for version, value in zip(versions, values)))
+    return dict(sorted(table.items())), flags
+
+def report(summaries, flags):
+    '''
+    Prints the builds and their inconsistencies.
+    '''
+    for summary in summaries:
+        print(f"BHSA {summary['version']} built in {summary['seconds']:.1f}s")
+    if flags:
+        print(f'{len(flags)} counts differ between the versions:')
+        for flag in flags:
+            print(f'\t{flag}')
+    else:
+        print('the versions are consistent')
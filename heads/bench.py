@@ -0,0 +1,264 @@
+'''
+Benchmarks of the heads production line.
+
+A benchmark runs the stages one by one on a BHSA version, or on
+a slice of its books, and measures for every stage, every named
+template, every head and object rule, and the export:
+
+    • the wall time in seconds
+    • the RSS it added, in KB: the peak RSS of the process while
+      it ran, less the RSS when it started, so that a stage is not
+      charged for the peaks of the stages before it
+    • the result counts, i.e. the sizes of the sets or
+      mappings made, or the number of search results
+
+The peak RSS is reset at the start of every measure where the system
+allows it (Linux); elsewhere a measure is the growth of the peak of
+the process while it ran. Searches in forked workers are not measured.
+
+Every run is appended to a JSON history. Runs are compared with a
+stored baseline for the same version and books, and a stage is
+flagged when it is slower or bigger than the baseline by more
+than the tolerance, or when its counts changed.
+'''
+
+import os
+import sys
+import json
+import time
+import resource
+import datetime
+import tempfile
+
+import tf.parameters
+
+from heads import corpus, export
+from heads.pipeline import Build, STAGES
+
+def memory():
+    '''
+    Returns the current and the peak RSS of this process
+    in KB, where the peak is that since the last reset_peak.
+    '''
+    try:
+        with open('/proc/self/status') as infile:
+            status = dict(line.split(':', 1) for line in infile)
+        return int(status['VmRSS'].split()[0]), int(status['VmHWM'].split()[0])
+    except (OSError, KeyError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak, peak
+
+def reset_peak():
+    '''
+    Resets the peak RSS of this process to its
+    current RSS, where the system allows it.
+    '''
+    try:
+        with open('/proc/self/clear_refs', 'w') as outfile:
+            outfile.write('5')
+    except OSError:
+        pass
+
+def template_names(stages=STAGES):
+    '''
+    Maps the templates defined in the stage modules
+    to their names, e.g. `dwords.missing_atr_rec[0]`.
+    '''
+    names = {}
+    for stage_name, module in stages:
+        for name, value in vars(module).items():
+            if name.startswith('_'):
+                continue
+            values = value if isinstance(value, (tuple, list)) else [value]
+            for i, template in enumerate(values):
+                if isinstance(template, dict):
+                    template = template.get('template')
+                if isinstance(template, str):
+                    suffix = f'[{i}]' if values is value else ''
+                    names.setdefault(template, f'{stage_name}.{name}{suffix}')
+    return names
+
+def stage_counts(build, name, stage):
+    '''
+    Returns the result counts of a stage.
+    '''
+    if hasattr(stage, 'SETS'):
+        return {set_name: len(build.sets[set_name]) for set_name in stage.SETS}
+    counts = {
+        'phrase_heads': lambda: {'covered': build.coverage.covered,
+                                 'remaining': build.coverage.remaining},
+        'obj_prep': lambda: {'obj_prep': len(build.obj2prep)},
+        'nhead': lambda: {'nhead': len(build.nheads)},
+    }
+    return counts[name]() if name in counts else {}
+
+class TimedBuild(Build):
+    '''
+    A Build that measures its searches.
+
+    With a single worker the head and object
+    rules are measured one by one; with more
+    workers only their stages are measured.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.measures = {}
+        self.template_names = template_names()
+        self.stage = None
+        self.rule = None
+
+        # the marks of the measures that are running
+        self.marks = []
+
+    def update_peaks(self):
+        # the peak since the last reset counts for every running measure
+        _, peak = memory()
+        for mark in self.marks:
+            mark['peak'] = max(mark['peak'], peak)
+
+    def start(self):
+        '''
+        Starts a measure and returns its mark.
+        Measures may be nested, so the peak RSS
+        is passed on to the running measures
+        before it is reset.
+        '''
+        self.update_peaks()
+        reset_peak()
+        rss, _ = memory()
+        mark = {'start': time.perf_counter(), 'rss': rss, 'peak': rss}
+        self.marks.append(mark)
+        return mark
+
+    def measure(self, name, mark, counts):
+        '''
+        Adds a measure since its mark, summing
+        repeated measures under the same name, and
+        keeping the largest RSS any of them added.
+        '''
+        self.update_peaks()
+        self.marks.remove(mark)
+        seconds = time.perf_counter() - mark['start']
+        entry = self.measures.setdefault(name, {'seconds': 0.0, 'rss_kb': 0, 'counts': {}})
+        entry['seconds'] += seconds
+        entry['rss_kb'] = max(entry['rss_kb'], mark['peak'] - mark['rss'])
+        for key, count in counts.items():
+            entry['counts'][key] = entry['counts'].get(key, 0) + count
+
+    def search(self, template, **kwargs):
+        if self.rule is not None:
+            return super().search(template, **kwargs)
+        mark = self.start()
+        results = super().search(template, **kwargs)
+        name = self.template_names.get(template, f'{self.stage}.search')
+        self.measure(name, mark, {'results': len(results)})
+        return results
+
+    def search_rules(self, stage, rules):
+        if self.workers > 1:
+            return super().search_rules(stage, rules)
+        results = []
+        for rule in rules:
+            self.rule = rule[0]
+            mark = self.start()
+            results.extend(super().search_rules(stage, [rule]))
+            self.measure(f'{stage}/{rule[0]}', mark, {'results': len(results[-1])})
+        self.rule = None
+        return results
+
+    def run(self, stages=None):
+        for name, stage in STAGES:
+            if stages is not None and name not in stages:
+                continue
+            self.stage = name
+            mark = self.start()
+            super().run(stages=[name])
+            self.measure(name, mark, stage_counts(self, name, stage))
+        self.stage = None
+        return self
+
+def run(version, books=None, workers=1, load=corpus.load):
+    '''
+    Loads the books of a version, or all of it,
+    runs and exports a build, and returns a
+    benchmark record of it. The loading is
+    not measured.
+    '''
+    A = load(version, books=books)
+    build = TimedBuild(A, version, workers=workers)
+    start = build.start()
+    build.run()
+    with tempfile.TemporaryDirectory() as location:
+        export_start = build.start()
+        export.save(build, location=location)
+        build.measure('export', export_start, {})
+    build.measure('total', start, {})
+
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'version': version,
+        'books': list(books or []),
+        'workers': workers,
+        'python': sys.version.split()[0],
+        'text-fabric': tf.parameters.VERSION,
+        'measures': build.measures,
+    }
+
+def slice_key(record):
+    '''
+    Names the version and books of a record,
+    under which its baseline is stored.
+    '''
+    return f"{record['version']}:{'-'.join(record['books']) or 'all'}"
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as infile:
+        return json.load(infile)
+
+def write_json(path, data):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as outfile:
+        json.dump(data, outfile, indent=1)
+
+def append_history(path, record):
+    history = read_json(path, [])
+    history.append(record)
+    write_json(path, history)
+
+def regressions(record, baseline, tolerance=0.25, min_seconds=0.5):
+    '''
+    Returns messages for the measures of record that regressed
+    against baseline. Times within min_seconds of the baseline
+    are not flagged, so that short stages do not flag noise.
+    '''
+    flags = []
+    for name, entry in record['measures'].items():
+        base = baseline['measures'].get(name)
+        if base is None:
+            continue
+        if (entry['seconds'] > base['seconds'] * (1 + tolerance)
+                and entry['seconds'] - base['seconds'] > min_seconds):
+            flags.append(f"{name}: {base['seconds']:.2f}s -> {entry['seconds']:.2f}s")
+        # baselines from before the RSS per measure have no rss_kb
+        if 'rss_kb' in base and entry['rss_kb'] > base['rss_kb'] * (1 + tolerance):
+            flags.append(f"{name}: RSS {base['rss_kb']}KB -> {entry['rss_kb']}KB")
+        if entry['counts'] != base['counts']:
+            flags.append(f"{name}: counts {base['counts']} -> {entry['counts']}")
+    return flags
+
+def report(record, flags):
+    '''
+    Prints the measures of a record and its regressions.
+    '''
+    print(f"BHSA {slice_key(record)}, {record['workers']} worker(s)")
+    for name, entry in record['measures'].items():
+        counts = ', '.join(f'{key}={count}' for key, count in entry['counts'].items())
+        print(f"\t{entry['seconds']:9.2f}s {entry['rss_kb']:>10}KB  {name}  {counts}")
+    if flags:
+        print(f'{len(flags)} regressions against the baseline:')
+        for flag in flags:
+            print(f'\t{flag}')
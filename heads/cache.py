@@ -0,0 +1,261 @@
+'''
+A content-addressed cache of the custom word sets.
+
+The stages that make custom sets (iphrase_atom, quantifiers,
+prepositions, dwords) declare the names of the sets they make
+in `SETS` and the stages they rely on in `REQUIRES`. Each of
+these stages is keyed by a hash of:
+
+    • the BHSA version
+    • the hashes of the corpus feature files used by the pipeline
+    • the source of the stage module, i.e. its templates,
+      lexeme lists, and the code which applies them, as well
+      as the source of the heads modules it imports from
+    • the keys of the stages it requires
+
+A stage is only rerun when no sets are stored under its key,
+so an edit to one stage reruns that stage and the stages
+downstream of it. Each set is stored in its own file, and is
+only read when first used. NodeSets are stored as their bitmap,
+other sets as a sorted array of nodes.
+
+The head and object rules, i.e. the templates of `phrase_heads`
+and `obj_prep`, are cached one by one in the same location. A rule
+is keyed by its template, the result columns it keeps, and the keys
+of the stages that make the sets it names. The mappings are always
+replayed from the stored results of all rules, so an edit to one
+rule only searches that rule again.
+'''
+
+import os
+import sys
+import array
+import shutil
+import hashlib
+import inspect
+import tempfile
+from collections import UserDict
+
+from heads import corpus
+from heads.nodeset import NodeSet
+
+# unsigned 32 bit nodes
+NODE_TYPE = 'I'
+
+def file_hash(path):
+    '''
+    Returns the sha256 hex digest of a file.
+    '''
+    sha = hashlib.sha256()
+    with open(path, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def feature_hash(api, feature):
+    '''
+    Returns the hash of a corpus feature file,
+    or the hash a snapshot stored of it.
+    '''
+    if hasattr(api, 'feature_hashes'):
+        return api.feature_hashes[feature]
+    return file_hash(api.TF.features[feature].path)
+
+def sources(module):
+    '''
+    Returns the names of the module and of
+    the heads modules it imports from.
+    '''
+    names = {module.__name__}
+    for value in vars(module).values():
+        name = value.__name__ if inspect.ismodule(value) else getattr(value, '__module__', None)
+        if isinstance(name, str) and name.startswith('heads.'):
+            names.add(name)
+    return sorted(names)
+
+def write_nodes(path, nodes):
+    '''
+    Writes a NodeSet to path.bits as its range and bitmap,
+    or any other set to path.nodes as a sorted array.
+    '''
+    if isinstance(nodes, NodeSet):
+        with open(f'{path}.bits', 'wb') as outfile:
+            array.array(NODE_TYPE, (nodes.first, nodes.last)).tofile(outfile)
+            outfile.write(nodes.bits)
+    else:
+        with open(f'{path}.nodes', 'wb') as outfile:
+            array.array(NODE_TYPE, sorted(nodes)).tofile(outfile)
+
+def read_nodes(path):
+    '''
+    Reads a set written by write_nodes.
+    '''
+    if os.path.exists(f'{path}.bits'):
+        with open(f'{path}.bits', 'rb') as infile:
+            header = array.array(NODE_TYPE)
+            header.fromfile(infile, 2)
+            first, last = header
+            return NodeSet(first, last, bits=bytearray(infile.read()))
+    nodes = array.array(NODE_TYPE)
+    with open(f'{path}.nodes', 'rb') as infile:
+        nodes.frombytes(infile.read())
+    return set(nodes)
+
+class Pending:
+    '''
+    A stored set which is not read yet.
+    '''
+    def __init__(self, path):
+        self.path = path
+
+class LazySets(UserDict):
+    '''
+    A dict of custom sets in which stored
+    sets are read when they are first used.
+    '''
+
+    def __getitem__(self, name):
+        nodes = self.data[name]
+        if isinstance(nodes, Pending):
+            nodes = self.data[name] = read_nodes(nodes.path)
+        return nodes
+
+    def add_pending(self, name, path):
+        self.data[name] = Pending(path)
+
+class SetCache:
+    '''
+    Stores the custom sets of a build under
+    location/version/stage/key.
+
+    stages - ordered (name, module) pairs of the pipeline
+    '''
+
+    def __init__(self, location, version, api, stages, features=corpus.FEATURES):
+        self.location = os.path.join(os.path.expanduser(location), version)
+        self.version = version
+        self.api = api
+        self.stages = dict(stages)
+        self.features = features
+        self.keys = {}
+        self._corpus_key = None
+
+    def corpus_key(self):
+        '''
+        Hashes the version and the feature
+        files the pipeline uses.
+        '''
+        if self._corpus_key is None:
+            sha = hashlib.sha256(self.version.encode())
+            for feature in sorted(self.features):
+                sha.update(feature.encode())
+                sha.update(feature_hash(self.api, feature).encode())
+            self._corpus_key = sha.hexdigest()
+        return self._corpus_key
+
+    def key(self, name):
+        '''
+        Returns the key of a stage.
+        '''
+        if name not in self.keys:
+            module = self.stages[name]
+            sha = hashlib.sha256(self.corpus_key().encode())
+            for source in sources(module):
+                sha.update(inspect.getsource(sys.modules[source]).encode())
+            for required in module.REQUIRES:
+                sha.update(self.key(required).encode())
+            self.keys[name] = sha.hexdigest()[:20]
+        return self.keys[name]
+
+    def path(self, name):
+        return os.path.join(self.location, name, self.key(name))
+
+    def load(self, name, sets):
+        '''
+        Adds the stored sets of a stage to sets.
+        Returns False if nothing is stored under the stage's key.
+        '''
+        path = self.path(name)
+        if not os.path.isdir(path):
+            return False
+        for set_name in self.stages[name].SETS:
+            sets.add_pending(set_name, os.path.join(path, set_name))
+        return True
+
+    def save(self, name, sets):
+        '''
+        Stores the sets made by a stage.
+        '''
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # write into a temporary directory first
+        # so that a stored stage is always complete
+        tmp = tempfile.mkdtemp(dir=os.path.dirname(path))
+        try:
+            for set_name in self.stages[name].SETS:
+                write_nodes(os.path.join(tmp, set_name), sets[set_name])
+            os.replace(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(path):
+                raise
+
+class RuleCache:
+    '''
+    Stores the results of single rules under
+    location/version/rules/stage/rule/key.rows,
+    as an array of the kept result columns.
+
+    cache - the SetCache of the build
+    '''
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.location = os.path.join(cache.location, 'rules')
+
+    def key(self, template, columns, stages):
+        '''
+        Returns the key of a rule.
+
+        stages - names of the stages which make
+            the custom sets named in the template
+        '''
+        sha = hashlib.sha256(self.cache.corpus_key().encode())
+        sha.update(template.encode())
+        sha.update(repr(tuple(columns)).encode())
+        for stage in sorted(stages):
+            sha.update(self.cache.key(stage).encode())
+        return sha.hexdigest()[:20]
+
+    def path(self, stage, rule, key):
+        return os.path.join(self.location, stage, rule, f'{key}.rows')
+
+    def load(self, stage, rule, key, width):
+        '''
+        Returns the stored rows of a rule,
+        or None if nothing is stored under its key.
+        '''
+        path = self.path(stage, rule, key)
+        if not os.path.exists(path):
+            return None
+        nodes = array.array(NODE_TYPE)
+        with open(path, 'rb') as infile:
+            nodes.frombytes(infile.read())
+        return [tuple(nodes[i:i+width]) for i in range(0, len(nodes), width)]
+
+    def save(self, stage, rule, key, rows):
+        '''
+        Stores the rows of a rule.
+        '''
+        path = self.path(stage, rule, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as outfile:
+                array.array(NODE_TYPE, (node for row in rows for node in row)).tofile(outfile)
+            os.replace(tmp, path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
@@ -0,0 +1,143 @@
+'''
+Command line interface for the heads production line.
+
+    heads build --version 2021
+    heads batch --versions c 2021 --workers 8
+    heads arrays tf/2021
+    heads snapshot --version 2021
+    heads bench --version 2021 --books Ruth Jonah
+    heads profile --version 2021 --books Ruth
+    heads diff tf/2021/provenance old/2021/provenance
+'''
+
+import json
+import argparse
+
+from heads import corpus, export, arrays, bench, snapshot, profiler, provenance, batch
+from heads.pipeline import Build
+
+def build(args):
+    if args.snapshot:
+        A = snapshot.load(args.version, location=args.snapshot)
+    else:
+        A = corpus.load(args.version)
+    heads_build = Build(A, args.version, silent=args.silent,
+                        workers=args.workers, cache=args.cache,
+                        check=args.check)
+    heads_build.run()
+    export.save(heads_build, location=args.output, compress=args.compress)
+    if args.arrays:
+        arrays.save(heads_build, location=args.output)
+    if args.provenance:
+        provenance.save(heads_build, location=args.output)
+    if args.uncovered:
+        heads_build.coverage.write(args.uncovered)
+
+def build_versions(args):
+    summaries = batch.run(args.versions, workers=args.workers, output=args.output,
+                          cache=args.cache, compress=args.compress,
+                          with_arrays=args.arrays, with_provenance=args.provenance)
+    table, flags = batch.consistency(summaries, tolerance=args.tolerance)
+    batch.report(summaries, flags)
+    if args.report:
+        bench.write_json(args.report, {'summaries': summaries, 'counts': table, 'flags': flags})
+
+def convert(args):
+    for location in args.locations:
+        arrays.convert(location)
+
+def make_snapshot(args):
+    snapshot.save(args.version, location=args.output, silent=args.silent)
+
+def benchmark(args):
+    record = bench.run(args.version, books=args.books, workers=args.workers)
+    bench.append_history(args.history, record)
+
+    baselines = bench.read_json(args.baseline, {})
+    key = bench.slice_key(record)
+    flags = bench.regressions(record, baselines[key], tolerance=args.tolerance) if key in baselines else []
+    bench.report(record, flags)
+
+    if args.update_baseline or key not in baselines:
+        baselines[key] = record
+        bench.write_json(args.baseline, baselines)
+    return 1 if flags else 0
+
+def profile(args):
+    A = corpus.load(args.version, books=args.books)
+    search_profiler = profiler.run(A, args.version)
+    for line in search_profiler.report():
+        print(line)
+    search_profiler.write(args.output)
+
+def compare(args):
+    result = provenance.diff(provenance.Provenance(args.a), provenance.Provenance(args.b))
+    provenance.report(result)
+    if args.output:
+        with open(args.output, 'w') as outfile:
+            json.dump(result, outfile, indent=1)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='heads')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help='build the heads features for a BHSA version')
+    build_parser.add_argument('--version', required=True, help='BHSA version, e.g. 2021 or c')
+    build_parser.add_argument('--output', default='tf', help='directory in which a folder per version is written')
+    build_parser.add_argument('--workers', type=int, default=1, help='number of processes for running the head queries')
+    build_parser.add_argument('--cache', help='directory in which to cache the custom word sets between builds')
+    build_parser.add_argument('--compress', action='store_true', help='also write the features as .tf.gz')
+    build_parser.add_argument('--arrays', action='store_true', help='also write the features as memory mappable arrays')
+    build_parser.add_argument('--provenance', action='store_true', help='also write the rule that found each head and object')
+    build_parser.add_argument('--check', action='store_true', help='also search the templates of the native head resolvers and check that they agree')
+    build_parser.add_argument('--snapshot', help='directory of corpus snapshots to load instead of Text-Fabric; needs a --cache with every set and rule stored')
+    build_parser.add_argument('--uncovered', help='JSON file to which the phrases without a head are written, per type')
+    build_parser.add_argument('--silent', action='store_true', help='do not report progress')
+    build_parser.set_defaults(func=build)
+
+    batch_parser = commands.add_parser('batch', help='build several BHSA versions in parallel and compare them')
+    batch_parser.add_argument('--versions', nargs='+', required=True, help='BHSA versions, e.g. c 2021')
+    batch_parser.add_argument('--output', default='tf', help='directory in which a folder per version is written')
+    batch_parser.add_argument('--workers', type=int, default=1, help='number of processes in all, shared by the versions')
+    batch_parser.add_argument('--cache', help='directory in which to cache the custom word sets between builds')
+    batch_parser.add_argument('--compress', action='store_true', help='also write the features as .tf.gz')
+    batch_parser.add_argument('--arrays', action='store_true', help='also write the features as memory mappable arrays')
+    batch_parser.add_argument('--provenance', action='store_true', help='also write the rule that found each head and object')
+    batch_parser.add_argument('--tolerance', type=float, default=0.05, help='fraction by which a count may differ between versions')
+    batch_parser.add_argument('--report', help='JSON file to write the counts of every version to')
+    batch_parser.set_defaults(func=build_versions)
+
+    arrays_parser = commands.add_parser('arrays', help='write the memory mappable arrays of exported .tf features')
+    arrays_parser.add_argument('locations', nargs='+', help='folders with the .tf files, e.g. tf/2021 tf/c')
+    arrays_parser.set_defaults(func=convert)
+
+    snapshot_parser = commands.add_parser('snapshot', help='write the corpus features used by the pipeline as memory mappable arrays')
+    snapshot_parser.add_argument('--version', required=True, help='BHSA version, e.g. 2021 or c')
+    snapshot_parser.add_argument('--output', default='snapshots', help='directory in which a folder per version is written')
+    snapshot_parser.add_argument('--silent', action='store_true', help='do not report progress')
+    snapshot_parser.set_defaults(func=make_snapshot)
+
+    bench_parser = commands.add_parser('bench', help='measure the time, memory, and results of each stage')
+    bench_parser.add_argument('--version', required=True, help='BHSA version, e.g. 2021 or c')
+    bench_parser.add_argument('--books', nargs='+', help='only load these books, e.g. Genesis Ruth')
+    bench_parser.add_argument('--workers', type=int, default=1, help='number of processes for running the head queries')
+    bench_parser.add_argument('--history', default='bench/history.json', help='JSON file to which every run is appended')
+    bench_parser.add_argument('--baseline', default='bench/baseline.json', help='JSON file of the baselines per version and books')
+    bench_parser.add_argument('--tolerance', type=float, default=0.25, help='fraction by which a measure may exceed the baseline')
+    bench_parser.add_argument('--update-baseline', action='store_true', help='store this run as the new baseline')
+    bench_parser.set_defaults(func=benchmark)
+
+    profile_parser = commands.add_parser('profile', help='time every search and each of its quantifier blocks')
+    profile_parser.add_argument('--version', required=True, help='BHSA version, e.g. 2021 or c')
+    profile_parser.add_argument('--books', nargs='+', help='only load these books, e.g. Genesis Ruth')
+    profile_parser.add_argument('--output', default='profile.json', help='JSON file to write the sorted records to')
+    profile_parser.set_defaults(func=profile)
+
+    diff_parser = commands.add_parser('diff', help='compare the heads and objects of two builds by rule and phrase type')
+    diff_parser.add_argument('a', help='provenance folder of the first build, e.g. tf/2021/provenance')
+    diff_parser.add_argument('b', help='provenance folder of the second build')
+    diff_parser.add_argument('--output', help='JSON file to write the changed phrases and objects to')
+    diff_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,36 @@
+'''
+Loads the BHSA corpus with the features
+needed by the heads production line.
+'''
+
+from tf.app import use
+
+# the corpus features used by the pipeline
+FEATURES = ('otype', 'oslots', 'mother',
+            'pdp', 'sp', 'lex', 'ls', 'st', 'nu', 'prs', 'vt',
+            'rela', 'typ', 'trailer', 'g_cons_utf8',
+            'book', 'book@en', 'chapter', 'verse')
+
+def load(version, silent=True, books=None):
+    '''
+    Returns a Text-Fabric app for the
+    requested BHSA version. No display
+    setup is done since the production
+    line never shows results.
+
+    books - optional list of book names, e.g. ['Genesis', 'Ruth'];
+        only those books are loaded, as a TF volume that is
+        extracted from the full corpus when it does not exist yet
+    '''
+    A = use('ETCBC/bhsa', version=version, silent=silent)
+    if A is None:
+        raise Exception(f'BHSA version {version} could not be loaded')
+    if books:
+        volume = '-'.join(books)
+        if volume not in A.getVolumes():
+            A.extract({volume: books}, silent=silent)
+        A = use('ETCBC/bhsa', version=version, volume=volume, silent=silent)
+        if A is None:
+            raise Exception(f'books {volume} of BHSA {version} could not be loaded')
+    A.api.TF.load('g_cons_utf8 prs', add=True, silent=silent)
+    return A
@@ -0,0 +1,98 @@
+'''
+Coverage of the phrases by their heads.
+
+Every phrase has a status in an array over the phrase nodes,
+remaining or covered, and a code for its `typ`. The phrases
+covered per type are counted as they are covered, so recording a
+head and reporting the coverage per type take constant time. Only
+listing the uncovered phrases goes over the array, and it skips
+to each remaining phrase with `bytearray.find`.
+'''
+
+import json
+
+# the status of a phrase; phrases
+# that are not tracked are 0
+REMAINING = 1
+COVERED = 2
+
+class Coverage:
+    '''
+    Tracks which phrases have a head.
+
+    phrases - the phrases to track, by default all of them
+    '''
+
+    def __init__(self, api, phrases=None):
+        F = api.F
+        self.first, last = F.otype.sInterval('phrase')
+        self.status = bytearray(last - self.first + 1)
+        self.typ_codes = bytearray(len(self.status))
+        self.types = []
+        self.totals = []
+        codes = {}
+        for phrase in F.otype.s('phrase') if phrases is None else phrases:
+            typ = F.typ.v(phrase)
+            if typ not in codes:
+                codes[typ] = len(self.types)
+                self.types.append(typ)
+                self.totals.append(0)
+            i = phrase - self.first
+            self.status[i] = REMAINING
+            self.typ_codes[i] = codes[typ]
+            self.totals[codes[typ]] += 1
+        self.covered_types = [0] * len(self.types)
+        self.total = sum(self.totals)
+        self.covered = 0
+
+    @property
+    def remaining(self):
+        return self.total - self.covered
+
+    def cover(self, phrase):
+        '''
+        Marks a phrase as covered; a phrase with
+        more than one head is only counted once.
+        '''
+        i = phrase - self.first
+        if 0 <= i < len(self.status) and self.status[i] == REMAINING:
+            self.status[i] = COVERED
+            self.covered += 1
+            self.covered_types[self.typ_codes[i]] += 1
+
+    def is_covered(self, phrase):
+        i = phrase - self.first
+        return 0 <= i < len(self.status) and self.status[i] == COVERED
+
+    def counts(self):
+        '''
+        Returns the covered and remaining
+        phrases of each type.
+        '''
+        return {typ: {'covered': covered, 'remaining': total - covered}
+                   for typ, total, covered in sorted(zip(self.types, self.totals, self.covered_types))}
+
+    def uncovered(self, typ=None):
+        '''
+        Yields the remaining phrases,
+        optionally only those of a type.
+        '''
+        code = None if typ is None else self.types.index(typ) if typ in self.types else -1
+        i = self.status.find(REMAINING)
+        while i != -1:
+            if code is None or self.typ_codes[i] == code:
+                yield self.first + i
+            i = self.status.find(REMAINING, i + 1)
+
+    def write(self, path):
+        '''
+        Writes the counts and the
+        uncovered phrases of each type as JSON.
+        '''
+        uncovered = {typ: [] for typ in sorted(self.types)}
+        for phrase in self.uncovered():
+            uncovered[self.types[self.typ_codes[phrase - self.first]]].append(phrase)
+        with open(path, 'w') as outfile:
+            json.dump({'counts': self.counts(),
+                       'uncovered': {typ: phrases for typ, phrases in uncovered.items() if phrases}},
+                      outfile, indent=1)
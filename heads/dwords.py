@@ -0,0 +1,264 @@
+'''
+`dword` (dependent word) and `iword` (independent word)
+
+The BHSA subphrases have several missing relations that prevent
+correct head selection. Some of these are due to a word existing in
+more than 3 subphrases, the maximum for the ps3.p file format. As a
+temporary solution, a set is created (`dword`, dependent word), which
+contains all words that *should* be in a dependent subphrase relation
+but are not. This set is in turn used to make a set of `iword`
+(independent word). For the heads selections, all templates search
+for `iword` objects rather than simple `word`.
+
+This stage also prepares `goodsp`, the subphrases with an `adj`
+relation that should instead reflect a `par` relation.
+'''
+
+from heads.nodeset import NodeSet
+from heads.tokens import token_index
+
+# the custom sets made by this stage
+# and the stages they are made from
+SETS = ('goodsp', 'iword', 'dword')
+REQUIRES = ('iphrase_atom', 'quantifiers', 'prepositions')
+
+# subs + subs or subs + adjv in adjacent relation
+# without a subphrase relating the second to the first
+missing_atr_rec = ('''
+
+phrase
+    phrase_atom
+        subs:nonquantprep pdp=subs|nmpr
+% stipulate that this word has some relation to the following word
+% there are various checks to weed out spurious results:
+        /with/
+        st=c
+        /or/
+        <: word pdp=adjv
+        /or/
+        trailer=&
+        /or/
+        s1:subphrase
+            =: subs
+            <: w1:word pdp=adjv|subs
+        w1 := s1
+        /-/
+
+        <: ad:word pdp=adjv|subs
+% stipulate that this^ word has no relation to the first
+        /without/
+        s1:subphrase
+            w1:word
+        s2:subphrase rela=atr|adj|par|mod
+            w2:word
+        s1 <mother- s2
+        w1 <: w2
+        ad = w2
+        /-/
+        /without/
+        w1:word
+        s1:subphrase rela=rec
+            w2:word
+        w1 <mother- s1
+        w1 <: w2
+        ad = w2
+        /-/
+
+''', '''
+
+phrase
+    phrase_atom
+        nonquantprep pdp=subs|nmpr
+        <: word pdp=art
+        <: ad:word pdp=adjv|subs
+% stipulate that this^ word has no relation to the first
+        /without/
+        s1:subphrase
+            w1:word pdp=subs|nmpr
+        s2:subphrase rela=atr|adj|par|mod
+            w2:word pdp=art
+            <: w3:word
+
+        s1 <mother- s2
+        w1 <: w2
+        ad = w3
+        /-/
+
+        /without/
+        w1:word pdp=subs|nmpr
+        s1:subphrase rela=rec
+            w2:word pdp=art
+            w3:word
+
+        w1 <mother- s1
+        w1 <: w2
+        ad = w3
+        /-/
+''')
+
+# coordinations with a modifying term
+par_dwords = ('''
+
+phrase
+    s1:subphrase
+    /without/
+        quant
+    /-/
+        =: dword
+    s2:subphrase rela=par
+        w:word pdp=subs|nmpr|adjv
+        /without/
+        subphrase rela=NA
+            w
+        /-/
+s1 <mother- s2
+
+''', '''
+
+phrase
+    s1:subphrase
+    /without/
+        quant
+    /-/
+        := dword
+    s2:subphrase rela=par
+        w:word pdp=subs|nmpr|adjv
+        /without/
+        subphrase rela=NA
+            w
+        /-/
+s1 <mother- s2
+
+''')
+
+# quantified substantives with no dependent subphrase relations;
+# two additional checks are made with /or/ to cover the peculiar cases
+# of Ezra 1:20 (כלים אחרים אלף, i.e. adjv intervenes between quantifier)
+# and Daniel 3:23 (גבריא אלך תלתהן, i.e. where a demonstrative intervenes)
+non_rela_cardinals = '''
+phrase
+    phrase_atom
+
+        w1:word ls=card
+
+        /without/
+        subphrase rela=atr|adj|rec
+            w1
+        /-/
+        /with/
+        phrase_atom
+            nonquantprep pdp=subs|nmpr
+            <: word ls=card prs=absent
+            < w1 prs=absent
+        /or/
+        phrase_atom
+            nonquantprep pdp=subs|nmpr
+            <: word pdp=prde
+            <: w1
+        /or/
+        phrase_atom
+            nonquantprep pdp=subs|nmpr
+            <: word pdp=adjv
+            < w1 prs=absent
+        /-/
+
+'''
+
+# incorrect par relations which could not be fixed programmatically
+bad_pars = [
+    {'template': '''
+
+book book@en=Jeremiah
+    chapter chapter=32
+        verse verse=32
+            phrase
+                word lex=BN/
+                <: word lex=JHWDH/
+''',
+     'phrasei': 3,
+     'badi': 4,
+     'note': 'בני־יהודה should be parallel to בני־ישראל rather than רעת בני־ישראל'},
+
+    {'template': '''
+
+book book@en=Jeremiah
+    chapter chapter=40
+        verse verse=1
+            phrase
+                word lex=JHWDH/
+''',
+     'phrasei': 3,
+     'badi': 4,
+     'note': 'יהודה should be parallel to ירושלים rather than גלות־ירושלים'},
+]
+
+# adj subphrases which are manually excluded
+# due to the inadequate nature of the subphrase relations
+goodsp_exclusions = [('Isaiah', 18, 2),
+                     ('Isaiah', 18, 7),
+                     ('Daniel', 9, 24),
+                     ('2_Chronicles', 30, 10)]
+
+def excluded_subphrases(api):
+    '''
+    Resolves the manual exclusions to subphrase nodes.
+    '''
+    T, L = api.T, api.L
+    excluded = set()
+    for section in goodsp_exclusions:
+        verse = T.nodeFromSection(section)
+        if verse:
+            excluded.update(L.d(verse, 'subphrase'))
+    return excluded
+
+def adj_parallels(build):
+    '''
+    Returns (mother, daughters) tuples for subphrases
+    with an adjacent `adj` daughter that is identical
+    to the mother.
+    '''
+    return token_index(build).mirrored_daughters('subphrase', 'adj',
+                                                 exclude=excluded_subphrases(build.api))
+
+def run(build):
+    api = build.api
+    sets = build.sets
+    dwords = NodeSet.of_type(api, 'word')
+
+    # missing atr and rec
+    for template in missing_atr_rec:
+        for res in build.search(template, sets=sets):
+            dwords.add(res[3] if len(res) == 4 else res[4])
+    build.report(f'\t{len(dwords)} missing atr/rec words added to dwords...')
+
+    # coordinations with modifying term
+    new_par_dwords = set()
+    par_sets = {'dword': dwords, 'quant': sets['quant']}
+    for template in par_dwords:
+        for res in build.search(template, sets=par_sets):
+            new_par_dwords.add(res[4])
+    dwords |= new_par_dwords
+    build.report(f'\t{len(new_par_dwords)} new par dwords added to dwords...')
+
+    # missing quant relations
+    for res in build.search(non_rela_cardinals, sets=sets):
+        dwords.add(res[2])
+
+    # incorrect par relations;
+    # the verses are missing when only some books are loaded
+    for bp in bad_pars:
+        bp_res = build.search(bp['template'])
+        if bp_res:
+            dwords.add(bp_res[0][bp['badi']])
+
+    # missed parallels due to bad adj relations
+    goodsubphrases = NodeSet.of_type(api, 'subphrase')
+    for data in adj_parallels(build):
+        goodsubphrases.add(data[1][0])
+    sets['goodsp'] = goodsubphrases
+
+    # complete iword
+    iwords = ~dwords
+    sets['iword'] = iwords
+    sets['dword'] = dwords
+    build.report(f'\t{len(dwords)} dependent words ready...')
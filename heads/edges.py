@@ -0,0 +1,90 @@
+'''
+Compact edge mappings.
+
+The head mappings of a build are dicts of sets, keyed from the
+phrase to its heads, while the features go from the head to the
+phrase. Rather than inverting them into further dicts of sets,
+the edges are counted and placed into two flat arrays:
+
+    • offsets - for every node n, its targets are found
+      at offsets[n]:offsets[n+1]
+    • targets - the target nodes, sorted per node
+
+This is the compressed sparse row (CSR) layout. It is filled in
+two passes over the pairs, and takes 4 bytes per node and per edge.
+'''
+
+import array
+import itertools
+
+# unsigned 32 bit nodes
+NODE_TYPE = 'I'
+
+class Edges:
+    '''
+    Edges from the nodes 1..max_node, stored as
+    offsets and targets arrays.
+    '''
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_pairs(cls, pairs, max_node):
+        '''
+        Makes Edges from (node, target) pairs.
+
+        pairs - a function that returns an iterator over the pairs;
+            it is called twice, to count and to place the edges
+        '''
+        counts = array.array(NODE_TYPE, bytes(4 * (max_node + 2)))
+        for node, _ in pairs():
+            counts[node + 1] += 1
+        offsets = array.array(NODE_TYPE, itertools.accumulate(counts))
+
+        fill = array.array(NODE_TYPE, offsets)
+        targets = array.array(NODE_TYPE, bytes(4 * offsets[-1]))
+        for node, target in pairs():
+            targets[fill[node]] = target
+            fill[node] += 1
+
+        for node in range(1, max_node + 1):
+            start, end = offsets[node], offsets[node + 1]
+            if end - start > 1:
+                targets[start:end] = array.array(NODE_TYPE, sorted(targets[start:end]))
+        return cls(offsets, targets)
+
+    @property
+    def max_node(self):
+        return len(self.offsets) - 2
+
+    def f(self, node):
+        '''
+        Returns the targets of a node.
+        '''
+        if not 0 < node <= self.max_node:
+            return ()
+        return tuple(self.targets[self.offsets[node]:self.offsets[node + 1]])
+
+    def items(self):
+        '''
+        Yields (node, targets) in node order,
+        for the nodes that have targets.
+        '''
+        offsets, targets = self.offsets, self.targets
+        for node in range(1, self.max_node + 1):
+            start, end = offsets[node], offsets[node + 1]
+            if start != end:
+                yield node, targets[start:end]
+
+    def inverse(self):
+        '''
+        Returns the Edges in the opposite direction.
+        '''
+        return Edges.from_pairs(lambda: ((target, node) for node, targets in self.items()
+                                            for target in targets),
+                                self.max_node)
+
+    def __len__(self):
+        return len(self.targets)
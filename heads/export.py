@@ -0,0 +1,159 @@
+'''
+Export TF Data
+
+The mappings built up by the production line are streamed into
+TF data files. The edges are placed in compact `Edges` arrays
+straight from the mappings of the build, and written node by node
+in the TF format, with implicit nodes and target ranges as TF
+writes them. The four features are written concurrently when
+the build has more than one worker.
+'''
+
+import os
+import gzip
+import datetime
+import multiprocessing
+
+from heads.edges import Edges
+
+# the features that are written
+FEATURES = ('head', 'nhead', 'obj_prep', 'sem_set')
+
+def edges(build, feature):
+    '''
+    Returns the Edges of an edge feature,
+    reversing the phrase2heads and nheads mappings.
+    '''
+    max_node = build.api.F.otype.maxNode
+    mappings = {
+        'head': lambda: ((head, phrase) for phrase, heads in build.phrase2heads.items()
+                            for head in heads),
+        'nhead': lambda: ((head, phrase) for phrase, heads in build.nheads.items()
+                             for head in heads),
+        'obj_prep': lambda: build.obj2prep.items(),
+    }
+    return Edges.from_pairs(mappings[feature], max_node)
+
+def sem_set(build):
+    '''
+    Yields (node, value) for the prep sem_set
+    feature, in node order; quant overrides prep.
+    '''
+    preps, quants = build.sets['prep'], build.sets['quant']
+    for node in preps | quants:
+        yield node, 'quant' if node in quants else 'prep'
+
+def metadata(version):
+    '''
+    Returns the metadata needed to write the features.
+    '''
+    return {
+
+    '': {'created_by': 'Cody Kingham',
+         'coreData': 'BHSA',
+         'coreVersion': version,
+         'source': 'see the creation notebooks at https://github.com/etcbc/heads'},
+
+    'head' : {'valueType': 'int',
+              'edgeValues': False},
+
+    'obj_prep': {'valueType': 'int',
+                'edgeValues': False},
+
+    'nhead': {'valueType': 'int',
+              'edgeValues': False},
+
+    'sem_set':{'valueType':'str'},
+
+    }
+
+def spec(nodes):
+    '''
+    Returns the TF spec of sorted nodes,
+    e.g. 1-3,7 for 1, 2, 3, 7.
+    '''
+    ranges = []
+    for node in nodes:
+        if ranges and node == ranges[-1][1] + 1:
+            ranges[-1][1] = node
+        else:
+            ranges.append([node, node])
+    return ','.join(str(start) if start == end else f'{start}-{end}' for start, end in ranges)
+
+def tf_value(value):
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+def header(feature, meta):
+    '''
+    Yields the header lines of a TF feature file.
+    '''
+    yield '@edge\n' if feature != 'sem_set' else '@node\n'
+    for key, value in sorted(meta.items()):
+        if key != 'edgeValues':
+            yield f'@{key}={value}\n'
+    yield '@writtenBy=heads\n'
+    written = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0, tzinfo=None)
+    yield f'@dateWritten={written.isoformat()}Z\n'
+    yield '\n'
+
+def lines(build, feature):
+    '''
+    Yields the data lines of a feature; a node
+    is left out when it follows the previous one.
+    '''
+    if feature == 'sem_set':
+        data = ((node, tf_value(value)) for node, value in sem_set(build))
+    else:
+        data = ((node, spec(targets)) for node, targets in edges(build, feature).items())
+    implicit = 1
+    for node, value in data:
+        yield f'{value}\n' if node == implicit else f'{node}\t{value}\n'
+        implicit = node + 1
+
+def write_feature(build, feature, directory, compress=False):
+    '''
+    Writes one feature to directory/feature.tf,
+    and also to feature.tf.gz if compress is set.
+    '''
+    meta = {**metadata(build.version)[''], **metadata(build.version)[feature]}
+    path = os.path.join(directory, f'{feature}.tf')
+    outfiles = [open(path, 'w')]
+    if compress:
+        outfiles.append(gzip.open(f'{path}.gz', 'wt'))
+    try:
+        for line in header(feature, meta):
+            for outfile in outfiles:
+                outfile.write(line)
+        for line in lines(build, feature):
+            for outfile in outfiles:
+                outfile.write(line)
+    finally:
+        for outfile in outfiles:
+            outfile.close()
+
+# the build inherited by forked export workers
+_worker_build = None
+
+def _worker_write(feature, directory, compress):
+    write_feature(_worker_build, feature, directory, compress)
+
+def save(build, location='tf', compress=False):
+    '''
+    Writes the features into location/version.
+    '''
+    global _worker_build
+    directory = os.path.join(os.path.expanduser(location), build.version)
+    os.makedirs(directory, exist_ok=True)
+
+    if build.workers < 2:
+        for feature in FEATURES:
+            write_feature(build, feature, directory, compress)
+    else:
+        _worker_build = build
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(min(build.workers, len(FEATURES))) as pool:
+                pool.starmap(_worker_write, [(feature, directory, compress) for feature in FEATURES])
+        finally:
+            _worker_build = None
+    build.report(f'BHSA {build.version} EXPORT COMPLETE!')
@@ -0,0 +1,141 @@
+'''
+Bulk lookups on the heads features.
+
+`HeadsIndex` memory maps the arrays written by `heads.arrays`
+with NumPy, and looks up many nodes at once. It needs neither
+Text-Fabric nor the BHSA, only the `arrays` folder of a version.
+
+Lookups which may give several nodes per node return `Groups`:
+the targets of all the nodes in one array, and an offsets array
+such that the targets of nodes[i] are targets[offsets[i]:offsets[i+1]].
+
+    index = HeadsIndex('tf/2021/arrays')
+    groups = index.heads(phrases)
+    preps = index.filter(words, 'prep')
+    objects = index.objects(preps)
+'''
+
+import os
+import json
+from collections import namedtuple
+
+import numpy as np
+
+from heads.arrays import FORMAT
+
+Groups = namedtuple('Groups', ('offsets', 'targets'))
+
+def gather(offsets, targets, nodes):
+    '''
+    Returns the Groups of targets of nodes in CSR arrays.
+    Nodes outside of the arrays have no targets.
+    '''
+    nodes = np.asarray(nodes, dtype=np.int64)
+    known = (nodes > 0) & (nodes < len(offsets) - 1)
+    nodes = np.where(known, nodes, 0)
+    starts = np.where(known, offsets[nodes], 0).astype(np.int64)
+    counts = np.where(known, offsets[nodes + 1], 0) - starts
+
+    group_offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+    np.cumsum(counts, out=group_offsets[1:])
+    positions = np.repeat(starts - group_offsets[:-1], counts) + np.arange(group_offsets[-1])
+    return Groups(group_offsets, np.asarray(targets)[positions])
+
+class HeadsIndex:
+    '''
+    Bulk lookups on the head, nhead,
+    obj_prep, and sem_set features.
+    '''
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'heads.json')) as infile:
+            self.manifest = json.load(infile)
+        if self.manifest['format'] != FORMAT:
+            raise Exception(f"arrays of format {self.manifest['format']} cannot be read, expected {FORMAT}")
+        self.directory = directory
+        self.arrays = {}
+        self.version = self.manifest['version']
+        self.sem_set_values = self.manifest['nodes']['sem_set']
+        self.sem_set_codes = self.array('sem_set.codes')
+
+    def array(self, name):
+        '''
+        Returns an array, memory mapped when first used.
+        '''
+        if name not in self.arrays:
+            self.arrays[name] = np.load(os.path.join(self.directory, f'{name}.npy'), mmap_mode='r')
+        return self.arrays[name]
+
+    def edges(self, feature, nodes, inverse=False):
+        '''
+        Returns the Groups of an edge feature for nodes,
+        like E.feature.f, or E.feature.t if inverse.
+        '''
+        name = f'{feature}.inv' if inverse else feature
+        return gather(self.array(f'{name}.offsets'), self.array(f'{name}.targets'), nodes)
+
+    def heads(self, phrases):
+        '''
+        Returns the Groups of head words of phrases.
+        '''
+        return self.edges('head', phrases, inverse=True)
+
+    def nheads(self, phrases):
+        '''
+        Returns the Groups of nominal head words of phrases.
+        '''
+        return self.edges('nhead', phrases, inverse=True)
+
+    def phrases(self, heads, nominal=False):
+        '''
+        Returns the Groups of phrases that words are the
+        head of, or the nominal head of if nominal.
+        '''
+        return self.edges('nhead' if nominal else 'head', heads)
+
+    def objects(self, preps):
+        '''
+        Returns the Groups of objects of prepositions.
+        '''
+        return self.edges('obj_prep', preps, inverse=True)
+
+    def preps(self, objects):
+        '''
+        Returns the preposition of each object,
+        or 0 for nodes that are not an object.
+        '''
+        groups = self.edges('obj_prep', objects)
+        preps = np.zeros(len(groups.offsets) - 1, dtype=groups.targets.dtype)
+        has_prep = np.diff(groups.offsets) > 0
+        preps[has_prep] = groups.targets[groups.offsets[:-1][has_prep]]
+        return preps
+
+    def sem_set(self, nodes):
+        '''
+        Returns the sem_set value of each node,
+        None for nodes without one.
+        '''
+        nodes = np.asarray(nodes, dtype=np.int64)
+        codes = np.zeros(len(nodes), dtype=np.uint8)
+        known = (nodes > 0) & (nodes < len(self.sem_set_codes))
+        codes[known] = self.sem_set_codes[nodes[known]]
+        return np.array(self.sem_set_values, dtype=object)[codes]
+
+    def filter(self, nodes, value):
+        '''
+        Returns the nodes with a sem_set value, e.g. prep.
+        '''
+        if value not in self.sem_set_values[1:]:
+            return np.zeros(0, dtype=np.int64)
+        nodes = np.asarray(nodes, dtype=np.int64)
+        known = (nodes > 0) & (nodes < len(self.sem_set_codes))
+        code = self.sem_set_values.index(value)
+        return nodes[known][self.sem_set_codes[nodes[known]] == code]
+
+    def nodes(self, value):
+        '''
+        Returns all nodes with a sem_set value, like F.sem_set.s.
+        '''
+        if value not in self.sem_set_values[1:]:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.sem_set_codes == self.sem_set_values.index(value))
@@ -0,0 +1,118 @@
+'''
+`iphrase_atom` (independent phrase atom)
+
+Phrase atoms can exist within a chain of other
+coordinate phrase atoms, which itself may begin with
+a dependent element. By definition, a head is not a
+dependent element. So only phrase atoms in independent
+chains are allowed. This requires a check
+down the phrase atom chain to ensure all relations
+are independent.
+
+Some phrase atoms are marked as `Spec` (specification)
+though they mirror their mother word-for-word. These
+are treated as `Para` and also added to the set.
+'''
+
+from heads.nodeset import NodeSet
+from heads.tokens import token_index
+
+# the custom sets made by this stage
+# and the stages they are made from
+SETS = ('iphrase_atom',)
+REQUIRES = ()
+
+class ParaChains:
+    '''
+    An index of phrase_atom parallel chains.
+
+    Every node with `rela=Para` is resolved to the root of its
+    chain, i.e. the first mother up the chain without `rela=Para`.
+    The chains are climbed iteratively in one pass, and each
+    node on a climbed path is given the same root, so that
+    shared chain suffixes are only climbed once.
+    '''
+
+    def __init__(self, api):
+        F, E = api.F, api.E
+        self.api = api
+        self.roots = {}
+
+        for pa in F.rela.s('Para'):
+            path = []
+            node = pa
+            while node not in self.roots:
+                path.append(node)
+                mother = E.mother.f(node)[0]
+                # a chain looping back on itself ends where it loops
+                if F.rela.v(mother) != 'Para' or mother in path:
+                    root = mother
+                    break
+                node = mother
+            else:
+                root = self.roots[node]
+            for node in path:
+                self.roots[node] = root
+
+    def root(self, node):
+        '''
+        Returns the root of the chain of a Para node,
+        or the node itself when it is not in a chain.
+        '''
+        return self.roots.get(node, node)
+
+    def relas(self, node):
+        '''
+        Returns the relations of the mothers up the
+        chain of a Para node, as climb_pa_chain did.
+        '''
+        if node not in self.roots:
+            return set()
+        root = self.roots[node]
+        relas = {self.api.F.rela.v(root)}
+        if self.api.E.mother.f(node)[0] != root:
+            relas.add('Para')
+        return relas
+
+    def independent(self, node):
+        '''
+        Tells whether a Para node is in an independent chain:
+        only allowable relas are NA and Para, so the root must be NA.
+        '''
+        return not self.relas(node) - {'NA', 'Para'}
+
+def para_chains(build):
+    '''
+    Returns the parallel chain index of a build,
+    making it when it is first needed.
+    '''
+    if build.para_chains is None:
+        build.para_chains = ParaChains(build.api)
+    return build.para_chains
+
+def spec_parallels(build):
+    '''
+    Returns (mother, daughters) tuples for phrase
+    atoms with an adjacent `Spec` daughter that is
+    identical to the mother.
+    '''
+    return token_index(build).mirrored_daughters('phrase_atom', 'Spec')
+
+def run(build):
+    api = build.api
+    F = api.F
+
+    # select iphrase_atoms with the relations of their parallel chains:
+    chains = para_chains(build)
+    independent_phrasea = [pa for pa in F.otype.s('phrase_atom') if F.rela.v(pa) == 'NA']
+    independent_phrasea.extend(pa for pa in F.rela.s('Para') if chains.independent(pa))
+
+    iphrase_atom = NodeSet.of_type(api, 'phrase_atom', independent_phrasea)
+
+    # the second phrase atom of a Spec parallel is treated as Para
+    for para_data in spec_parallels(build):
+        para = para_data[1][0]
+        iphrase_atom.add(para)
+
+    build.sets['iphrase_atom'] = iphrase_atom
+    build.report(f'\t{len(iphrase_atom)} independent phrase atoms ready...')
@@ -0,0 +1,67 @@
+'''
+`nhead` (nominal head)
+
+In many cases one does not want to go through prepositions to
+reach the nominal head elements (i.e. independent substantive,
+adjective, etc.) in a phrase. The `nhead` feature ignores any
+prepositions and selects the nominal elements from the phrase
+and phrase atoms. It is built up using `phrase2heads` and
+`prep2obj`.
+
+NB: this feature does not select nominals that are embedded within
+an adjective phrase (`AdjP`).
+'''
+
+from heads.edges import Edges
+
+def prep_nominals(prep2obj, preps, max_node):
+    '''
+    Returns a dict of every preposition with objects
+    to the nominals that it ultimately governs.
+
+    Prepositional chains are followed through the
+    prep2obj edges: an object that is a preposition
+    passes on the nominals of its own objects. An object
+    always comes after its preposition, so the prepositions
+    are resolved from the last to the first, and every
+    sub-chain is resolved once for all chains it ends.
+    '''
+    edges = Edges.from_pairs(lambda: ((prep, obj) for prep, objs in prep2obj.items()
+                                         for obj in objs), max_node)
+    nominals = {}
+    for prep in sorted(prep2obj, reverse=True):
+        resolved = set()
+        for obj in edges.f(prep):
+            if obj not in preps:
+                resolved.add(obj)
+            elif obj in nominals:
+                resolved |= nominals[obj]
+        nominals[prep] = frozenset(resolved)
+    return nominals
+
+def prep_nominal_index(build):
+    '''
+    Returns the prep_nominals of a build,
+    making them when they are first needed.
+    '''
+    if build.prep_nominals is None:
+        build.prep_nominals = prep_nominals(build.prep2obj, build.sets['prep'],
+                                            build.api.F.otype.maxNode)
+    return build.prep_nominals
+
+def run(build):
+    preps = build.sets['prep']
+    nheads = build.nheads
+    nominals = prep_nominal_index(build)
+
+    for phrase, heads in build.phrase2heads.items():
+        for head in heads:
+            if head not in preps:
+                nheads[phrase].add(head)
+            elif nominals.get(head):
+                nheads[phrase] |= nominals[head]
+            else:
+                nheads[phrase].add(head) # added 22.03.19: keep nhead feature for preps without objects
+
+    build.report(f'\t{len(nheads)} nheads assigned...')
+    build.report(f'\t{len(build.phrase2heads)-len(nheads)} phrases not assigned an nhead...')
@@ -0,0 +1,135 @@
+'''
+A bitmap set of nodes.
+
+The custom word sets cover a large part of the corpus, and their
+complements (`nonprep`, `nonquant`, `iword`, etc.) cover nearly
+all of it. As Python sets of ints those take tens of MB each.
+A `NodeSet` keeps one bit per node of an object type instead,
+over the contiguous node range TF gives each type. A complement
+is a bitmap of its own, made by inverting the bytes of the set
+at once, so TF iterates over it as over any other set.
+
+NodeSets support `in`, iteration, `len`, `|`, `&`, `-`, and `~`,
+and can be passed as custom sets to TF search, which only
+iterates over them. The number of nodes is counted once
+and kept until the set is changed.
+'''
+
+# the bit positions set in each byte value
+_BITS = tuple(tuple(i for i in range(8) if byte >> i & 1) for byte in range(256))
+
+# the inverse of each byte value, for bytes.translate
+_INVERSE = bytes(255 - byte for byte in range(256))
+
+class NodeSet:
+    '''
+    A set of nodes within first..last,
+    stored as a little-endian bitmap.
+    '''
+
+    __slots__ = ('first', 'last', 'bits', 'count')
+
+    def __init__(self, first, last, nodes=(), bits=None):
+        self.first = first
+        self.last = last
+        self.bits = bytearray((last - first + 8) >> 3) if bits is None else bits
+        self.count = None
+        for node in nodes:
+            self.add(node)
+
+    @classmethod
+    def of_type(cls, api, otype, nodes=()):
+        '''
+        Returns a NodeSet over the nodes of otype.
+        '''
+        first, last = api.F.otype.sInterval(otype)
+        return cls(first, last, nodes)
+
+    def like(self, nodes=()):
+        '''
+        Returns a new NodeSet over the same range.
+        '''
+        return NodeSet(self.first, self.last, nodes)
+
+    def add(self, node):
+        if not self.first <= node <= self.last:
+            raise ValueError(f'node {node} is outside of {self.first}..{self.last}')
+        i = node - self.first
+        self.bits[i >> 3] |= 1 << (i & 7)
+        self.count = None
+
+    def _value(self):
+        # the bitmap as an int
+        return int.from_bytes(self.bits, 'little')
+
+    def _from_value(self, value):
+        return NodeSet(self.first, self.last,
+                       bits=bytearray(value.to_bytes(len(self.bits), 'little')))
+
+    def _coerce(self, other):
+        if isinstance(other, NodeSet) and (other.first, other.last) == (self.first, self.last):
+            return other
+        return self.like(other)
+
+    def __contains__(self, node):
+        if not self.first <= node <= self.last:
+            return False
+        i = node - self.first
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def __iter__(self):
+        first = self.first
+        for i, byte in enumerate(self.bits):
+            if byte:
+                base = first + (i << 3)
+                for j in _BITS[byte]:
+                    yield base + j
+
+    def __len__(self):
+        if self.count is None:
+            self.count = bin(self._value()).count('1')
+        return self.count
+
+    def __bool__(self):
+        return len(self) != 0
+
+    def __invert__(self):
+        bits = self.bits.translate(_INVERSE)
+        # clear the bits past the last node
+        size = self.last - self.first + 1
+        if size & 7:
+            bits[-1] &= (1 << (size & 7)) - 1
+        return NodeSet(self.first, self.last, bits=bits)
+
+    def __or__(self, other):
+        return self._from_value(self._value() | self._coerce(other)._value())
+
+    def __and__(self, other):
+        if not isinstance(other, NodeSet):
+            return self.like(n for n in other if n in self)
+        return self._from_value(self._value() & self._coerce(other)._value())
+
+    def __sub__(self, other):
+        return self._from_value(self._value() & ~self._coerce(other)._value())
+
+    __ror__ = __or__
+    __rand__ = __and__
+
+    def __ior__(self, other):
+        value = self._value() | self._coerce(other)._value()
+        self.bits[:] = value.to_bytes(len(self.bits), 'little')
+        self.count = None
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, NodeSet) and (other.first, other.last) == (self.first, self.last):
+            return self._value() == other._value()
+        try:
+            return set(self) == set(other)
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'NodeSet({self.first}..{self.last}, {len(self)} nodes)'
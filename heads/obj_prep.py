@@ -0,0 +1,469 @@
+'''
+`obj_prep` (object of a preposition)
+
+An edge feature from the object of a preposition to its
+governing preposition. The object is a nominal element that is
+disambiguated from its quantifiers, so the nominal templates for
+the heads can be used with the single change that they search
+within a phrase atom after a preposition. This also covers `CP`
+phrases, which also have prepositional objects.
+'''
+
+from heads.quantifiers import quantlexs
+
+pp_obj_queries = {}
+
+PP_noqant = '''
+
+phrase_atom
+    prep prs=absent
+    < head:nonquant pdp#conj|art|prep|nega
+
+% either word is adjacent to prep
+    /with/
+    phrase_atom
+        prep
+        <: head
+
+% or word is adjacent to prep but interrupted by article
+    /or/
+    phrase_atom
+        prep
+        <: word pdp=art
+        <: head
+
+    /or/
+
+% or word is w1, an independent, non-modifying word
+% what follows is a long description for that situation
+
+    w1:word
+
+% exclude w1 uses as modifier
+    /with/
+    /without/
+    subphrase rela=adj|atr|mod|dem
+        w1
+    /-/
+    /or/
+    goodsp
+        w1
+    /-/
+    /with/
+    = iword
+    /-/
+
+% exclude w1 rec relations to non-prepositions
+    /without/
+    nonprep
+    <mother- subphrase rela=rec
+        w1
+    /-/
+
+% ensure w1 is not immediately preceded by a construct form
+    /without/
+    phrase_atom
+        nonprep st=c
+        <: w1
+    /-/
+
+
+% exclude cases where word occurs in a subphrase immediately before a preposition
+% only 1 case of this, but may be other edge cases this misses.
+    /without/
+    s1:subphrase
+        prep
+    s2:subphrase rela=par
+        w1
+        <: prep
+    s1 <mother- s2
+    /-/
+
+    w1 = head
+    /-/
+
+'''
+
+pp_obj_queries['PP_noqant'] = {'template': PP_noqant,
+                               'prepi': 1,
+                               'obji': 2}
+
+PP_quant_alone = f'''
+
+phrase_atom
+    prep prs=absent
+    < quantifier:quant
+
+% quantifier does not precede a quantified element within a subphrase
+    /without/
+    subphrase
+        quantifier
+        < w1:nonquantprep pdp=subs|adjv|advb|nmpr|prde|prps
+
+        /without/
+        = postprep
+        /-/
+
+        /without/
+        subphrase
+        /without/
+            quant
+        /-/
+            prep
+            < w1
+        /-/
+    /-/
+
+
+% quantifier not immediately adjacent to quantified element within a phrase_atom
+    /without/
+    phrase_atom
+        quantifier
+        <: w1:nonquantprep pdp=subs|nmpr|prde|prps
+    /-/
+    /without/
+    phrase_atom
+        quantifier
+        <: word pdp=art
+        <: w1:nonquantprep pdp=subs|nmpr|prde|prps
+    /-/
+    /without/
+    phrase_atom
+        w1:nonquantprep pdp=subs|nmpr|prde|prps
+        <: quantifier
+    /-/
+    /without/
+    phrase_atom
+        w1:nonquantprep pdp=subs|nmpr|prde|prps
+        <: word pdp=art
+        <: quantifier
+    /-/
+
+% quantifier is not construct with quantified element
+    /without/
+    quantifier
+    <mother- subphrase rela=rec
+        nonquantprep pdp=subs|adjv|advb|nmpr|prde|prps
+    /-/
+    /without/
+    phrase_atom
+        quantifier st=c
+        <: nonquantprep pdp=subs|adjv|advb|nmpr|prde|prps
+    /-/
+
+% quantifier is not in another relation with a quantified element
+    /without/
+    s1:subphrase
+        quantifier
+    s2:subphrase rela=adj|atr|dem
+        w1:nonquantprep pdp=subs|adjv|advb|nmpr|prde|prps
+        /without/
+        = postprep
+        /-/
+        /without/
+        subphrase
+        /without/
+            quant
+        /-/
+            < prep
+            w1
+        /-/
+
+    s1 <mother- s2
+    /-/
+
+% ensure quantifer is not in a quantifying chain
+    /without/
+    phrase_atom
+    /with/
+        s1:subphrase
+            nonprep pdp=subs|adjv|nmpr|prde|prps lex#{quantlexs} ls#card
+        s2:subphrase rela=adj|atr
+            word ls=card
+        s1 <mother- s2
+    /or/
+        s1:subphrase
+            word ls=card
+        s2:subphrase rela=adj|atr
+            w1:nonprep pdp=subs|adjv|nmpr|prde|prps lex#{quantlexs} ls#card
+            /without/
+            = postprep
+            /-/
+            /without/
+            subphrase
+            /without/
+                quant
+            /-/
+                < prep
+                w1
+            /-/
+        s1 <mother- s2
+    /-/
+        quantifier ls=card prs=absent
+    /-/
+
+% exclude uses as modifier:
+    /without/
+    subphrase rela=adj|atr|rec|mod|dem
+        quantifier
+        w1:word
+        /without/
+        = postprep
+        /-/
+        quantifier = w1
+    /-/
+    /with/
+    = iword
+    /-/
+'''
+
+pp_obj_queries['PP_quant_alone'] = {'template': PP_quant_alone,
+                                    'prepi': 1,
+                                    'obji': 2}
+
+PP_quantified = '''
+
+
+phrase_atom
+    prep prs=absent
+
+% ensure that word is quantified with a head-word quantifier
+% NB: what follows is a long chain of specs on quantifier
+
+    < quantifier:quant
+
+    /with/
+    phrase_atom
+        prep
+        <: quantifier
+    /or/
+
+% quantifier not used in rec relations to non-prepositions
+    /without/
+    nonprep
+    <mother- subphrase rela=rec
+        quantifier
+        w1:word
+        /without/
+        phrase_atom
+            prep
+            <: w1
+        /-/
+        /without/
+        phrase_atom
+            prep
+            <: word pdp=art
+            <: w1
+        /-/
+        w1 = quantifier
+    /-/
+
+% quantifier not used in adj relations to non-quantifiers
+    /without/
+    subphrase
+    /with/
+        nonquant pdp#conj|art
+    /-/
+    <mother- subphrase rela=adj
+        quantifier
+        w1:word
+        /without/
+        = afterprep
+        /-/
+        w1 = quantifier
+    /-/
+    /-/
+
+% ------------------------------
+% NB: what follows is a long chain of specs on head
+
+% require adjacency to quantifier
+    <1: subphrase
+        head:nonquant pdp=subs|adjv|advb|nmpr|prde|prps
+
+        /with/
+        phrase_atom
+            prep
+            <: quant
+            <: head
+
+        /or/
+        phrase_atom
+            prep
+            <: quant
+            <: word pdp=art
+            <: head
+
+        /or/
+
+% quantified word is not a dependent modifier
+% exclude construct state to non quants/preps
+        /without/
+        nonquantprep st=c
+        <: head
+        /-/
+        /without/
+        nonquantprep st=c
+        <: word pdp=art
+        <: head
+        /-/
+
+% iword requirements
+        /with/
+        = iword
+        /or/
+        quant
+        <: head
+        /or/
+        quant
+        <: word pdp=art
+        <: head
+        /or/
+        head
+        <: quant
+        /-/
+
+% exclude non-quant/prep rec relas
+        /without/
+        nonquantprep
+        <mother- subphrase rela=rec
+            head
+        /-/
+
+% exclude non-quant para rec relas
+        /without/
+        nonquantprep
+        <mother- subphrase rela=rec
+        <mother- subphrase rela=par
+            head
+        /-/
+
+% exclude non-quant adjunct relas
+        /without/
+        subphrase
+        /without/
+            := quant
+        /-/
+        <mother- subphrase rela=adj
+            head
+        /-/
+
+% exclude non-quant para adjunct relas
+        /without/
+        subphrase
+        /without/
+            := quant
+        /-/
+        <mother- subphrase rela=adj
+        <mother- subphrase rela=par
+            head
+        /-/
+
+% exclude demonstrative relas when demonstrative points to subphrase with words other than quantifiers
+        /without/
+        subphrase
+        /with/
+            nonquant pdp#art|conj
+        /-/
+        <mother- subphrase rela=dem
+            head
+        /-/
+
+% exclude all other kinds of relations
+        /without/
+        subphrase rela=atr|mod
+            head
+        /-/
+        /-/
+'''
+
+pp_obj_queries['PP_quantified'] = {'template': PP_quantified,
+                                   'prepi': 1,
+                                   'obji': 4}
+
+special_quantified = '''
+
+% necessary due to technical limitation in search patterns
+phrase_atom
+    prep
+    <: quant
+    <: nonquant pdp=subs|adjv|advb|nmpr|prde|prps
+'''
+pp_obj_queries['special_quantified'] = {'template': special_quantified,
+                                        'prepi': 1,
+                                        'obji': 3}
+
+PP_to_PP = '''
+
+phrase_atom
+    prep
+    <: prep
+'''
+
+pp_obj_queries['PP_to_PP'] = {'template': PP_to_PP,
+                              'prepi': 1,
+                              'obji': 2}
+
+PP_to_conj = '''
+
+phrase_atom
+    prep
+    <: w:word pdp=conj
+
+    /with/
+    phrase_atom typ=CP
+        w
+    /or/
+    lex=C|>CR
+    /-/
+'''
+
+pp_obj_queries['PP_to_conj'] = {'template': PP_to_conj,
+                                'prepi': 1,
+                                'obji': 2}
+
+PP_negation = '''
+
+pa:phrase_atom
+    pp:prep
+    neg:word pdp=nega
+
+pa =: pp
+pa := neg
+pp # neg
+'''
+pp_obj_queries['PP_negation'] = {'template': PP_negation,
+                                'prepi': 1,
+                                'obji': 2}
+
+def find_objects(build, queries):
+    '''
+    Runs the object queries and maps
+    each object to its preposition.
+    '''
+    preps = build.sets['prep']
+    obj2prep = build.obj2prep
+    prep2obj = build.prep2obj
+
+    rules = [(name, query['template'], (query['obji'],))
+                for name, query in queries.items()]
+    all_results = build.search_rules('obj_prep', rules)
+
+    for name, results in zip(queries, all_results):
+        build.report(f'\t{len(results)} results found for {name}')
+        for obj, in results:
+            # back up one slot until a preposition is found
+            prep = None
+            cur_slot = obj
+            while not prep:
+                cur_slot -= 1
+                if cur_slot in preps:
+                    prep = cur_slot
+
+            obj2prep[obj] = prep
+            prep2obj[prep].add(obj)
+            build.obj_rules[obj] = name
+
+def run(build):
+    find_objects(build, pp_obj_queries)
+    build.report(f'\t{len(build.obj2prep)} object of preposition mappings...')
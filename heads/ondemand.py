@@ -0,0 +1,125 @@
+'''
+Heads of a few phrases at a time.
+
+A build searches every template over the whole corpus. To get the
+heads of one verse, e.g. after its data was edited, `heads_for`
+runs the production line on the phrases of some nodes only:
+
+    • every atom of the templates is limited to the nodes of
+      the phrases: custom sets named `phrase`, `phrase_atom`,
+      `subphrase` and `word` hold those of the phrases, and
+      take the place of the object types, and every custom set
+      of the build is cut down to the nodes of the phrases
+    • only the head templates whose `typ` matches one of the
+      phrases are run; the native types are resolved from the
+      phrases directly
+    • the object templates are only run if the phrase atoms
+      of the phrases have a preposition
+    • the nominal heads are made from the results of both
+
+The templates never leave the phrase their first atom is in, so
+this gives the heads that a full build gives those phrases.
+
+The custom word sets are taken from a Build whose set stages have
+run, which `prepare` loads from the cache. The results are kept
+in a Build of their own, so the given build is left as it was.
+'''
+
+import re
+
+from heads import phrase_heads, obj_prep, nhead
+from heads.pipeline import Build, STAGES
+from heads.coverage import Coverage
+
+# the object types that the templates search,
+# from the phrase down
+OTYPES = ('phrase', 'phrase_atom', 'subphrase', 'word')
+
+# the phrase types a head template applies to
+typ_re = re.compile(r'^phrase typ=([\w|]+)', re.M)
+
+def prepare(A, version, cache=None):
+    '''
+    Returns a Build with the custom sets,
+    loaded from the cache when it has them.
+    '''
+    stages = [name for name, stage in STAGES if hasattr(stage, 'SETS')]
+    return Build(A, version, cache=cache).run(stages)
+
+def target_sets(build, phrases):
+    '''
+    Returns custom sets of the nodes of phrases by
+    object type, and the custom sets of the build
+    limited to those nodes.
+    '''
+    L = build.api.L
+    sets = {'phrase': set(phrases)}
+    for otype in OTYPES[1:]:
+        sets[otype] = {node for phrase in phrases for node in L.d(phrase, otype)}
+    nodes = set().union(*sets.values())
+    for name in build.sets:
+        if name not in sets:
+            build_set = build.sets[name]
+            sets[name] = {node for node in nodes if node in build_set}
+    return sets
+
+def phrases_of(api, nodes):
+    '''
+    Returns the phrases of nodes: the phrases themselves,
+    the phrases that embed phrase atoms, subphrases and
+    words, and the phrases embedded in anything bigger.
+    '''
+    F, L = api.F, api.L
+    phrases = set()
+    for node in nodes:
+        otype = F.otype.v(node)
+        if otype == 'phrase':
+            phrases.add(node)
+        elif otype in ('phrase_atom', 'subphrase', 'word'):
+            phrases.update(L.u(node, 'phrase'))
+        else:
+            phrases.update(L.d(node, 'phrase'))
+    return phrases
+
+def section_nodes(api, start, end=None):
+    '''
+    Returns the section nodes from start up to end,
+    e.g. from ('Genesis', 1, 1) to ('Genesis', 1, 5).
+    Both sections must be of the same level.
+    '''
+    first = api.T.nodeFromSection(start)
+    last = first if end is None else api.T.nodeFromSection(end)
+    if first is None or last is None:
+        raise Exception(f'no section {start if first is None else end}')
+    return range(first, last + 1)
+
+def heads_for(build, nodes):
+    '''
+    Returns a Build with the heads, objects of
+    prepositions, and nominal heads of the phrases
+    of nodes in its phrase2heads, obj2prep, prep2obj
+    and nheads.
+
+    build - a Build with the custom sets, see prepare
+    '''
+    F = build.api.F
+    phrases = phrases_of(build.api, nodes)
+    types = {F.typ.v(phrase) for phrase in phrases}
+
+    part = Build(build.A, build.version, silent=build.silent)
+    part.sets = target_sets(build, phrases)
+    part.coverage = Coverage(build.api, phrases)
+
+    querydicts = []
+    for querydict, phrasei, headi in phrase_heads.HEAD_QUERIES:
+        queries = {name: template for name, template in querydict.items()
+                      if types & set(typ_re.search(template).group(1).split('|'))}
+        if queries:
+            querydicts.append((queries, phrasei, headi))
+    phrase_heads.query_heads(part, querydicts, phrases)
+
+    if part.sets['prep']:
+        obj_prep.find_objects(part, obj_prep.pp_obj_queries)
+
+    nhead.run(part)
+    return part
@@ -0,0 +1,656 @@
+'''
+Per-type head queries
+
+The heads are selected by a process of deduction: the templates
+below are run for each phrase type, and each result is recorded
+as a (phrase, head) pair with `Build.record_head`.
+
+The simple phrase types contain little more than their head word.
+The VP, CP, AdjP, AdvP, and PP can contain a bigger variety of
+relationships. In contrast, the noun phrase is much more complicated
+for head selection due to the presence of quantifiers. The search
+templates are thus quite lengthy.
+'''
+
+from heads.coverage import Coverage
+
+# -- simple heads --
+
+simp_heads = dict(
+
+PPrP = '''
+% personal pronoun
+
+phrase typ=PPrP
+    iphrase_atom
+        iword pdp=prps
+
+''',
+
+DPrP = '''
+% demonstrative pronoun
+
+phrase typ=DPrP
+    iphrase_atom
+        iword pdp=prde
+
+''',
+
+InjP = '''
+% interjectional
+
+phrase typ=InjP
+    iphrase_atom
+        iword pdp=intj
+
+''',
+
+NegP = '''
+% negative
+
+phrase typ=NegP
+    iphrase_atom
+        iword pdp=nega
+
+''',
+
+InrP = '''
+% interrogative
+
+phrase typ=InrP
+    iphrase_atom
+        iword pdp=inrg
+
+''',
+
+IPrP = '''
+% interrogative pronoun
+
+phrase typ=IPrP
+    iphrase_atom
+        iword pdp=prin
+
+''',
+
+) # end of dictionary
+
+
+# -- mostly simple heads --
+
+# excludes the one VP with more than one verb, without
+# ignoring VP's that do not necessarily begin with a verb
+VP = '''
+
+phrase typ=VP
+
+    head:iword pdp=verb
+
+    /without/
+    phrase
+        word pdp=verb
+        < head
+    /-/
+
+'''
+
+
+# conjunctions headed by a preposition, such as בטרם and בעבור,
+# take the preposition as their head
+cp_heads = dict(
+
+conj = '''
+
+phrase typ=CP
+/without/
+    word pdp=prep
+/-/
+    iphrase_atom
+        head:iword pdp=conj
+        /without/
+        phrase_atom
+            word pdp=conj
+            <: head
+        /-/
+
+''',
+
+prep_conj = '''
+
+phrase typ=CP
+    iphrase_atom
+        =: word pdp=prep
+
+'''
+
+)
+
+AdjP = '''
+
+phrase typ=AdjP
+    iphrase_atom
+        head:iword pdp=adjv|subs|advb
+
+% require either NA subphrase relation
+% or no subphrase embedding:
+        /with/
+        subphrase rela=NA|par
+            head
+        /or/
+        /without/
+        subphrase
+            head
+        /-/
+        /-/
+
+% exclude uses as modifier:
+        /without/
+        = modword
+        /-/
+
+% ensure word is not immediately preceded by a construct form
+        /without/
+        = postconstr
+        /-/
+'''
+
+
+AdvP = '''
+
+phrase typ=AdvP
+    iphrase_atom
+        head:iword pdp=advb|subs|nmpr|prep
+
+% require either NA subphrase relation
+% or no subphrase embedding:
+        /with/
+        subphrase rela=NA|par
+            head
+        /or/
+        /without/
+        subphrase
+            head
+        /-/
+        /-/
+
+% exclude uses as modifier:
+        /without/
+        = modword
+        /-/
+
+% ensure word is not immediately preceded by a construct form
+        /without/
+        = postconstr
+        /-/
+
+% ensure word is not immediately preceded by a prepositional form
+        /without/
+        = postpdpprep
+        /-/
+'''
+
+
+PP = '''
+
+phrase typ=PP
+    iphrase_atom
+        head:iword pdp=prep
+
+% require either NA subphrase relation
+% or no subphrase embedding:
+        /with/
+        subphrase rela=NA|par
+            head
+        /or/
+        /without/
+        subphrase
+            head
+        /-/
+        /or/
+        goodsp
+            head
+        /-/
+
+% exclude uses as modifier:
+        /with/
+        /without/
+        = modword
+        /-/
+        /or/
+        goodsp
+            head
+        /-/
+
+% ensure word is not immediately preceded by a construct form
+        /without/
+        = postconstr
+        /-/
+
+% ensure word is not immediately preceded by a preposition
+        /without/
+        = postpdpprep
+        /-/
+'''
+
+
+# -- complex heads --
+
+NP_heads = dict(
+
+NP_noqant = '''
+
+phrase typ=NP|PrNP|DPrP|PPrP
+    iphrase_atom
+        head:nonquant pdp=subs|adjv|nmpr|prde|prps
+
+% require either NA subphrase relation
+% or no subphrase embedding:
+        /with/
+        subphrase rela=NA|par
+            head
+        /or/
+        /without/
+        subphrase
+            head
+        /-/
+        /-/
+        /with/
+        = iword
+        /-/
+
+% exclude uses as modifier:
+        /without/
+        = modword
+        /-/
+
+% ensure word is not immediately preceded by a construct form
+        /without/
+        = postconstr
+        /-/
+
+% ensure word is not immediately preceded by a verb (participle) + preposition
+        /without/
+        phrase_atom
+            word sp=verb
+            <: prep
+            <: head
+        /-/
+        /without/
+        phrase_atom
+            word sp=verb
+            <: prep
+            <: word pdp=art
+            <: head
+        /-/
+''',
+
+NP_quant_alone = '''
+
+phrase typ=NP|PrNP|DPrP|PPrP
+    iphrase_atom
+        quantifier:quant
+
+% quantifier does not precede a quantified element within a subphrase
+        /without/
+        subphrase
+            quantifier
+            < w1:nonquantprep pdp=adjv|subs|nmpr|prde|prps
+            /with/
+            = nonpostprep
+            /-/
+        /-/
+
+% quantifier not immediately adjacent to quantified element within a phrase_atom
+        /without/
+        phrase_atom
+            quantifier
+            <: w1:nonquantprep pdp=subs|nmpr|prde|prps
+        /-/
+        /without/
+        phrase_atom
+            quantifier
+            <: word pdp=art
+            <: w1:nonquantprep pdp=subs|nmpr|prde|prps
+        /-/
+        /without/
+        phrase_atom
+            w1:nonquantprep pdp=subs|nmpr|prde|prps
+            <: quantifier
+        /-/
+        /without/
+        phrase_atom
+            w1:nonquantprep pdp=subs|nmpr|prde|prps
+            <: word pdp=art
+            <: quantifier
+        /-/
+
+
+% quantifier is not construct with quantified element
+        /without/
+        quantifier
+        <mother- subphrase rela=rec
+            nonquantprep pdp=subs|nmpr|prde|prps
+        /-/
+        /without/
+        phrase_atom
+            quantifier st=c
+            <: nonquantprep pdp=subs|nmpr|prde|prps
+        /-/
+
+% quantifier is not in another relation with a quantified element
+        /without/
+        s1:subphrase
+            quantifier
+        s2:subphrase rela=adj|atr|dem
+            w1:nonquantprep pdp=subs|nmpr|prde|prps
+            /with/
+            = nonpostprep
+            /-/
+% exclude cases where a prepositional object occurs non-adjacently
+            /without/
+            subphrase
+            /without/
+                quant
+            /-/
+                =: prep
+                w1
+            /-/
+        s1 <mother- s2
+        /-/
+
+% ensure quantifer is not in a quantifying chain
+% there are numerous possible relations
+        /without/
+        phrase
+            phrase_atom rela=NA|Para
+            /with/
+                s1:subphrase
+                    nonquantprep pdp=subs|nmpr|prde|prps
+                s2:subphrase rela=adj|atr
+                    word ls=card
+                s1 <mother- s2
+            /or/
+                s1:subphrase
+                    word ls=card
+                s2:subphrase rela=adj|atr
+                    nonquantprep pdp=subs|nmpr|prde|prps
+                    /with/
+                    = nonpostprep
+                    /-/
+                s1 <mother- s2
+            /or/
+                word ls=card
+                <mother- subphrase rela=rec
+                    nonquantprep pdp=subs|nmpr|prde|prps
+            /or/
+                nonquantprep pdp=subs|nmpr|prde|prps
+                <mother- subphrase rela=rec
+                    word ls=card
+            /or/
+                nonquantprep pdp=subs|nmpr|prde|prps st=c
+                <: word ls=card
+            /-/
+% quantifier is either a cardinal number of BN/ in chain
+            w1:word
+            /with/
+            ls=card prs=absent
+            /or/
+            lex=BN/ prs=absent
+            /-/
+
+            quantifier = w1
+        /-/
+
+% exclude uses as modifier:
+        /without/
+        = modword
+        /-/
+        /with/
+        = iword
+        /-/
+''',)
+
+NP_complex = dict(NP_quantified = '''
+
+phrase typ=NP|PrNP|DPrP|PPrP
+    iphrase_atom
+
+% ensure that word is quantified with a head-word quantifier
+% NB: what follows is a long chain of specs on quantifier
+
+        quantifier:quant
+
+% quantifier not used in rec relations to non-prepositions
+        /without/
+        nonprep
+        <mother- subphrase rela=rec
+            quantifier
+            w1:word
+            /without/
+            phrase_atom
+                prep
+                <: w1
+            /-/
+            /without/
+            phrase_atom
+                prep
+                <: word pdp=art
+                <: w1
+            /-/
+            w1 = quantifier
+        /-/
+
+% quantifier not used in adj relations to non-quantifiers
+        /without/
+        subphrase
+        /with/
+            nonquant pdp#conj|art
+        /-/
+        <mother- subphrase rela=adj
+            quantifier
+        /-/
+
+% ------------------------------
+% NB: what follows is a long chain of specs on head
+
+% require adjacency to quantifier
+        <1: subphrase
+            head:nonquant pdp=subs|adjv|advb|nmpr|prde|prps
+
+% quantified word is not a dependent modifier
+% exclude non-quant construct state
+            /without/
+            nonquant st=c
+            <: head
+            /-/
+            /without/
+            nonquant st=c
+            <: word pdp=art
+            <: head
+            /-/
+
+% exclude non-quant rec relas
+            /without/
+            nonquantprep
+            <mother- subphrase rela=rec
+                head
+            /-/
+
+% exclude non-quant para rec relas
+            /without/
+            nonquantprep
+            <mother- subphrase rela=rec
+            <mother- subphrase rela=par
+                head
+            /-/
+
+% exclude non-quant adjunct relas
+            /without/
+            subphrase
+            /without/
+                := quant
+            /-/
+            <mother- subphrase rela=adj
+                head
+            /-/
+
+% exclude non-quant para adjunct relas
+            /without/
+            subphrase
+            /without/
+                := quant
+            /-/
+            <mother- subphrase rela=adj
+            <mother- subphrase rela=par
+                head
+            /-/
+
+% exclude demonstrative relas when demonstrative points to subphrase with words other than quantifiers
+            /without/
+            subphrase
+            /with/
+                nonquant pdp#art|conj
+            /-/
+            <mother- subphrase rela=dem
+                head
+            /-/
+
+% exclude all other kinds of relations
+            /without/
+            subphrase rela=atr|mod
+                head
+            /-/
+            /with/
+            = iword
+            /or/
+            quant
+            <: head
+            /or/
+            quant
+            <: word pdp=art
+            <: head
+            /or/
+            head
+            <: quant
+            /-/
+
+% exclude words with immediately preceding prepositions
+            /without/
+            = afterprep
+            /-/
+            /without/
+            = afterprepart
+            /-/
+''',)
+
+
+# (querydict, phrasei, headi) in the order they are run;
+# phrasei and headi are the indices of the phrase and head
+# in the search results
+HEAD_QUERIES = (
+    (simp_heads, 0, 2),
+    (dict(VP=VP), 0, 1),
+    (cp_heads, 0, 2),
+    (dict(AdjP=AdjP), 0, 2),
+    (dict(AdvP=AdvP), 0, 2),
+    (dict(PP=PP), 0, 2),
+    (NP_heads, 0, 2),
+    (NP_complex, 0, 4),
+)
+
+# -- native heads --
+# The simple types and the VP are resolved without TF search,
+# by walking the words of their phrases directly. The templates
+# above remain the reference; with `Build.check` they are run
+# as well and the native heads must match them.
+
+# the pdp of the head of each type in simp_heads
+simp_pdps = dict(PPrP='prps', DPrP='prde', InjP='intj',
+                 NegP='nega', InrP='inrg', IPrP='prin')
+
+def simple_heads(build, phrasetype, phrases=None):
+    '''
+    Returns (phrase, head) tuples for the iwords with
+    the type's pdp in the iphrase_atoms of its phrases,
+    or of those among the given phrases.
+    '''
+    F, L = build.api.F, build.api.L
+    iphrase_atoms, iwords = build.sets['iphrase_atom'], build.sets['iword']
+    pdp = simp_pdps[phrasetype]
+    results = []
+    for phrase in F.typ.s(phrasetype) if phrases is None else phrases:
+        if F.otype.v(phrase) != 'phrase' or F.typ.v(phrase) != phrasetype:
+            continue
+        for phrase_atom in L.d(phrase, 'phrase_atom'):
+            if phrase_atom in iphrase_atoms:
+                results.extend((phrase, w) for w in L.d(phrase_atom, 'word')
+                                   if w in iwords and F.pdp.v(w) == pdp)
+    return results
+
+def verb_heads(build, phrasetype='VP', phrases=None):
+    '''
+    Returns (phrase, head) tuples for the first verb
+    of each VP, or of those among the given phrases,
+    if it is an iword.
+    '''
+    F, L = build.api.F, build.api.L
+    iwords = build.sets['iword']
+    results = []
+    for phrase in F.typ.s(phrasetype) if phrases is None else phrases:
+        if F.otype.v(phrase) != 'phrase' or F.typ.v(phrase) != phrasetype:
+            continue
+        for w in L.d(phrase, 'word'):
+            if F.pdp.v(w) == 'verb':
+                if w in iwords:
+                    results.append((phrase, w))
+                break
+    return results
+
+native_heads = dict.fromkeys(simp_pdps, simple_heads)
+native_heads['VP'] = verb_heads
+
+def query_heads(build, querydicts, phrases=None):
+    '''
+    Runs queries on phrasetype/query dicts.
+    Reports results.
+    Adds results.
+
+    querydicts - (querydict, phrasei, headi) tuples, where
+        phrasei is the index of the phrase result in the search template
+        and headi is the index of the head result in the search template.
+
+    All of the templates are handed to `Build.search_rules` at once,
+    so that they can run in parallel and be cached one by one.
+    Types in `native_heads` are resolved without search, unless
+    `Build.check` is set, in which case both are run and compared.
+    The heads are recorded afterwards in the order of `querydicts`,
+    together with the phrase type that found them.
+
+    phrases - the phrases the native resolvers are limited to;
+        by default they resolve all phrases of their type
+    '''
+    queries = [(phrasetype, query, (phrasei, headi))
+                  for querydict, phrasei, headi in querydicts
+                  for phrasetype, query in querydict.items()]
+
+    searched = [query for query in queries if query[0] not in native_heads or build.check]
+    found = dict(zip((phrasetype for phrasetype, _, _ in searched),
+                     build.search_rules('phrase_heads', searched)))
+
+    for phrasetype, _, _ in queries:
+        if phrasetype not in native_heads:
+            results = found[phrasetype]
+        else:
+            results = native_heads[phrasetype](build, phrasetype, phrases)
+            if build.check and sorted(results) != sorted(found[phrasetype]):
+                mismatch = set(results) ^ set(found[phrasetype])
+                raise Exception(f'native {phrasetype} heads differ from the template in {sorted(mismatch)[:10]}')
+        build.report(f'\t{len(results)} results found for {phrasetype}')
+        for phrase, head in results:
+            build.record_head(phrase, head, rule=phrasetype)
+
+def run(build):
+    build.coverage = Coverage(build.api) # track all phrases
+
+    query_heads(build, HEAD_QUERIES)
+
+    build.heads_status()
@@ -0,0 +1,231 @@
+'''
+The heads production line.
+
+A `Build` holds the custom sets and head mappings
+that the notebook kept in its globals. The stages
+in `STAGES` are run over it in order. Exporting is
+kept apart from the stages so that the mappings can
+also be used without writing any files.
+'''
+
+import re
+import collections
+import multiprocessing
+
+from heads import (iphrase_atom, quantifiers, prepositions,
+                   dwords, wordflags, phrase_heads, obj_prep, nhead)
+from heads.cache import SetCache, RuleCache, LazySets
+
+# ordered (name, module) pairs;
+# every module has a `run` function that accepts a Build
+STAGES = (
+    ('iphrase_atom', iphrase_atom),
+    ('quantifiers', quantifiers),
+    ('prepositions', prepositions),
+    ('dwords', dwords),
+    ('wordflags', wordflags),
+    ('phrase_heads', phrase_heads),
+    ('obj_prep', obj_prep),
+    ('nhead', nhead),
+)
+
+# the stage that makes each custom set
+SET_STAGES = {set_name: name for name, stage in STAGES
+                 for set_name in getattr(stage, 'SETS', ())}
+
+# names that may refer to a custom set in a template
+set_name_re = re.compile(r'[\w@-]+')
+
+# the build inherited by forked search workers
+_worker_build = None
+
+def _worker_search(template):
+    return _worker_build.search(template, sets=_worker_build.sets)
+
+class Build:
+    '''
+    Holds the state of one run of
+    the production line for a BHSA version.
+    '''
+
+    def __init__(self, A, version, silent=True, workers=1, cache=None, check=False, profiler=None):
+        self.A = A
+        self.api = A.api
+        self.version = version
+        self.silent = silent
+        self.workers = workers
+
+        # an optional heads.profiler.Profiler
+        # that records every search
+        self.profiler = profiler
+
+        # run the templates behind native resolvers
+        # as well, and check that both agree
+        self.check = check
+
+        # custom sets for TF search,
+        # optionally cached in the cache location
+        self.sets = LazySets()
+        self.cache = SetCache(cache, version, self.api, STAGES) if cache else None
+        self.rules = RuleCache(self.cache) if cache else None
+
+        # phrase to head mappings and their accounting,
+        # see heads.coverage; made by heads.phrase_heads
+        self.phrase2heads = collections.defaultdict(set)
+        self.coverage = None
+
+        # rule provenance: the rule that first recorded each
+        # (phrase, head) pair, and the last rule that mapped
+        # each object to its preposition
+        self.head_rules = {}
+        self.obj_rules = {}
+
+        # preposition to object mappings
+        self.obj2prep = {}
+        self.prep2obj = collections.defaultdict(set)
+
+        # phrase to nominal head mappings
+        self.nheads = collections.defaultdict(set)
+
+        # tokens of phrase atoms and subphrases, see heads.tokens
+        self.tokens = None
+
+        # parallel chains of phrase atoms, see heads.iphrase_atom
+        self.para_chains = None
+
+        # nominals governed by each preposition, see heads.nhead
+        self.prep_nominals = None
+
+    def run(self, stages=None):
+        '''
+        Runs the stages in order.
+        A selection of stage names can
+        be supplied to run only those.
+
+        Stages that make custom sets are
+        loaded from the cache when it has
+        their sets.
+        '''
+        for name, stage in STAGES:
+            if stages is not None and name not in stages:
+                continue
+            cached = self.cache is not None and hasattr(stage, 'SETS')
+            if cached and self.cache.load(name, self.sets):
+                self.report(f'{name} loaded from cache...')
+                continue
+            self.report(f'running {name}...')
+            stage.run(self)
+            if cached:
+                self.cache.save(name, self.sets)
+        return self
+
+    def search(self, template, **kwargs):
+        '''
+        Runs a TF search without any display.
+        Only the custom sets named in the
+        template are passed on, so that the
+        other sets need not be read from the cache.
+        '''
+        sets = kwargs.pop('sets', None)
+        if sets is not None:
+            sets = {name: sets[name] for name in set(set_name_re.findall(template))
+                       if name in sets}
+        if self.profiler is not None:
+            return self.profiler.search(self.A.search, template, silent=True, sets=sets, **kwargs)
+        return self.A.search(template, silent=True, sets=sets, **kwargs)
+
+    def search_all(self, templates):
+        '''
+        Runs several TF searches with the custom sets
+        and returns their results in the order of templates.
+
+        With more than one worker, the searches run in a pool of
+        processes that are forked after the corpus and the sets
+        are loaded, so that nothing but the templates and the
+        results needs to be passed around. The biggest templates
+        are started first since they take the longest.
+        With a profiler, the searches run in this process.
+        '''
+        global _worker_build
+
+        if self.workers < 2 or len(templates) < 2 or self.profiler is not None:
+            return [self.search(template, sets=self.sets) for template in templates]
+
+        # read cached sets before forking
+        # so that the workers share them
+        for template in templates:
+            for name in set_name_re.findall(template):
+                if name in self.sets:
+                    self.sets[name]
+
+        order = sorted(range(len(templates)), key=lambda i: -len(templates[i]))
+        _worker_build = self
+        try:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(min(self.workers, len(templates))) as pool:
+                pending = {i: pool.apply_async(_worker_search, (templates[i],)) for i in order}
+                return [pending[i].get() for i in range(len(templates))]
+        finally:
+            _worker_build = None
+
+    def search_rules(self, stage, rules):
+        '''
+        Runs the rules of a stage and returns the
+        results of each rule, reduced to its columns.
+
+        rules - (name, template, columns) tuples, where
+            columns are the indices of the result nodes to keep
+
+        With a cache, the results of each rule are stored
+        under a key of its own, and only the rules that
+        have nothing stored are searched.
+        '''
+        keys = {}
+        results = {}
+        if self.profiler is not None:
+            self.profiler.names.update((template, f'{stage}/{name}') for name, template, _ in rules)
+        if self.rules is not None:
+            for name, template, columns in rules:
+                stages = {SET_STAGES[set_name] for set_name in set_name_re.findall(template)
+                             if set_name in SET_STAGES}
+                keys[name] = self.rules.key(template, columns, stages)
+                rows = self.rules.load(stage, name, keys[name], len(columns))
+                if rows is not None:
+                    results[name] = rows
+            self.report(f'\t{len(results)} of {len(rules)} {stage} rules loaded from cache...')
+
+        todo = [rule for rule in rules if rule[0] not in results]
+        for (name, _, columns), res in zip(todo, self.search_all([template for _, template, _ in todo])):
+            results[name] = [tuple(r[i] for i in columns) for r in res]
+            if self.rules is not None:
+                self.rules.save(stage, name, keys[name], results[name])
+
+        return [results[name] for name, _, _ in rules]
+
+    def record_head(self, phrase, head, rule=None):
+        '''
+        Simple function to track phrases
+        with heads that are accounted for
+        and to modify the phrase2heads
+        dict, which is a mapping from a phrase
+        node to its head nodes.
+        '''
+        if self.api.F.otype.v(phrase) == 'word':
+            raise Exception(f'node {phrase} is a word not a phrase!')
+
+        # phrases with plural heads are only covered once
+        self.coverage.cover(phrase)
+        self.phrase2heads[phrase].add(head) # record it
+        self.head_rules.setdefault((phrase, head), rule)
+
+    def heads_status(self):
+        # reports accounted vs unaccounted heads, per type
+        self.report(f'\t{self.coverage.covered} phrases matched with a head...')
+        self.report(f'\t{self.coverage.remaining} phrases remaining...')
+        for typ, counts in self.coverage.counts().items():
+            if counts['remaining']:
+                self.report(f"\t\t{counts['remaining']} {typ} phrases remaining...")
+
+    def report(self, mssg):
+        if not self.silent:
+            print(mssg)
@@ -0,0 +1,150 @@
+'''
+`prep` (prepositions)
+
+Many prepositions are marked in BHSA with the feature `pdp`
+(phrase dependent part of speech) with a value of `prep`.
+However, this is not true of all prepositions. Other prepositions
+are marked with the `ls` (lexical set) feature with a value of `ppre`
+(potential preposition). Still other semi-prepositional lemmas are
+missed, such as פנה when used before ל (as in לפני), words indicating
+position, such as תוך (middle), קץ (end), or those indicating
+continuity such as עוד (still).
+
+This stage also prepares the complement sets `nonprep`, `nonquant`,
+`nonquantprep`, as well as `postprep` and `nonpostprep`, which
+enable exclusions to be made without lengthening the search templates.
+'''
+
+from heads.nodeset import NodeSet
+
+# the custom sets made by this stage
+# and the stages they are made from
+SETS = ('prep', 'nonprep', 'nonquant', 'nonquantprep',
+        'postprep', 'nonpostprep')
+REQUIRES = ('quantifiers',)
+
+# add special בד "alone" when it is
+# preceded by ל, with a meaning of "except"
+bad_except = '''
+
+prep:word lex=BD/
+/with/
+phrase_atom
+    word pdp=prep lex=L
+    <: prep
+/-/
+
+'''
+
+# The prepositions below are lemma sets like פנה or תוך
+# These sets could benefit from further investigation
+preprep = '''
+
+prep:word prs=absent lex=PNH/|TWK/|QY/|QYH=/|QYT/|<WD/
+/with/
+% ensure potential prep is preceded by:
+% prep, potential prep (ls), or כל
+% else there should be no interruption
+phrase_atom
+    word
+    /with/
+    pdp=prep
+    /or/
+    ls=ppre
+    /or/
+    lex=KL/
+    /-/
+    <: prep
+/-/
+/with/
+% ensure prep is followed by at least one non ו word
+phrase_atom
+    prep
+    <: word lex#W
+/-/
+
+'''
+
+# several cases of אחרית are substantive in nature, e.g. אחרית רשׁעים "end of evil doers" (Ps 37:38)
+# others are used prepositionally to indicate position
+# the semantics of the phrase is important for determining which sense is employed
+# all cases in Time Phrases appear prepositional
+# if used with an animate noun, it appears that אחרית is used substantivally
+# those cases can be manually excluded with a lexeme exclusion
+# NB: גים in Jer 50:12 is used non-personally and thus not excluded
+# Excluded: איוב and רשעים
+axarit = '''
+
+prep:word lex=>XRJT/
+/with/
+phrase_atom
+    prep
+    <mother- subphrase rela=rec
+        word pdp=subs lex#>JWB/|RC</
+/-/
+
+'''
+
+# Below potential preps are added, but דרך is excluded
+# since this is a more speculative preposition
+potential_preps = '''
+
+word ls=ppre st=c lex#DRK/
+
+'''
+
+# words immediately preceded by a preposition,
+# with the potential intervention of an article
+precede_prep = '''
+
+word
+/with/
+phrase_atom
+    prep
+    <: ..
+/or/
+phrase_atom
+    prep
+    <: word pdp=art
+    <: ..
+/-/
+'''
+
+def run(build):
+    api = build.api
+    F = api.F
+    sets = build.sets
+
+    preps = NodeSet.of_type(api, 'word', (w for w in F.otype.s('word') if F.pdp.v(w) == 'prep'))
+    for template in (bad_except, preprep, axarit, potential_preps):
+        preps |= build.search(template, shallow=True)
+
+    sets['prep'] = preps
+    build.report(f'\t{len(preps)} custom prepositions ready...')
+
+    # -- nonprep, nonquant, and nonquantprep --
+    # the complements are bitmaps of their own
+    quantifiers = sets['quant']
+    quantpreps = quantifiers|preps
+
+    # non quantifiers
+    non_quant = ~quantifiers
+
+    # non prepositions
+    non_prep = ~preps
+
+    # non quantifiers or prepositions
+    nonquantprep = ~quantpreps
+
+    sets['nonprep'] = non_prep
+    sets['nonquant'] = non_quant
+    sets['nonquantprep'] = nonquantprep
+
+    # -- postprep and nonpostprep --
+    postprep = NodeSet.of_type(api, 'word', build.search(precede_prep, shallow=True, sets=sets))
+    nonpostprep = ~postprep
+
+    sets['postprep'] = postprep
+    sets['nonpostprep'] = nonpostprep
+
+    build.report(f'\t{len(postprep)} post prepositional words ready...')
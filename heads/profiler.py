@@ -0,0 +1,129 @@
+'''
+A profiler of the TF searches of the production line.
+
+The big templates carry nested `/without/`, `/where/`, and
+`/with/`..`/or/` blocks. TF evaluates each of these blocks as
+a search of its own, on the nodes of the atom it qualifies.
+While a template is profiled, that evaluation is timed too, so
+that every search of a build is recorded with:
+
+    • its name, i.e. its rule, e.g. `phrase_heads/NP_quant_alone`,
+      or its variable in the stage module, e.g. `dwords.missing_atr_rec[0]`
+    • its wall time in seconds and its number of results
+    • for every quantifier block, keyed by its line in the template:
+      its time, without the time of the blocks nested in it, and
+      the number of atom nodes before and after it
+
+The searches have to run in this process to be profiled,
+so a profiled build runs its searches one at a time.
+'''
+
+import json
+import time
+import contextlib
+
+from tf.search import spin
+
+from heads.bench import template_names
+from heads.pipeline import Build
+
+class Profiler:
+    '''
+    Records the searches that it runs.
+    '''
+
+    def __init__(self, names=None):
+        self.names = template_names() if names is None else dict(names)
+        self.templates = {}
+        self.blocks = None
+        self.stack = []
+
+    def name(self, template):
+        if template in self.names:
+            return self.names[template]
+        first_line = next((line.strip() for line in template.splitlines() if line.strip()), '')
+        return f'<{first_line}>'
+
+    def search(self, search, template, **kwargs):
+        '''
+        Runs search(template, **kwargs) and records it.
+        '''
+        entry = self.templates.setdefault(self.name(template),
+                                          {'seconds': 0.0, 'calls': 0, 'results': 0, 'blocks': {}})
+        self.blocks = entry['blocks']
+        start = time.perf_counter()
+        try:
+            with self.hooked():
+                results = search(template, **kwargs)
+        finally:
+            self.blocks = None
+        entry['seconds'] += time.perf_counter() - start
+        entry['calls'] += 1
+        entry['results'] += len(results)
+        return results
+
+    @contextlib.contextmanager
+    def hooked(self):
+        '''
+        Times TF's quantifiers while in the context.
+        '''
+        do_quantifier = spin._doQuantifier
+
+        def timed_quantifier(searchExe, yarn, atom, quantifier):
+            kind, _, _, line = quantifier
+            key = f'{searchExe.offset + line}: {kind} {atom.strip()}'
+            self.stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                result = do_quantifier(searchExe, yarn, atom, quantifier)
+            finally:
+                seconds = time.perf_counter() - start
+                nested = self.stack.pop()
+                if self.stack:
+                    self.stack[-1] += seconds
+            block = self.blocks.setdefault(key, {'seconds': 0.0, 'calls': 0, 'before': 0, 'after': 0})
+            block['seconds'] += seconds - nested
+            block['calls'] += 1
+            block['before'] += len(yarn)
+            block['after'] += len(result)
+            return result
+
+        spin._doQuantifier = timed_quantifier
+        try:
+            yield
+        finally:
+            spin._doQuantifier = do_quantifier
+
+    def report(self):
+        '''
+        Returns the lines of a report of the templates
+        by time, with their blocks by time.
+        '''
+        lines = []
+        entries = sorted(self.templates.items(), key=lambda item: -item[1]['seconds'])
+        for name, entry in entries:
+            lines.append(f"{entry['seconds']:9.2f}s {entry['results']:>8} results  {name}")
+            blocks = sorted(entry['blocks'].items(), key=lambda item: -item[1]['seconds'])
+            for key, block in blocks:
+                lines.append(f"\t{block['seconds']:9.2f}s {block['before']:>8} -> {block['after']:<8} line {key}")
+        return lines
+
+    def write(self, path):
+        '''
+        Writes the records as JSON, sorted as in the report.
+        '''
+        entries = sorted(self.templates.items(), key=lambda item: -item[1]['seconds'])
+        data = {name: {**entry, 'blocks': dict(sorted(entry['blocks'].items(),
+                                                      key=lambda item: -item[1]['seconds']))}
+                   for name, entry in entries}
+        with open(path, 'w') as outfile:
+            json.dump(data, outfile, indent=1)
+
+def run(A, version):
+    '''
+    Runs a build with a Profiler
+    and returns the Profiler.
+    '''
+    profiler = Profiler()
+    Build(A, version, profiler=profiler).run()
+    return profiler
@@ -0,0 +1,242 @@
+'''
+Provenance of the heads of a build, and diffs between builds.
+
+`Build.head_rules` keeps the rule that first found each (phrase,
+head) pair, and `Build.obj_rules` the rule that last mapped each
+object to its preposition. These are stored as columns of arrays
+in `tf/<version>/provenance`, sorted by phrase and head, or by
+object:
+
+    • `phrase.npy`, `head.npy`, `rule.npy`, `typ.npy` - the head pairs,
+      with a code for their rule and for the typ of their phrase
+    • `obj.npy`, `prep.npy`, `obj_rule.npy` - the objects of prepositions
+    • `provenance.json` - the version, the build id and date,
+      and the rules and phrase types the codes stand for
+
+A diff of two stores compares their sorted columns in one pass
+and needs no corpus. It reports the phrases whose heads were added,
+removed, or changed, counted per rule and per phrase type, and the
+objects whose preposition was added, removed, or changed. Nodes are
+only the same across builds of the same BHSA version; across versions
+only the counts per rule and type of each build can be compared.
+'''
+
+import os
+import json
+import array
+import hashlib
+import datetime
+import itertools
+import collections
+
+from heads.arrays import write_array, read_array
+from heads.edges import NODE_TYPE
+
+# the version of the layout of a store
+FORMAT = 1
+
+HEAD_COLUMNS = ('phrase', 'head', 'rule', 'typ')
+OBJ_COLUMNS = ('obj', 'prep', 'obj_rule')
+
+def codes(values, table):
+    '''
+    Returns an array of the codes of values,
+    adding new values to table.
+    '''
+    index = {value: code for code, value in enumerate(table)}
+    result = array.array('H')
+    for value in values:
+        if value not in index:
+            index[value] = len(table)
+            table.append(value)
+        result.append(index[value])
+    return result
+
+def write(directory, version, head_rules, obj_rules, obj2prep, typ):
+    '''
+    Writes a store to directory.
+
+    head_rules - dict of (phrase, head) to rule
+    obj_rules - dict of object to rule
+    obj2prep - dict of object to preposition
+    typ - function that returns the typ of a phrase
+    '''
+    os.makedirs(directory, exist_ok=True)
+    pairs = sorted(head_rules)
+    objs = sorted(obj_rules)
+    rules, types = [], []
+    columns = {
+        'phrase': array.array(NODE_TYPE, (phrase for phrase, _ in pairs)),
+        'head': array.array(NODE_TYPE, (head for _, head in pairs)),
+        'rule': codes((str(head_rules[pair]) for pair in pairs), rules),
+        'typ': codes((typ(phrase) for phrase, _ in pairs), types),
+        'obj': array.array(NODE_TYPE, objs),
+        'prep': array.array(NODE_TYPE, (obj2prep[obj] for obj in objs)),
+        'obj_rule': codes((str(obj_rules[obj]) for obj in objs), rules),
+    }
+    sha = hashlib.sha256(version.encode())
+    for name, column in columns.items():
+        write_array(os.path.join(directory, f'{name}.npy'), column)
+        sha.update(name.encode())
+        sha.update(column.tobytes())
+    sha.update(json.dumps(rules).encode())
+
+    manifest = {'format': FORMAT,
+                'version': version,
+                'build': sha.hexdigest()[:12],
+                'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                'rules': rules,
+                'types': types}
+    with open(os.path.join(directory, 'provenance.json'), 'w') as outfile:
+        json.dump(manifest, outfile, indent=1)
+
+def save(build, location='tf'):
+    '''
+    Writes the provenance of a build into location/version/provenance.
+    '''
+    F = build.api.F
+    write(os.path.join(os.path.expanduser(location), build.version, 'provenance'),
+          build.version, build.head_rules, build.obj_rules, build.obj2prep, F.typ.v)
+    build.report(f'BHSA {build.version} provenance written...')
+
+class Provenance:
+    '''
+    The columns of a store, memory mapped.
+    '''
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'provenance.json')) as infile:
+            self.manifest = json.load(infile)
+        if self.manifest['format'] != FORMAT:
+            raise Exception(f"provenance of format {self.manifest['format']} cannot be read, expected {FORMAT}")
+        self.version = self.manifest['version']
+        self.build = self.manifest['build']
+        self.rules = self.manifest['rules']
+        self.types = self.manifest['types']
+        self.columns = {name: read_array(os.path.join(directory, f'{name}.npy'))
+                           for name in HEAD_COLUMNS + OBJ_COLUMNS}
+
+    def phrases(self):
+        '''
+        Yields (phrase, heads, rule, typ) in phrase order, where
+        rule is that of the first head; a phrase's heads all
+        have the same rule unless rules overlap.
+        '''
+        phrase, head, rule, typ = (self.columns[name] for name in HEAD_COLUMNS)
+        rows = range(len(phrase))
+        for node, group in itertools.groupby(rows, key=phrase.__getitem__):
+            group = list(group)
+            yield (node, tuple(head[i] for i in group),
+                   self.rules[rule[group[0]]], self.types[typ[group[0]]])
+
+    def objects(self):
+        '''
+        Yields (obj, prep, rule) in object order.
+        '''
+        obj, prep, rule = (self.columns[name] for name in OBJ_COLUMNS)
+        for i in range(len(obj)):
+            yield obj[i], prep[i], self.rules[rule[i]]
+
+    def counts(self):
+        '''
+        Returns the number of phrases per rule and per type.
+        '''
+        rules, types = collections.Counter(), collections.Counter()
+        for _, _, rule, typ in self.phrases():
+            rules[rule] += 1
+            types[typ] += 1
+        return {'rules': dict(rules), 'types': dict(types)}
+
+def merge(a, b):
+    '''
+    Yields (key, a_row, b_row) for two iterators of
+    rows sorted by their first item; a missing row is None.
+    '''
+    a, b = iter(a), iter(b)
+    row_a, row_b = next(a, None), next(b, None)
+    while row_a is not None or row_b is not None:
+        if row_b is None or (row_a is not None and row_a[0] < row_b[0]):
+            yield row_a[0], row_a, None
+            row_a = next(a, None)
+        elif row_a is None or row_b[0] < row_a[0]:
+            yield row_b[0], None, row_b
+            row_b = next(b, None)
+        else:
+            yield row_a[0], row_a, row_b
+            row_a, row_b = next(a, None), next(b, None)
+
+def diff(a, b):
+    '''
+    Returns the diff of two Provenance stores:
+    the changed phrases and objects, and the counts
+    of changes per rule and per phrase type.
+    '''
+    result = {'a': {'version': a.version, 'build': a.build, **a.counts()},
+              'b': {'version': b.version, 'build': b.build, **b.counts()},
+              'rules': collections.defaultdict(collections.Counter),
+              'types': collections.defaultdict(collections.Counter),
+              'phrases': {'added': [], 'removed': [], 'changed': []},
+              'objects': {'added': [], 'removed': [], 'changed': []}}
+
+    # nodes can only be compared within a version
+    if a.version != b.version:
+        result['rules'], result['types'] = {}, {}
+        return result
+
+    for phrase, row_a, row_b in merge(a.phrases(), b.phrases()):
+        if row_a is None:
+            change, rule, typ = 'added', row_b[2], row_b[3]
+        elif row_b is None:
+            change, rule, typ = 'removed', row_a[2], row_a[3]
+        elif row_a[1] != row_b[1]:
+            change, rule, typ = 'changed', row_b[2], row_b[3]
+        else:
+            continue
+        result['phrases'][change].append({'phrase': phrase,
+                                          'a': row_a and list(row_a[1]),
+                                          'b': row_b and list(row_b[1]),
+                                          'rule': rule})
+        result['rules'][rule][change] += 1
+        result['types'][typ][change] += 1
+
+    for obj, row_a, row_b in merge(a.objects(), b.objects()):
+        if row_a is None:
+            change = 'added'
+        elif row_b is None:
+            change = 'removed'
+        elif row_a[1] != row_b[1]:
+            change = 'changed'
+        else:
+            continue
+        result['objects'][change].append({'obj': obj,
+                                          'a': row_a and row_a[1],
+                                          'b': row_b and row_b[1],
+                                          'rule': (row_b or row_a)[2]})
+        result['rules'][(row_b or row_a)[2]][change] += 1
+
+    result['rules'] = {rule: dict(counts) for rule, counts in sorted(result['rules'].items())}
+    result['types'] = {typ: dict(counts) for typ, counts in sorted(result['types'].items())}
+    return result
+
+def report(result):
+    '''
+    Prints the counts of a diff.
+    '''
+    a, b = result['a'], result['b']
+    print(f"a: BHSA {a['version']}, build {a['build']}")
+    print(f"b: BHSA {b['version']}, build {b['build']}")
+    if a['version'] != b['version']:
+        print('the versions differ, so only the phrase counts can be compared')
+        for group in ('rules', 'types'):
+            print(f'phrases per {group[:-1]}:')
+            for name in sorted(set(a[group]) | set(b[group])):
+                print(f"\t{a[group].get(name, 0):>8} {b[group].get(name, 0):>8}  {name}")
+        return
+    for group in ('rules', 'types'):
+        print(f'changes per {group[:-1]}:')
+        for name, counts in result[group].items():
+            changes = ', '.join(f'{change}={count}' for change, count in counts.items())
+            print(f'\t{name}  {changes}')
+    for kind in ('phrases', 'objects'):
+        counts = ', '.join(f'{len(rows)} {change}' for change, rows in result[kind].items())
+        print(f'{kind}: {counts}')
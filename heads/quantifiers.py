@@ -0,0 +1,67 @@
+'''
+`quant` (quantifiers)
+
+Different lexemes are used to quantify nouns in the Hebrew Bible.
+Cardinal numbers are indicated in the BHSA with the feature `ls`
+(lexical set) and a value of `card`. However, other, more qualitative
+quantifiers are not formally marked, including lemmas such as כל or חצי.
+Also not included is the use of בן + cardinal number, where בן functions
+idiomatically as a part of the quantifying phrase rather than a true head.
+
+Substantival modifiers such as עצם "same" are merged into the
+quantifier set, so in some places the code may refer to quantifiers
+where the implementation actually also includes modifiers.
+'''
+
+from heads.nodeset import NodeSet
+
+# the custom sets made by this stage
+# and the stages they are made from
+SETS = ('quant',)
+REQUIRES = ()
+
+custom_quants = {'KL/', 'M<V/', 'JTR/',
+                 'M<FR/', 'XYJ/', '<FRWN/',
+                 'C>R=/', 'MSPR/', 'XYWT/',
+                 'RB/', 'RB=/', 'MXYJT/'}
+quantlexs = '|'.join(sorted(custom_quants)) # pipe separated string for optional use in search templates
+
+# for the Hebrew idiom: בנ + quantifier for age
+ben_card = '''
+
+quant:word lex=BN/ st=c nu=sg
+/with/
+phrase_atom
+    quant
+    <: word ls=card
+/-/
+
+'''
+
+# substantival terms such as עצם "same"
+etsem = '''
+
+phrase_atom
+    word lex=<YM/ nu=sg
+    <mother- subphrase rela=rec
+        word pdp=subs lex#>DM/
+
+'''
+
+def run(build):
+    api = build.api
+    F = api.F
+
+    # put quantifier word nodes in here
+    quantifiers = NodeSet.of_type(api, 'word', (w for w in F.otype.s('word')
+                                                  if F.lex.v(w) in custom_quants
+                                                  or F.ls.v(w) == 'card'))
+
+    quantifiers |= build.search(ben_card, shallow=True)
+
+    # merge modifiers into quantifiers
+    modifiers = set(res[1] for res in build.search(etsem))
+    quantifiers |= modifiers
+
+    build.sets['quant'] = quantifiers
+    build.report(f'\t{len(quantifiers)} custom quantifiers ready...')
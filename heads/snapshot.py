@@ -0,0 +1,280 @@
+'''
+A snapshot of the corpus features used by the pipeline.
+
+Loading the BHSA with Text-Fabric takes a while before anything
+is run. A snapshot stores the features the pipeline reads as
+flat arrays, which are memory mapped when loaded, so a snapshot
+loads at once:
+
+    • `otype.rank.npy` - the canonical rank of every node; the
+      type intervals are kept in `snapshot.json`
+    • `<feature>.codes.npy` - a code per node for every node
+      feature, whose values are listed in `snapshot.json`,
+      with code 0 for no value, and `<feature>.index` CSR
+      arrays from each code to its nodes in canonical order
+    • `mother` as `Edges` arrays in both directions
+    • `oslots` as `Edges` arrays from the nodes to their slots,
+      and from the slots to the nodes that contain them
+
+`Snapshot` stands in for the Text-Fabric app, with the subset of
+F, L, and E that the pipeline uses. It cannot search, so a build
+on a snapshot needs a cache that has the sets and rule results
+of the version; the cache keys of a snapshot are the same as
+those of the corpus it was made from.
+'''
+
+import os
+import json
+import bisect
+import array
+from types import SimpleNamespace
+
+from heads import corpus
+from heads.arrays import write_array, read_array
+from heads.cache import file_hash
+from heads.edges import Edges, NODE_TYPE
+
+# the version of the layout of a snapshot
+FORMAT = 1
+
+NODE_FEATURES = ('pdp', 'sp', 'lex', 'ls', 'st', 'nu', 'prs',
+                 'rela', 'typ', 'vt', 'trailer', 'g_cons_utf8')
+
+def code_type(values):
+    return 'B' if len(values) <= 1 << 8 else 'H' if len(values) <= 1 << 16 else 'I'
+
+def write(A, directory, version):
+    '''
+    Writes the snapshot of a loaded corpus to directory.
+    '''
+    api = A.api
+    F, E = api.F, api.E
+    os.makedirs(directory, exist_ok=True)
+    path = lambda name: os.path.join(directory, f'{name}.npy')
+    max_node, max_slot = F.otype.maxNode, F.otype.maxSlot
+    rank = array.array(NODE_TYPE, [0]) + array.array(NODE_TYPE, api.C.rank.data)
+    write_array(path('otype.rank'), rank)
+
+    manifest = {'format': FORMAT,
+                'version': version,
+                'slotType': F.otype.slotType,
+                'maxSlot': max_slot,
+                'maxNode': max_node,
+                'otypes': {otype: F.otype.sInterval(otype) for otype in F.otype.all},
+                'features': {},
+                'hashes': {feature: file_hash(api.TF.features[feature].path)
+                              for feature in corpus.FEATURES}}
+
+    for feature in NODE_FEATURES:
+        items = list(getattr(F, feature).items())
+        values = [None] + sorted({value for _, value in items})
+        value_codes = {value: code for code, value in enumerate(values)}
+        codes = array.array(code_type(values), [0]) * (max_node + 1)
+        for node, value in items:
+            codes[node] = value_codes[value]
+        index = Edges.from_pairs(lambda: ((value_codes[value], node) for node, value in items), len(values) - 1)
+        # the nodes of each value in canonical rather than node order
+        for code in range(1, len(values)):
+            start, end = index.offsets[code], index.offsets[code + 1]
+            index.targets[start:end] = array.array(NODE_TYPE, sorted(index.targets[start:end], key=rank.__getitem__))
+        write_array(path(f'{feature}.codes'), codes)
+        write_array(path(f'{feature}.index.offsets'), index.offsets)
+        write_array(path(f'{feature}.index.targets'), index.targets)
+        manifest['features'][feature] = values
+
+    mother = Edges.from_pairs(lambda: ((node, target) for node, targets in E.mother.items()
+                                          for target in targets), max_node)
+    oslots = Edges.from_pairs(lambda: ((node, slot) for node in range(max_slot + 1, max_node + 1)
+                                          for slot in E.oslots.s(node)), max_node)
+    for name, edges in (('mother', mother), ('oslots', oslots)):
+        for direction, feature_edges in (('', edges), ('.inv', edges.inverse())):
+            write_array(path(f'{name}{direction}.offsets'), feature_edges.offsets)
+            write_array(path(f'{name}{direction}.targets'), feature_edges.targets)
+
+    with open(os.path.join(directory, 'snapshot.json'), 'w') as outfile:
+        json.dump(manifest, outfile, indent=1)
+
+class Otype:
+    '''
+    F.otype, from the type intervals.
+    '''
+
+    def __init__(self, manifest, rank):
+        self.rank = rank
+        self.nodes = {}
+        self.slotType = manifest['slotType']
+        self.maxSlot = manifest['maxSlot']
+        self.maxNode = manifest['maxNode']
+        self.intervals = {otype: tuple(interval) for otype, interval in manifest['otypes'].items()}
+        self.all = tuple(self.intervals)
+        ordered = sorted(self.intervals.items(), key=lambda item: item[1][0])
+        self.firsts = [first for _, (first, _) in ordered]
+        self.otypes = [otype for otype, _ in ordered]
+
+    def v(self, node):
+        if not 0 < node <= self.maxNode:
+            return None
+        return self.otypes[bisect.bisect_right(self.firsts, node) - 1]
+
+    def s(self, otype):
+        if otype not in self.intervals:
+            return ()
+        # in canonical order, as TF returns them
+        if otype not in self.nodes:
+            first, last = self.intervals[otype]
+            self.nodes[otype] = tuple(sorted(range(first, last + 1), key=self.rank.__getitem__))
+        return self.nodes[otype]
+
+    def sInterval(self, otype):
+        return self.intervals[otype]
+
+class NodeFeature:
+    '''
+    F.feature, from its codes and index.
+    '''
+
+    def __init__(self, codes, values, index):
+        self.codes = codes
+        self.values = values
+        self.value_codes = {value: code for code, value in enumerate(values)}
+        self.index = index
+
+    def v(self, node):
+        if not 0 < node < len(self.codes):
+            return None
+        return self.values[self.codes[node]]
+
+    def s(self, value):
+        code = self.value_codes.get(value)
+        if not code:
+            return ()
+        return self.index.f(code)
+
+    def items(self):
+        for node, code in enumerate(self.codes):
+            if code:
+                yield node, self.values[code]
+
+class EdgeFeature:
+    '''
+    E.feature, from its Edges in both directions.
+    '''
+
+    def __init__(self, forward, inverse):
+        self.forward = forward
+        self.inverse = inverse
+
+    def f(self, node):
+        return self.forward.f(node)
+
+    def t(self, node):
+        return self.inverse.f(node)
+
+class Oslots:
+    '''
+    E.oslots, from the slots of the non-slot nodes.
+    '''
+
+    def __init__(self, edges, max_slot):
+        self.edges = edges
+        self.maxSlot = max_slot
+
+    def s(self, node):
+        if node == 0:
+            return ()
+        if node <= self.maxSlot:
+            return (node,)
+        return self.edges.f(node)
+
+class Locality:
+    '''
+    L.u and L.d, by comparing the slots of nodes.
+    '''
+
+    def __init__(self, otype, oslots, containers, rank):
+        self.otype = otype
+        self.oslots = oslots
+        self.containers = containers
+        self.rank = rank
+
+    def candidates(self, slots, otype):
+        if otype == self.otype.slotType:
+            return slots
+        first, last = self.otype.sInterval(otype)
+        return {node for slot in slots for node in self.containers.f(slot)
+                   if first <= node <= last}
+
+    def u(self, node, otype):
+        '''
+        Returns the nodes of otype that embed node.
+        '''
+        slots = set(self.oslots.s(node))
+        if not slots or otype == self.otype.slotType:
+            return ()
+        nodes = (other for other in self.candidates([min(slots)], otype)
+                    if other != node and slots <= set(self.oslots.s(other)))
+        # the innermost embedders first, as TF orders them
+        return tuple(sorted(nodes, key=lambda other: -self.rank[other]))
+
+    def d(self, node, otype):
+        '''
+        Returns the nodes of otype that are embedded in node.
+        '''
+        slots = self.oslots.s(node)
+        if node <= self.otype.maxSlot:
+            return ()
+        slot_set = set(slots)
+        nodes = (other for other in self.candidates(slots, otype)
+                    if other != node and all(slot in slot_set for slot in self.oslots.s(other)))
+        return tuple(sorted(nodes, key=self.rank.__getitem__))
+
+class Snapshot:
+    '''
+    A stand in for the TF app of a version,
+    made from the arrays of a snapshot.
+    '''
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'snapshot.json')) as infile:
+            manifest = json.load(infile)
+        if manifest['format'] != FORMAT:
+            raise Exception(f"snapshot of format {manifest['format']} cannot be read, expected {FORMAT}")
+        self.directory = directory
+        self.manifest = manifest
+        self.version = manifest['version']
+
+        def edges(name):
+            return Edges(self.array(f'{name}.offsets'), self.array(f'{name}.targets'))
+
+        rank = self.array('otype.rank')
+        otype = Otype(manifest, rank)
+        oslots = Oslots(edges('oslots'), otype.maxSlot)
+        F = {feature: NodeFeature(self.array(f'{feature}.codes'), values, edges(f'{feature}.index'))
+                for feature, values in manifest['features'].items()}
+        self.api = SimpleNamespace(
+            F=SimpleNamespace(otype=otype, **F),
+            E=SimpleNamespace(mother=EdgeFeature(edges('mother'), edges('mother.inv')), oslots=oslots),
+            L=Locality(otype, oslots, edges('oslots.inv'), rank),
+            feature_hashes=manifest['hashes'],
+        )
+
+    def array(self, name):
+        return read_array(os.path.join(self.directory, f'{name}.npy'))
+
+    def search(self, template, **kwargs):
+        raise Exception(f'a snapshot of BHSA {self.version} cannot search; build with a cache '
+                        'that has every set and rule stored, or load the corpus')
+
+def save(version, location='snapshots', silent=True):
+    '''
+    Loads a BHSA version and writes its
+    snapshot into location/version.
+    '''
+    A = corpus.load(version, silent=silent)
+    write(A, os.path.join(os.path.expanduser(location), version), version)
+
+def load(version, location='snapshots'):
+    '''
+    Returns the Snapshot stored in location/version.
+    '''
+    return Snapshot(os.path.join(os.path.expanduser(location), version))
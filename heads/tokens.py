@@ -0,0 +1,89 @@
+'''
+Tokens of phrase atoms and subphrases.
+
+Phrase atoms and subphrases are compared without vocalization
+to find daughters that mirror their mother word-for-word. Each
+word is tokenized once into an integer id, and the token of a
+node is the tuple of its words' ids. The hash of that tuple is
+kept in a per-type array, so that every node is only tokenized
+once however many mothers and daughters it is compared with.
+'''
+
+import array
+
+class TokenIndex:
+    '''
+    Token ids of all words and memoized
+    token hashes of larger nodes.
+    '''
+
+    def __init__(self, api):
+        F = api.F
+        self.api = api
+
+        # the article is compared by its consonant alone
+        ids = {}
+        self.word_ids = array.array('I', [0])
+        for w in F.otype.s('word'):
+            token = F.g_cons_utf8.v(w) if F.lex.v(w) != 'H' else 'ה'
+            self.word_ids.append(ids.setdefault(token, len(ids) + 1))
+
+        # token hashes per otype, filled when first needed
+        self.hashes = {}
+
+    def token(self, node):
+        '''
+        Returns the word ids of a node.
+        '''
+        word_ids = self.word_ids
+        return tuple(word_ids[s] for s in self.api.E.oslots.s(node))
+
+    def hash(self, node):
+        '''
+        Returns the memoized token hash of a node.
+        '''
+        otype = self.api.F.otype.v(node)
+        if otype not in self.hashes:
+            first, last = self.api.F.otype.sInterval(otype)
+            self.hashes[otype] = (first, array.array('q', bytes(8 * (last - first + 1))),
+                                  bytearray(last - first + 1))
+        first, hashes, done = self.hashes[otype]
+        i = node - first
+        if not done[i]:
+            hashes[i] = hash(self.token(node))
+            done[i] = 1
+        return hashes[i]
+
+    def same(self, node1, node2):
+        '''
+        Tells whether two nodes consist of the same tokens.
+        '''
+        return (self.hash(node1) == self.hash(node2)
+                and self.token(node1) == self.token(node2))
+
+    def mirrored_daughters(self, otype, rela, exclude=()):
+        '''
+        Returns (mother, [daughter]) tuples for nodes of otype with
+        an adjacent daughter which has the relation rela and is
+        identical to the mother. Only the daughters with that
+        relation are visited, following their E.mother edges.
+        '''
+        F, E = self.api.F, self.api.E
+        tagged = []
+        for daughter in F.rela.s(rela):
+            for mother in E.mother.f(daughter):
+                if (daughter - mother == 1 # must be adjacent to mother
+                        and F.otype.v(mother) == otype
+                        and mother not in exclude
+                        and self.same(mother, daughter)): # must be identical to mother
+                    tagged.append((mother, [daughter]))
+        return sorted(tagged)
+
+def token_index(build):
+    '''
+    Returns the token index of a build,
+    making it when it is first needed.
+    '''
+    if build.tokens is None:
+        build.tokens = TokenIndex(build.api)
+    return build.tokens
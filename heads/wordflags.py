@@ -0,0 +1,80 @@
+'''
+Word flags for the head templates.
+
+The head and object templates exclude words with the same few
+structural checks, each repeated in many templates, and each
+evaluated by TF as a search of its own every time it occurs.
+This stage searches each check once over all words, and keeps
+the words that match as a custom set:
+
+    • `modword` - words in a modifier subphrase,
+      i.e. one with a rela of adj, atr, rec, mod, or dem
+    • `postconstr` - words immediately preceded by
+      a construct form in their phrase atom
+    • `postpdpprep` - words immediately preceded by
+      a word with pdp=prep in their phrase atom
+    • `afterprep` - words immediately preceded by a custom preposition
+    • `afterprepart` - words immediately preceded by a custom
+      preposition with an article in between
+
+Unlike `postprep`, the last two need not be in the
+phrase atom of the preposition. A template excludes a
+flagged word with a `/without/` block of just `= modword`, etc.
+'''
+
+from heads.nodeset import NodeSet
+
+# the custom sets made by this stage
+# and the stages they are made from
+SETS = ('modword', 'postconstr', 'postpdpprep', 'afterprep', 'afterprepart')
+REQUIRES = ('prepositions',)
+
+# the check of each flag, and the
+# index of the flagged word in its results
+flag_templates = dict(
+
+modword = ('''
+
+subphrase rela=adj|atr|rec|mod|dem
+    word
+''', 1),
+
+postconstr = ('''
+
+phrase_atom
+    word st=c
+    <: word
+''', 2),
+
+postpdpprep = ('''
+
+phrase_atom
+    word pdp=prep
+    <: word
+''', 2),
+
+afterprep = ('''
+
+prep
+<: word
+''', 1),
+
+afterprepart = ('''
+
+prep
+<: word pdp=art
+<: word
+''', 2),
+
+)
+
+def run(build):
+    api = build.api
+    sets = build.sets
+
+    names = list(flag_templates)
+    results = build.search_all([flag_templates[name][0] for name in names])
+    for name, words in zip(names, results):
+        column = flag_templates[name][1]
+        sets[name] = NodeSet.of_type(api, 'word', (result[column] for result in words))
+        build.report(f'\t{len(sets[name])} {name} words ready...')
@@ -1,6 +1,6 @@
 import re
+import array
 import collections
-from positions import Positions
 
 def book_class(node, tf):
     '''
@@ -52,6 +52,50 @@ def masoretic_word(word, tf):
 
     return tuple(sorted(mwords))
 
+# an accent pattern made only of ETCBC accent codes,
+# e.g. '.*92', '.*(61|11)', or '.*60.*71'
+code_pattern_re = re.compile(r'(\.\*(\d\d|\(\d\d(\|\d\d)*\)))+$')
+
+def accent_codes(text):
+    '''
+    Returns a dict of every two-digit code in a
+    transcription to the offsets where it occurs.
+    Overlapping codes are included, since the
+    accent regexes would match those too.
+    '''
+    codes = collections.defaultdict(list)
+    for match in re.finditer(r'(?=(\d\d))', text):
+        codes[int(match.group(1))].append(match.start())
+    return codes
+
+def compile_accent(pattern):
+    '''
+    Compiles an accent pattern into a test
+    on the codes and text of a masoretic word.
+    
+    Patterns of codes are tested on the code offsets:
+    each code, or one of its alternatives, must occur 
+    after the previous one. Other patterns, such as 
+    mayela, are matched as regexes on the text.
+    '''
+    if not code_pattern_re.match(pattern):
+        regex = re.compile(pattern)
+        return lambda codes, text: bool(regex.match(text))
+    
+    steps = [tuple(int(code) for code in part.strip('()').split('|'))
+                for part in pattern.split('.*')[1:]]
+    
+    def test(codes, text):
+        start = 0
+        for step in steps:
+            found = [offset for code in step for offset in codes.get(code, ())
+                        if offset >= start]
+            if not found:
+                return False
+            start = min(found) + 2
+        return True
+    return test
+
 class Accents:
     
     '''
@@ -60,6 +104,12 @@ class Accents:
     Makes these sets available under
     a series of dict mappings, allowing the
     results to be scrutinized.
+    
+    The words of a masoretic word share its accents,
+    so each masoretic word is transcribed and classified 
+    once. Its accent codes are extracted in one pass
+    and tested against the patterns as tables of codes.
+    The sets are arrays of word nodes in corpus order.
     '''
     
     def __init__(self, tf):
@@ -116,7 +166,7 @@ class Accents:
                 'azla/qadma': '.*(63|33)',
                 'telisha qetannah': '.*04',
                 'yerah': '.*93',
-                'mayela': '.*73\S+(75|92)', # assumes _ replaced with \s
+                'mayela': r'.*73\S+(75|92)', # assumes _ replaced with \s
             },
             '3': {
                 'munach': '.*74',
@@ -138,32 +188,91 @@ class Accents:
         self.conRE = {bclass: {name:re.compile(patt) for name, patt in names.items()} 
                           for bclass, names in conA.items()}
         
-        # generate masoretic word sets
+        # compile the patterns into code tables
+        self.disTests = {bclass: {name:compile_accent(patt) for name, patt in names.items()} 
+                             for bclass, names in disA.items()}
+        self.conTests = {bclass: {name:compile_accent(patt) for name, patt in names.items()} 
+                             for bclass, names in conA.items()}
+        
+        words = self.F.otype.s('word')
+        
+        # book classes, looked up once per book
+        self.poetic = bytearray(max(words) + 1)
+        for book in self.F.otype.s('book'):
+            if book_class(book, self.tf) == '3':
+                for w in self.L.d(book, 'word'):
+                    self.poetic[w] = 1
+        
+        # generate masoretic word sets in one pass;
+        # a word continues into the next one when its
+        # trailer has a maqqeph or is empty, see masoretic_word
         self.mwords = {}
-        for w in self.F.otype.s('word'):
-            self.mwords[w] = masoretic_word(w, self.tf)
+        mword = []
+        for w in words:
+            mword.append(w)
+            trailer = self.F.trailer.v(w)
+            if not ('&' in str(trailer) or trailer == ''):
+                mword = tuple(mword)
+                for mw in mword:
+                    self.mwords[mw] = mword
+                mword = []
+        if mword:
+            mword = tuple(mword)
+            for mw in mword:
+                self.mwords[mw] = mword
         
         # assemble word sets
         self.accenttype = {}
-        self.atype2set = collections.defaultdict(list)
-        self.atype2name2set = collections.defaultdict(lambda:collections.defaultdict(list))
+        self.atype2set = collections.defaultdict(lambda:array.array('I'))
+        self.atype2name2set = collections.defaultdict(lambda:collections.defaultdict(lambda:array.array('I')))
         
         # loop and assign labels
-        for w in set(self.F.otype.s('word')):
-            dismatches = self.disjunct(w)
-            if not dismatches: # only do if necessary
-                conmatches = self.conjunct(w)                
-            if dismatches:
-                self.accenttype[w] = 'disjunct'
-                self.atype2set['disjunct'].append((w,))
-                self.atype2name2set['disjunct'][dismatches].append((w,))
-            elif conmatches:
-                self.accenttype[w] = 'conjunct'
-                self.atype2set['conjunct'].append((w,))
-                self.atype2name2set['conjunct'][conmatches].append((w,))
-            else:
-                self.accenttype[w] = 'unknown'
-                self.atype2set['unknown'].append((w,))
+        classified = {}
+        for w in words:
+            key = (self.mwords[w], self.bclass(w))
+            if key not in classified:
+                classified[key] = self.classify(*key)
+            atype, matches = classified[key]
+            self.accenttype[w] = atype
+            self.atype2set[atype].append(w)
+            if matches:
+                self.atype2name2set[atype][matches].append(w)
+    
+    def bclass(self, word):
+        '''
+        Returns the accent class of a word's book.
+        '''
+        return '3' if self.poetic[word] else '21'
+    
+    def text(self, mword):
+        '''
+        Returns the clean transcription of a masoretic word.
+        '''
+        return self.clean(self.T.text(mword, fmt='text-trans-full'))
+    
+    def match(self, tests, codes, text):
+        '''
+        Returns the names of the patterns
+        that match the codes and text.
+        '''
+        return tuple(name for name, test in tests.items() if test(codes, text))
+    
+    def classify(self, mword, bclass):
+        '''
+        Returns the accent type of a masoretic word 
+        and the names of its matching accents.
+        '''
+        text = self.text(mword)
+        codes = accent_codes(text)
+        dismatches = self.match(self.disTests[bclass], codes, text)
+        if 73 in codes and self.tiphchah(text):
+            dismatches += ('tiphchah',)
+        if dismatches:
+            return 'disjunct', dismatches
+        conmatches = self.match(self.conTests[bclass], codes, text)
+        if conmatches:
+            return 'conjunct', conmatches
+        return 'unknown', ()
                 
     def clean(self, text):
         '''
@@ -177,19 +286,14 @@ class Accents:
         with a regex match.
         '''
         # get and test phonological unit
-        mword = self.T.text(self.mwords[word], fmt='text-trans-full')
-        mword = self.clean(mword)
-        bclass = book_class(word, self.tf)
+        mword = self.text(self.mwords[word])
         
         # identify and return matches 
-        matches = []
-        for name, patt in self.disRE[bclass].items():
-            if patt.match(mword):
-                matches.append(name)
+        matches = self.match(self.disTests[self.bclass(word)], accent_codes(mword), mword)
         if self.tiphchah(mword):
-            matches.append('tiphchah')
+            matches += ('tiphchah',)
             
-        return tuple(matches)
+        return matches
     
     def tiphchah(self, mword):
         '''
@@ -213,16 +317,10 @@ class Accents:
         in an `elif` only AFTER checking disjunctives.
         '''
         # get and test phonological unit
-        mword = self.T.text(self.mwords[word], fmt='text-trans-full')
-        mword = self.clean(mword)
-        bclass = book_class(word, self.tf)
+        mword = self.text(self.mwords[word])
         
         # identify and return matches 
-        matches = []
-        for name, patt in self.conRE[bclass].items():
-            if patt.match(mword):
-                matches.append(name)
-        return tuple(matches)
+        return self.match(self.conTests[self.bclass(word)], accent_codes(mword), mword)
         
 
 dis21 = {
@@ -3,9 +3,62 @@ Classes that collect data on the grammatical
 environment surrounding a given node.
 '''
 
+import re
+import ast
+import operator
+import functools
 import collections
 
-from positions import Positions, Getter, Evaluator, getnext
+from langtools import context_index
+
+# a condition on a position around the word, e.g.
+# "P(0,'st') == 'c'", "P(1,'sp') != 'art'", "P(2) in nominals",
+# or "P(0,'st') in {'a', 'NA'}"
+cond_re = re.compile(r"^P\((-?\d+)(?:,\s*'(\w+)')?\)\s*(==|!=|not in|in)\s*(.+)$")
+
+comparisons = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    'in': lambda value, values: value in values,
+    'not in': lambda value, values: value not in values,
+}
+
+@functools.lru_cache(maxsize=None)
+def compile_cond(cond):
+    '''
+    Compiles a condition string into a function of
+    a position getter P and a dict of word sets.
+    The right-hand side is either a literal or the
+    name of a word set. Each condition is only
+    compiled once, however many words it is tested on.
+    '''
+    match = cond_re.match(cond.strip())
+    if not match:
+        raise ValueError(f'cannot compile condition {cond!r}')
+    position, feature, comparison, value = match.groups()
+    args = (int(position), feature) if feature else (int(position),)
+    compare = comparisons[comparison]
+    value = value.strip()
+
+    if value.isidentifier():
+        def test(P, sets):
+            return compare(P(*args), sets[value])
+    else:
+        literal = ast.literal_eval(value)
+        def test(P, sets):
+            return compare(P(*args), literal)
+    return test
+
+def getnext(patterns, default=None):
+    '''
+    Returns the item of the first
+    (item, conddict) pattern whose
+    conditions are all True.
+    '''
+    for item, conds in patterns:
+        if all(conds.values()):
+            return item
+    return default
    
 class Mom:
     '''
@@ -16,7 +69,8 @@ class Mom:
     
     Conditions are stored as strings and converted
     to booleans in order to easily diagnose why certain 
-    items are validated.
+    items are validated. Each string is compiled into
+    a function once, see compile_cond.
     
     * the term "relation" is used loosely to
     refer to recurring noun patterns of modification.
@@ -24,23 +78,25 @@ class Mom:
     '''
     
     def __init__(self, n, tf, **kwargs):
-        quants = kwargs['quants'] # word sets
-        preps = kwargs['preps']
-        nominals = kwargs['noms']
         self.context = kwargs.get('context', 'phrase_atom')
         
+        # word sets, by the names used in the conditions
+        self.sets = {'quants': kwargs['quants'],
+                     'preps': kwargs['preps'],
+                     'nominals': kwargs['noms']}
+        
         # set up variables needed for processing / storing
-        P = Positions(n, self.context, tf).get
-        quants = quants
-        preps = preps
+        P = context_index(tf, tf.api.F.otype.v(n), self.context).getter(n)
         self.P = P
         self.kids = {}
         self.explain = {}
         
-        # set up evaluator with namespace as is
-        # NB: Evaluator will rely on variables in
-        # __init__, including P, quants, and preps
-        self.conddict = Evaluator(locals()).conddict
+    def conddict(self, *conds):
+        '''
+        Tests conditions, returning a dict of
+        condition string to boolean.
+        '''
+        return {cond: compile_cond(cond)(self.P, self.sets) for cond in conds}
         
     def analyze(self):
         '''
@@ -5,6 +5,9 @@ This module contains classes to be used
 with a Text-Fabric corpus instance.
 """
 
+import array
+import functools
+
 class Dummy:
     """A place-holder Class for use when supplied node is None"""
     def __init__(self, *args, **kwargs):
@@ -14,6 +17,142 @@ class Dummy:
     def __getattr__(self, name):
         return lambda *args, **kwargs: None
 
+class ContextIndex:
+    """Positions of all nodes of an otype in their contexts.
+    
+    Positions and Walker look up the context of a node and
+    the index of the node within it each time they are made.
+    A ContextIndex does so once for all nodes of an otype,
+    after which any position around a node is a matter of
+    arithmetic on a few arrays:
+    
+        nodes: the nodes of the otype grouped by context,
+            in the order of L.d
+        offsets: the nodes of context c are found at
+            nodes[offsets[c]:offsets[c+1]]
+        contexts: the context of each node, or -1 for none
+        where: the index of each node in nodes
+    
+    The arrays of a node are read at node - first,
+    where first is the first node of the otype.
+    """
+    
+    def __init__(self, tf, otype, context):
+        """Index the nodes of an otype in a context.
+        
+        Arguments:
+            tf: an instance of Text-Fabric with a loaded corpus.
+            otype: the otype of the nodes to index, e.g. "word"
+            context: the otype of their context, e.g. "phrase_atom"
+        """
+        F, L = tf.api.F, tf.api.L
+        self.tf = tf.api
+        self.otype = otype
+        self.slots = otype == F.otype.slotType
+        self.first, last = F.otype.sInterval(otype)
+        
+        self.nodes = array.array('I')
+        self.offsets = array.array('I', [0])
+        self.contexts = array.array('l', [-1]) * (last - self.first + 1)
+        self.where = array.array('l', [-1]) * (last - self.first + 1)
+        self.values = {}
+        
+        # a node in several contexts belongs to
+        # the one Positions would choose, L.u(n, context)[0]
+        chosen = array.array('l', [0]) * (last - self.first + 1)
+        for node in F.otype.s(otype):
+            up = L.u(node, context)
+            chosen[node - self.first] = up[0] if up else 0
+        
+        for c in F.otype.s(context):
+            context_i = len(self.offsets) - 1
+            for node in L.d(c, otype):
+                if chosen[node - self.first] == c:
+                    self.contexts[node - self.first] = context_i
+                    self.where[node - self.first] = len(self.nodes)
+                self.nodes.append(node)
+            self.offsets.append(len(self.nodes))
+            
+    def span(self, n):
+        """Return the (start, index, end) of a node in nodes,
+        or None if the node has no context."""
+        i = n - self.first
+        if not 0 <= i < len(self.contexts) or self.contexts[i] == -1:
+            return None
+        c = self.contexts[i]
+        return self.offsets[c], self.where[i], self.offsets[c+1]
+    
+    def node(self, n, position, order='slot'):
+        """Get the node (+/-)N positions away in the context of n.
+        
+        Arguments:
+            n: the origin node
+            position: a positive or negative integer
+            order: "slot" or "node", see Positions.
+        """
+        span = self.span(n)
+        if span is None:
+            return None
+        start, index, end = span
+        
+        # node order: the neighbours in the context
+        if order == 'node':
+            index += position
+            return self.nodes[index] if start <= index < end else None
+        
+        # slot order: slots are their own neighbours
+        # other nodes are stepped through as Positions does
+        if self.slots:
+            target = n + position
+        else:
+            L = self.tf.L
+            move = L.p if position < 0 else L.n
+            target = n
+            for count in range(0, abs(position)):
+                target = next(iter(move(target, self.otype)), 0)
+        target_i = target - self.first
+        if 0 <= target_i < len(self.contexts):
+            if self.contexts[target_i] == self.contexts[n - self.first]:
+                return target
+            if target in self.nodes[start:end]:
+                return target
+        return None
+    
+    def value(self, feature, n):
+        """Get the value of a feature for a node."""
+        if feature not in self.values:
+            self.values[feature] = self.tf.Fs(feature).v
+        return self.values[feature](n)
+    
+    def get(self, n, position, *features, order='slot'):
+        """Get data on node (+/-)N positions away from n.
+        
+        Works as Positions.get, without making a Positions.
+        """
+        target = self.node(n, position, order)
+        if not features:
+            return target or None
+        elif len(features) == 1:
+            return self.value(features[0], target) if target else ''
+        else:
+            return set(self.value(feat, target) for feat in features) if target else set()
+    
+    def getter(self, n, order='slot'):
+        """Return a get function for an origin node, 
+        i.e. Positions(n, context, tf).get"""
+        return functools.partial(self.get, n, order=order)
+
+# context indexes made by context_index
+_indexes = {}
+
+def context_index(tf, otype, context):
+    """Return the ContextIndex of an otype in a context,
+    making it when it is first needed."""
+    key = (id(tf.api), otype, context)
+    if key not in _indexes:
+        _indexes[key] = ContextIndex(tf, otype, context)
+    return _indexes[key]
+
 class Positions:
     """Access positions around a node in a context.
     
@@ -21,7 +160,7 @@ class Positions:
     that is (+/-)N positions away in a context.
     """
     
-    def __init__(self, n, context, tf, order='slot'):
+    def __init__(self, n, context, tf, order='slot', index=None):
         """Prepare context and positions for a supplied TF node.
         
         Arguments:
@@ -32,8 +171,18 @@ class Positions:
             tf: an instance of Text-Fabric with a loaded corpus.
             order: The method of order to use for the search.
                 Options are "slot" or "node."
+            index: an optional ContextIndex of the node's otype
+                in the context; positions are then looked up in
+                the index instead of being prepared for the node.
         """
         
+        self.index = index
+        if index is not None:
+            self.n = n
+            self.method = order
+            self.get = index.getter(n, order)
+            return
+        
         self.tf = tf.api
         self.n = n
         self.method = order
@@ -167,18 +316,29 @@ class Walker:
             returns True for a supplied function
     """
     
-    def __init__(self, n, context, tf=None):
+    def __init__(self, n, context, tf=None, index=None):
         """Initialize paths for a node.
         Arguments:
             n: Text-Fabric corpus node
             context: otype string of the supplied node's context to lookup
             tf: Running instance of Text-Fabric corpus
+            index: an optional ContextIndex of the node's otype
+                in the context, in which the paths are found
+                without preparing them for the node
         """
+        if index is not None:
+            span = index.span(n)
+            if span is None:
+                raise IndexError(f'node {n} has no {context}')
+            self.positions = index.nodes
+            self.start, self.index, self.end = span
+            return
         tf = tf.api      
         thisotype = tf.F.otype.v(n)
         context = tf.L.u(n, context)[0]
         self.positions = list(tf.L.d(context, thisotype))
         self.index = self.positions.index(n)
+        self.start, self.end = 0, len(self.positions)
 
     def ahead(self, val_funct, **kwargs):
         """Walk ahead to node.
@@ -202,7 +362,7 @@ class Walker:
             output: return output of the val_funct instead of the
                 node itself.
         """
-        path = self.positions[self.index+1:]
+        path = map(self.positions.__getitem__, range(self.index+1, self.end))
         return self.firstresult(path, val_funct, **kwargs)
             
     def back(self, val_funct, **kwargs):
@@ -227,8 +387,7 @@ class Walker:
             output: return output of the val_funct instead of the
                 node itself.
         """
-        path = self.positions[:self.index]
-        path.reverse()
+        path = map(self.positions.__getitem__, range(self.index-1, self.start-1, -1))
         return self.firstresult(path, val_funct, **kwargs)
         
     def firstresult(self, path, val_funct, **kwargs):
@@ -5,59 +5,118 @@ These functions require pre-processed word sets
 of quantifiers and prepositions.
 '''
 
+import array
 import collections
-from positions import Positions
 from context import Mom
 
 class Conjunction:
     '''
     Assembles attested conjunction word-pairs in BHSA.
     Returns a dict mapping from a word to all its pairs.
+    
+    A chain starts from a nominal word, its root, and follows
+    the coordinate of every word in turn. A chain that runs
+    into the words of an earlier chain is a part of it and is
+    not walked again, but two roots that coordinate to the same
+    word keep separate chains, which share the rest of the words.
+    The coordinate of each word is looked up once. The chains are 
+    kept as arrays, where the words of chain i are 
+    chain_words[chain_offsets[i]:chain_offsets[i+1]], and
+    roots maps the root of each chain to i.
+    
+    The pairs are collected per lexeme, so a chain costs
+    its words plus the pairs of its lexemes. The word pairs 
+    behind them are only listed when pairresults is read.
     '''
     
     def __init__(self, tf, **wsets):
         
         self.tf = tf
         F = tf.api.F
-        covered = set() # skip items already matched
         self.wsets = wsets
         self.pairs = collections.defaultdict(set)
-        self.pairresults = collections.defaultdict(lambda:collections.defaultdict(list))
-    
-        # gather pairs
+        self.paircounts = collections.defaultdict(collections.Counter)
+        self._pairresults = None
+        
+        self.coordinates = {}
+        covered = set() # words reached from a root
+        
+        self.chain_offsets = array.array('I', [0])
+        self.chain_words = array.array('I')
+        self.roots = {}
+        
         for w in F.otype.s('word'):
-
+        
             # skip words already visited in a chain
             # or those that are not nominal parts of speech
             if w in covered or w not in wsets['noms']:
                 continue
-
-            # check for chain
+            
             chain = list(self.conj_climber(w))
-            if not chain:
+            if len(chain) < 2:
                 continue
-
-            # add pairs
-            for i in chain:
-                for j in chain:
-                    if i == j:
-                        continue
-                    self.pairs[F.lex.v(i)].add(F.lex.v(j))
-                    self.pairresults[F.lex.v(i)][F.lex.v(j)].append((i, j))
-
+            covered.update(chain[1:])
+            
+            self.roots[w] = len(self.chain_offsets) - 1
+            self.chain_words.extend(chain)
+            self.chain_offsets.append(len(self.chain_words))
+            self.add_pairs(chain)
+    
+    def coordinate(self, w):
+        '''
+        Returns the coordinate of w, if any.
+        '''
+        if w not in self.coordinates:
+            self.coordinates[w] = Mom(w, self.tf, **self.wsets).coordinate()
+        return self.coordinates[w]
+    
     def conj_climber(self, a):
         '''
-        Climbs down conjunction chains recursively
+        Climbs down a conjunction chain
         and yields the connected words. Start with first word.
         '''
+        while a:
+            yield a
+            a = self.coordinate(a)
+    
+    def chains(self):
+        '''
+        Yields the words of every chain.
+        '''
+        for i in range(len(self.chain_offsets) - 1):
+            yield self.chain_words[self.chain_offsets[i]:self.chain_offsets[i+1]]
+    
+    def add_pairs(self, chain):
+        '''
+        Adds the pairs of the lexemes in a chain,
+        counting a pair of lexemes once for every 
+        pair of their words.
+        '''
         F = self.tf.api.F
-
-        yield a
-
-        b = Mom(a, self.tf, **self.wsets).coordinate()
-
-        if b:
-            yield from self.conj_climber(b)
+        lexcounts = collections.Counter(F.lex.v(w) for w in chain)
+        
+        for lex_i, count_i in lexcounts.items():
+            for lex_j, count_j in lexcounts.items():
+                count = count_i * (count_j - 1 if lex_i == lex_j else count_j)
+                if count:
+                    self.pairs[lex_i].add(lex_j)
+                    self.paircounts[lex_i][lex_j] += count
+    
+    @property
+    def pairresults(self):
+        '''
+        A dict of lexeme to lexeme to the
+        (word, word) pairs of the chains.
+        '''
+        if self._pairresults is None:
+            F = self.tf.api.F
+            self._pairresults = collections.defaultdict(lambda:collections.defaultdict(list))
+            for chain in self.chains():
+                for i in chain:
+                    for j in chain:
+                        if i != j:
+                            self._pairresults[F.lex.v(i)][F.lex.v(j)].append((i, j))
+        return self._pairresults
             
 class Construct:
     '''
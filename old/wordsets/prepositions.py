@@ -4,7 +4,7 @@ Delivers custom prepositions.
 
 import csv
 import collections
-from positions import Positions
+from langtools import context_index
 
 class Preps:
     
@@ -29,6 +29,9 @@ class Preps:
             rosh_annotes = list(csv.reader(infile))[1:]
             rosh_kids = [row[-2] for row in rosh_annotes if row[-1] == 'y']
         
+        # positions of all words in their phrase atoms
+        positions = context_index(tf, 'word', 'phrase_atom')
+
         # begin word loop
         for w in F.otype.s('word'):
             
@@ -36,7 +39,7 @@ class Preps:
             if F.sp.v(w) not in {'prep', 'subs', 'adjv', 'advb'}:
                 continue
             
-            P = Positions(w, 'phrase_atom', tf).get
+            P = positions.getter(w)
             
             # Set up potential construct position
             # NB! still requires a check for construct state
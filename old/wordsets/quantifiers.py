@@ -1,4 +1,4 @@
-from positions import Positions
+from langtools import context_index
 
 class Quants:
     
@@ -14,11 +14,14 @@ class Quants:
         quants = set()
         quants |= set(F.ls.s('card')) & set(F.otype.s('word'))
 
+        # positions of all words in their phrase atoms
+        positions = context_index(tf, 'word', 'phrase_atom')
+
         # -- contextual cases -- 
         
         for w in F.otype.s('word'):
         
-            P = Positions(w, 'phrase_atom', tf).get
+            P = positions.getter(w)
         
             # -- custom lexemes-- 
             custom = {'KL/', 'M<V/', 'JTR/',
@@ -0,0 +1,247 @@
+'''
+A columnar store of the word sets.
+
+The word sets are written into a folder of flat
+arrays, rather than one pickle of sets and dicts:
+
+    • schema.json - the format, the BHSA version, and
+      the kind and values of every member
+    • strings.json - the lexemes of the pairs, each stored once
+    • <set>.npy - the sorted nodes of noms, preps, and quants
+    • accent_type.codes.npy - a code per word node, whose
+      values are listed in the schema, with 0 for no value
+    • mwords, conj_pairs, cons_pairs - CSR arrays, where the
+      targets of i are targets[offsets[i]:offsets[i+1]];
+      mwords go from word nodes to word nodes, and the
+      pairs from string ids to string ids
+
+The arrays are .npy files, which NumPy reads as well. They
+are written and memory mapped by write_array and read_array,
+copies of those in heads.arrays, so that the scripts here
+do not depend on the heads package. A member is only read
+when it is first used, and is returned as a read-only mapping
+or set over its arrays, so nothing is unpacked at load time.
+'''
+
+import os
+import ast
+import sys
+import json
+import mmap
+import array
+import bisect
+import struct
+import collections.abc
+
+# the version of the layout of the store
+FORMAT = 1
+
+# the .npy dtypes of the array typecodes
+DTYPES = {'I': '<u4', 'H': '<u2', 'B': '|u1'}
+
+SETS = ('noms', 'preps', 'quants')
+PAIRS = ('conj_pairs', 'cons_pairs')
+
+def write_array(path, values):
+    '''
+    Writes an array as a .npy file.
+    '''
+    header = f"{{'descr': '{DTYPES[values.typecode]}', 'fortran_order': False, 'shape': ({len(values)},), }}"
+    # the data start is aligned to 64 bytes, as NumPy does
+    header += ' ' * (63 - (10 + len(header)) % 64) + '\n'
+    with open(path, 'wb') as outfile:
+        outfile.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+        if sys.byteorder == 'big' and values.itemsize > 1:
+            values = array.array(values.typecode, values)
+            values.byteswap()
+        values.tofile(outfile)
+
+def read_array(path):
+    '''
+    Memory maps a .npy file written by write_array,
+    and returns it as a memoryview of its items.
+    '''
+    with open(path, 'rb') as infile:
+        data = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    header_length, = struct.unpack('<H', data[8:10])
+    header = ast.literal_eval(data[10:10+header_length].decode('latin1'))
+    typecode = {dtype: code for code, dtype in DTYPES.items()}[header['descr']]
+    values = memoryview(data)[10+header_length:]
+    if sys.byteorder == 'big' and typecode != 'B':
+        values = array.array(typecode, values)
+        values.byteswap()
+        return values
+    return values.cast(typecode)
+
+def csr(mapping, size):
+    '''
+    Returns offsets and targets arrays of a mapping
+    from ints below size to collections of ints.
+    '''
+    offsets = array.array('I', [0])
+    targets = array.array('I')
+    for i in range(size):
+        targets.extend(sorted(mapping.get(i, ())))
+        offsets.append(len(targets))
+    return offsets, targets
+
+def write(directory, version, wsets):
+    '''
+    Writes the word sets of a wsets dict,
+    as made by wordsets.py, into directory.
+    '''
+    os.makedirs(directory, exist_ok=True)
+    path = lambda name: os.path.join(directory, f'{name}.npy')
+    schema = {'format': FORMAT, 'version': version, 'members': {}}
+    max_node = max(wsets['mwords'])
+
+    for name in SETS:
+        write_array(path(name), array.array('I', sorted(wsets[name])))
+        schema['members'][name] = {'kind': 'set'}
+
+    values = [None] + sorted(set(wsets['accent_type'].values()))
+    codes = array.array('B', bytes(max_node + 1))
+    for node, value in wsets['accent_type'].items():
+        codes[node] = values.index(value)
+    write_array(path('accent_type.codes'), codes)
+    schema['members']['accent_type'] = {'kind': 'codes', 'values': values}
+
+    offsets, targets = csr(wsets['mwords'], max_node + 1)
+    write_array(path('mwords.offsets'), offsets)
+    write_array(path('mwords.targets'), targets)
+    schema['members']['mwords'] = {'kind': 'nodes'}
+
+    strings = set()
+    for name in PAIRS:
+        for lex, lexs in wsets[name].items():
+            strings.add(lex)
+            strings.update(lexs)
+    strings = sorted(strings)
+    string_ids = {string: i for i, string in enumerate(strings)}
+    for name in PAIRS:
+        pairs = {string_ids[lex]: [string_ids[pair] for pair in lexs]
+                    for lex, lexs in wsets[name].items()}
+        offsets, targets = csr(pairs, len(strings))
+        write_array(path(f'{name}.offsets'), offsets)
+        write_array(path(f'{name}.targets'), targets)
+        schema['members'][name] = {'kind': 'strings'}
+
+    with open(os.path.join(directory, 'strings.json'), 'w') as outfile:
+        json.dump(strings, outfile)
+    with open(os.path.join(directory, 'schema.json'), 'w') as outfile:
+        json.dump(schema, outfile, indent=1)
+
+class SortedNodes(collections.abc.Set):
+    '''
+    A set of nodes over a sorted array.
+    '''
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+
+    def __contains__(self, node):
+        i = bisect.bisect_left(self.nodes, node)
+        return i < len(self.nodes) and self.nodes[i] == node
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+class CodeMap(collections.abc.Mapping):
+    '''
+    A mapping of nodes to values over an array of codes.
+    '''
+
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = values
+
+    def __getitem__(self, node):
+        if not 0 <= node < len(self.codes) or not self.codes[node]:
+            raise KeyError(node)
+        return self.values[self.codes[node]]
+
+    def __iter__(self):
+        return (node for node, code in enumerate(self.codes) if code)
+
+    def __len__(self):
+        return sum(1 for code in self.codes if code)
+
+class GroupMap(collections.abc.Mapping):
+    '''
+    A mapping of ints to tuples over CSR arrays,
+    with the ints and tuple items translated by
+    a table of strings if given.
+    '''
+
+    def __init__(self, offsets, targets, strings=None):
+        self.offsets = offsets
+        self.targets = targets
+        self.strings = strings
+        if strings is not None:
+            self.string_ids = {string: i for i, string in enumerate(strings)}
+
+    def __getitem__(self, key):
+        i = self.string_ids.get(key, -1) if self.strings is not None else key
+        if not 0 <= i < len(self.offsets) - 1 or self.offsets[i] == self.offsets[i+1]:
+            raise KeyError(key)
+        targets = self.targets[self.offsets[i]:self.offsets[i+1]]
+        if self.strings is not None:
+            return tuple(self.strings[target] for target in targets)
+        return tuple(targets)
+
+    def __iter__(self):
+        for i in range(len(self.offsets) - 1):
+            if self.offsets[i] != self.offsets[i+1]:
+                yield self.strings[i] if self.strings is not None else i
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+class WordSetStore:
+    '''
+    Loads the members of a store when
+    they are first used, e.g. store['noms'].
+    '''
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, 'schema.json')) as infile:
+            self.schema = json.load(infile)
+        if self.schema['format'] != FORMAT:
+            raise Exception(f"word sets of format {self.schema['format']} cannot be read, expected {FORMAT}")
+        self.directory = directory
+        self.version = self.schema['version']
+        self.members = {}
+        self._strings = None
+
+    def array(self, name):
+        return read_array(os.path.join(self.directory, f'{name}.npy'))
+
+    @property
+    def strings(self):
+        if self._strings is None:
+            with open(os.path.join(self.directory, 'strings.json')) as infile:
+                self._strings = json.load(infile)
+        return self._strings
+
+    def load(self, name):
+        '''
+        Reads a member from its arrays.
+        '''
+        member = self.schema['members'][name]
+        if member['kind'] == 'set':
+            return SortedNodes(self.array(name))
+        if member['kind'] == 'codes':
+            return CodeMap(self.array(f'{name}.codes'), member['values'])
+        strings = self.strings if member['kind'] == 'strings' else None
+        return GroupMap(self.array(f'{name}.offsets'), self.array(f'{name}.targets'), strings)
+
+    def __getitem__(self, name):
+        if name not in self.members:
+            self.members[name] = self.load(name)
+        return self.members[name]
+
+    def __iter__(self):
+        return iter(self.schema['members'])
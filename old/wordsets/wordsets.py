@@ -11,10 +11,11 @@ and semantic heads. This includes:
     • attested construct pair sets
     
 The sets are built by querying the corpus
-for matching patterns. 
+for matching patterns, and are written
+as a columnar store, see store.py.
 '''
 
-import pickle
+import store
 from tf.app import use
 from accents import Accents
 from nominals import Nominals
@@ -22,7 +23,7 @@ from quantifiers import Quants
 from prepositions import Preps
 from pairs import Conjunction, Construct
 
-output = 'wsets.pickle'
+output = 'wsets'
 
 class WordSets:
     '''
@@ -77,7 +78,7 @@ print('\n-- RUNNING WORDSETS --\n')
 wsets = WordSets(A, silent=False)
 print('\n-- WSETS COMPLETE --')
 
-print('\npickleing word sets...')
+print('\nstoring word sets...')
 export = {
     'noms': wsets.noms,
     'preps': wsets.preps,
@@ -88,6 +89,6 @@ export = {
     'cons_pairs': wsets.cons.pairs,
 }
 
-pickle.dump(export, open(output, 'wb'))
+store.write(output, A.version, export)
 
 print('\n!*!*!*! DONE !*!*!*!')
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+import mini
+
+# the scripts of old/wordsets import each other by name
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'old', 'wordsets'))
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    '''
+    The test corpus, see mini.
+    '''
+    return mini.load(str(tmp_path_factory.mktemp('mini')))
+
+@pytest.fixture(scope='session')
+def build(app):
+    '''
+    A build of the test corpus, with the
+    templates of the native types checked.
+    '''
+    from heads.pipeline import Build
+    return Build(app, 'test', check=True).run()
@@ -0,0 +1,207 @@
+'''
+A small corpus in the shape of the BHSA, for the tests.
+
+It has the object types, features and mother edges that the
+production line reads, in four verses: Genesis 1:1-2, with
+prepositional, nominal, quantified and verbal phrases, and
+Jeremiah 32:32 and 40:1. With `copies`, Genesis 1 is repeated
+as chapters 1..copies, so that searches over the whole corpus
+cost noticeably more than searches over one verse.
+'''
+
+import os
+from types import SimpleNamespace
+
+from tf.fabric import Fabric
+
+# the object types from the biggest to the slots
+OTYPES = ('book', 'chapter', 'verse', 'clause_atom', 'phrase', 'phrase_atom', 'subphrase')
+
+# the seeds of the tests on random structures
+SEEDS = range(10)
+
+WORD_FEATURES = ('g_cons_utf8', 'g_word_utf8', 'lex', 'pdp', 'sp', 'ls', 'st', 'nu', 'prs', 'vt', 'trailer')
+
+class Corpus:
+    '''
+    Collects words and objects, and writes them as TF features.
+    '''
+
+    def __init__(self):
+        self.words = []
+        self.objects = {otype: [] for otype in OTYPES}
+        self.mothers = []
+
+    def word(self, text, lex, pdp, **features):
+        values = {'g_cons_utf8': text, 'g_word_utf8': text, 'lex': lex, 'pdp': pdp, 'sp': pdp,
+                  'ls': 'NA', 'st': 'NA', 'nu': 'NA', 'prs': 'absent', 'vt': 'NA', 'trailer': ' '}
+        values.update(features)
+        self.words.append(values)
+        return len(self.words)
+
+    def add(self, otype, slots, mother=None, **features):
+        self.objects[otype].append((tuple(slots), features))
+        key = (otype, len(self.objects[otype]) - 1)
+        if mother is not None:
+            self.mothers.append((key, mother))
+        return key
+
+    def genesis(self, chapter):
+        '''
+        Adds Genesis chapter:1-2.
+        '''
+        word, add = self.word, self.add
+        v1 = [word('ב', 'B', 'prep'), word('ראשית', 'R>CJT/', 'subs'), word('ברא', 'BR>[', 'verb'),
+              word('אלהים', '>LHJM/', 'subs'), word('את', '>T', 'prep'), word('ה', 'H', 'art'),
+              word('שמים', 'CMJM/', 'subs'), word('ו', 'W', 'conj'), word('את', '>T', 'prep'),
+              word('ה', 'H', 'art'), word('ארץ', '>RY/', 'subs')]
+        v2 = [word('כל', 'KL/', 'subs', st='c'), word('ה', 'H', 'art'), word('עם', '<M/', 'subs'),
+              word('שלשה', 'CLC/', 'subs', ls='card'), word('בנים', 'BN/', 'subs', nu='pl'),
+              word('הוא', 'HW>', 'prps'), word('לא', 'L>', 'nega'), word('עשה', '<FH[', 'verb'),
+              word('ב', 'B', 'prep'), word('יום', 'JWM/', 'subs'), word('יום', 'JWM/', 'subs'),
+              word('שנה', 'CNH/', 'subs'), word('שנה', 'CNH/', 'subs')]
+        add('chapter', v1 + v2, book='Genesis', chapter=chapter)
+        add('verse', v1, book='Genesis', chapter=chapter, verse=1)
+        add('verse', v2, book='Genesis', chapter=chapter, verse=2)
+        add('clause_atom', v1, number=1)
+        add('clause_atom', v2[:5], number=2)
+        add('clause_atom', v2[5:], number=3)
+
+        add('phrase', v1[0:2], typ='PP', number=1, function='Time')
+        add('phrase_atom', v1[0:2], typ='PP', rela='NA')
+        add('phrase', v1[2:3], typ='VP', number=2)
+        add('phrase_atom', v1[2:3], typ='VP', rela='NA')
+        add('phrase', v1[3:4], typ='NP', number=3)
+        add('phrase_atom', v1[3:4], typ='NP', rela='NA')
+        add('phrase', v1[4:], typ='PP', number=4)
+        atom = add('phrase_atom', v1[4:7], typ='PP', rela='NA')
+        add('phrase_atom', v1[7:], typ='PP', rela='Para', mother=atom)
+        sub = add('subphrase', v1[4:7], rela='NA')
+        add('subphrase', v1[7:], rela='par', mother=sub)
+
+        add('phrase', v2[0:3], typ='NP', number=1)
+        add('phrase_atom', v2[0:3], typ='NP', rela='NA')
+        add('subphrase', v2[1:3], rela='rec', mother=('word', v2[0]))
+        add('phrase', v2[3:5], typ='NP', number=2)
+        add('phrase_atom', v2[3:5], typ='NP', rela='NA')
+        sub = add('subphrase', v2[4:5], rela='NA')
+        add('subphrase', v2[3:4], rela='adj', mother=sub)
+        add('phrase', v2[5:6], typ='PPrP', number=1)
+        add('phrase_atom', v2[5:6], typ='PPrP', rela='NA')
+        add('phrase', v2[6:7], typ='NegP', number=2)
+        add('phrase_atom', v2[6:7], typ='NegP', rela='NA')
+        add('phrase', v2[7:8], typ='VP', number=3)
+        add('phrase_atom', v2[7:8], typ='VP', rela='NA')
+        add('phrase', v2[8:11], typ='PP', number=4)
+        atom = add('phrase_atom', v2[8:10], typ='PP', rela='NA')
+        add('phrase_atom', v2[10:], typ='NP', rela='Spec', mother=atom)
+        sub = add('subphrase', v2[9:10], rela='NA')
+        add('subphrase', v2[10:11], rela='adj', mother=sub)
+        add('phrase', v2[11:13], typ='NP', number=5)
+        atom = add('phrase_atom', v2[11:12], typ='NP', rela='NA')
+        add('phrase_atom', v2[12:13], typ='NP', rela='Spec', mother=atom)
+        return v1 + v2
+
+    def jeremiah(self):
+        '''
+        Adds Jeremiah 32:32 and 40:1.
+        '''
+        word, add = self.word, self.add
+        v1 = [word('בני', 'BN/', 'subs', st='c'), word('יהודה', 'JHWDH/', 'nmpr')]
+        v2 = [word('יהודה', 'JHWDH/', 'nmpr')]
+        add('book', v1 + v2, book='Jeremiah', **{'book@en': 'Jeremiah'})
+        for chapter, verse, slots in ((32, 32, v1), (40, 1, v2)):
+            add('chapter', slots, book='Jeremiah', chapter=chapter)
+            add('verse', slots, book='Jeremiah', chapter=chapter, verse=verse)
+            add('clause_atom', slots, number=1)
+        add('phrase', v1, typ='NP', number=1)
+        add('phrase_atom', v1, typ='NP', rela='NA')
+        add('phrase', v2, typ='PrNP', number=1)
+        add('phrase_atom', v2, typ='PrNP', rela='NA')
+
+    def save(self, location):
+        '''
+        Writes the corpus as TF features to location.
+        '''
+        max_slot = len(self.words)
+        otype = {slot: 'word' for slot in range(1, max_slot + 1)}
+        oslots, nodes = {}, {}
+        node_features = {feature: {slot: values[feature] for slot, values in enumerate(self.words, 1)}
+                            for feature in WORD_FEATURES}
+        node = max_slot
+        # TF numbers the objects by type, from the biggest type on
+        for otype_name in OTYPES:
+            # the objects of a type in canonical order
+            objects = sorted(enumerate(self.objects[otype_name]), key=lambda item: (item[1][0][0], -len(item[1][0])))
+            for i, (slots, features) in objects:
+                node += 1
+                nodes[(otype_name, i)] = node
+                otype[node] = otype_name
+                oslots[node] = set(slots)
+                for feature, value in features.items():
+                    node_features.setdefault(feature, {})[node] = value
+        node_features['otype'] = otype
+
+        def target(key):
+            return key[1] if key[0] == 'word' else nodes[key]
+        mother = {nodes[key]: {target(mother)} for key, mother in self.mothers}
+
+        meta = {'': {'coreData': 'BHSA'},
+                'otext': {'sectionTypes': 'book,chapter,verse', 'sectionFeatures': 'book,chapter,verse',
+                          'fmt:text-orig-full': '{g_word_utf8}{trailer}'},
+                'otype': {'valueType': 'str'}, 'oslots': {'valueType': 'str'}, 'mother': {'valueType': 'str'}}
+        for feature in node_features:
+            if feature != 'otype':
+                meta[feature] = {'valueType': 'int' if feature in ('number', 'chapter', 'verse') else 'str'}
+        TF = Fabric(locations=location, silent='deep')
+        TF.save(nodeFeatures=node_features, edgeFeatures={'oslots': oslots, 'mother': mother},
+                metaData=meta, silent='deep')
+
+def make(location, copies=1):
+    '''
+    Writes the corpus to location, with Genesis 1 copies times.
+    '''
+    corpus = Corpus()
+    slots = []
+    for chapter in range(1, copies + 1):
+        slots.extend(corpus.genesis(chapter))
+    # the book goes before its chapters
+    corpus.objects['book'].insert(0, (tuple(slots), {'book': 'Genesis', 'book@en': 'Genesis'}))
+    corpus.jeremiah()
+    corpus.save(location)
+    return location
+
+class App:
+    '''
+    A stand in for the TF app of a BHSA version, loaded from location.
+    '''
+
+    def __init__(self, location):
+        TF = Fabric(locations=location, silent='deep')
+        self.api = TF.loadAll(silent='deep')
+        self.api.TF = TF
+
+    def search(self, template, silent=True, sets=None, shallow=False, **kwargs):
+        results = self.api.S.search(template, sets=sets, shallow=shallow, silent='deep')
+        return results if shallow else sorted(results)
+
+def load(location, copies=1):
+    '''
+    Makes the corpus in location if it is not there, and loads it.
+    '''
+    if not os.path.exists(os.path.join(location, 'otype.tf')):
+        make(location, copies)
+    return App(location)
+
+def fake_api(otypes, **features):
+    '''
+    A stand in for the F of a TF api, for the structures that
+    the corpus is too small to have: otypes maps an object type
+    to its nodes in order, and a feature maps nodes to values.
+    '''
+    node_types = {node: otype for otype, nodes in otypes.items() for node in nodes}
+    otype = SimpleNamespace(all=tuple(otypes), maxNode=max(node_types), v=node_types.get,
+                            s=lambda otype: tuple(otypes.get(otype, ())),
+                            sInterval=lambda otype: (min(otypes[otype]), max(otypes[otype])))
+    return SimpleNamespace(F=SimpleNamespace(otype=otype, **{feature: SimpleNamespace(v=values.get)
+                                                             for feature, values in features.items()}))
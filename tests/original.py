@@ -0,0 +1,332 @@
+'''
+The original implementations that were rewritten for speed,
+kept as they were so that the tests can check the rewrites
+against them.
+'''
+
+import re
+import collections
+
+from context import Mom
+
+class Positions:
+    '''
+    Positions around a node in a context,
+    from old/wordsets/langtools.py.
+    '''
+
+    def __init__(self, n, context, tf, order='slot'):
+        self.tf = tf.api
+        self.n = n
+        self.method = order
+        self.thisotype = tf.api.F.otype.v(n)
+        context = tf.api.L.u(n, context)[0]
+        self.positions = tf.api.L.d(context, self.thisotype)
+        if order == 'node':
+            self.originindex = self.positions.index(n)
+
+    def nodepos(self, position):
+        pos_index = self.originindex + position
+        pos_index = pos_index if (pos_index > -1) else None
+        try:
+            return self.positions[pos_index]
+        except (IndexError, TypeError):
+            return None
+
+    def slotpos(self, position):
+        L = self.tf.L
+        if position < 0:
+            move = L.p
+        else:
+            move = L.n
+        get_pos = self.n
+        for count in range(0, abs(position)):
+            get_pos = next(iter(move(get_pos, self.thisotype)), 0)
+        if get_pos in self.positions:
+            return get_pos
+        else:
+            return None
+
+    def get(self, position, *features):
+        if self.method == 'slot':
+            get_pos = self.slotpos(position)
+        elif self.method == 'node':
+            get_pos = self.nodepos(position)
+
+        if get_pos:
+            Fs = self.tf.Fs
+            if not features:
+                return get_pos
+            elif len(features) == 1:
+                return Fs(features[0]).v(get_pos)
+            elif len(features) > 1:
+                return set(Fs(feat).v(get_pos) for feat in features)
+
+        elif get_pos not in self.positions:
+            if not features:
+                return None
+            elif len(features) == 1:
+                return ''
+            elif len(features) > 1:
+                return set()
+
+class Walker:
+    '''
+    Walks from a node to the first node in its
+    context that passes a test, from old/wordsets/langtools.py.
+    '''
+
+    def __init__(self, n, context, tf=None):
+        tf = tf.api
+        thisotype = tf.F.otype.v(n)
+        context = tf.L.u(n, context)[0]
+        self.positions = list(tf.L.d(context, thisotype))
+        self.index = self.positions.index(n)
+
+    def ahead(self, val_funct, **kwargs):
+        path = self.positions[self.index+1:]
+        return self.firstresult(path, val_funct, **kwargs)
+
+    def back(self, val_funct, **kwargs):
+        path = self.positions[:self.index]
+        path.reverse()
+        return self.firstresult(path, val_funct, **kwargs)
+
+    def firstresult(self, path, val_funct, **kwargs):
+        stop = kwargs.get('stop') or (lambda n: False)
+        go = kwargs.get('go') or (lambda n: True)
+        for node in path:
+            test = val_funct(node)
+            if test:
+                if not kwargs.get('output', False):
+                    return node
+                else:
+                    return test
+            elif not go(node):
+                break
+            elif stop(node):
+                break
+
+class Evaluator:
+    '''
+    Tests the conditions of the original Mom by
+    evaluating them in its namespace, as the
+    positions package did.
+    '''
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    def conddict(self, *conds):
+        return {cond: eval(cond, None, self.namespace) for cond in conds}
+
+def masoretic_word(word, tf):
+    '''
+    The words of the masoretic word of a word,
+    from old/wordsets/accents.py.
+    '''
+    F = tf.api.F
+    mwords = {word}
+    thisword = word-1
+    while ('&' in str(F.trailer.v(thisword))) or (F.trailer.v(thisword) == ''):
+        mwords.add(thisword)
+        thisword = thisword-1
+    thisword = word
+    while ('&' in str(F.trailer.v(thisword))) or (F.trailer.v(thisword) == ''):
+        mwords.add(thisword+1)
+        thisword = thisword+1
+    return tuple(sorted(mwords))
+
+class Accents:
+    '''
+    Classifies words as disjunct or conjunct by matching
+    the accent regexes on the transcription of every word,
+    from old/wordsets/accents.py.
+    '''
+
+    disA = {
+        '21': {
+            'paseq': '.*05',
+            'atnach': '.*92',
+            'silluq': '.*75',
+            'zaqeph qaton': '.*80',
+            'zaqeph gadol': '.*85',
+            'segolta': '.*01',
+            'shalshelet': '.*65',
+            'rebia': '.*81',
+            'zarqa': '.*02',
+            'pashta': '.*03',
+            'yetiv': '.*10',
+            'tebir': '.*91',
+            'geresh': '.*(61|11)',
+            'gershayim': '.*62',
+            'pazer qaton': '.*83',
+            'qarney parah': '.*84',
+            'telisha gedola': '.*(14|44)',
+        },
+        '3': {
+            'paseq': '.*05',
+            'atnach': '.*92',
+            'silluq': '.*75',
+            'rebia': '.*81',
+            'oleh weyored': '.*60.*71',
+            'rebia mugrash': '.*11.*81',
+            'shalshelet gedolah': '.*65.*05',
+            'tsinor': '.*82',
+            'dechi': '.*13',
+            'pazer':  '.*83',
+            'mehuppak legarmeh': '.*70.*05',
+            'azla legarmeh': '.*(63|33).*05'
+        }
+    }
+
+    conA = {
+        '21': {
+            'munach': '.*74',
+            'mehuppak': '.*70',
+            'mereka': '.*71',
+            'merekah kefula': '.*72',
+            'darga': '.*94',
+            'azla/qadma': '.*(63|33)',
+            'telisha qetannah': '.*04',
+            'yerah': '.*93',
+            'mayela': r'.*73\S+(75|92)',
+        },
+        '3': {
+            'munach': '.*74',
+            'mereka': '.*71',
+            'illuy': '.*64',
+            'tarcha (tiphcha)': '.*73',
+            'yerah': '.*93',
+            'mehuppak': '.*70',
+            'azla/qadma': '.*(63|33)',
+        }
+    }
+
+    def __init__(self, tf):
+        self.tf = tf
+        self.F, self.T = tf.api.F, tf.api.T
+        self.disRE = {bclass: {name:re.compile(patt) for name, patt in names.items()}
+                          for bclass, names in self.disA.items()}
+        self.tiphchah_RE = re.compile('.*73')
+        self.conRE = {bclass: {name:re.compile(patt) for name, patt in names.items()}
+                          for bclass, names in self.conA.items()}
+
+        self.mwords = {}
+        for w in self.F.otype.s('word'):
+            self.mwords[w] = masoretic_word(w, self.tf)
+
+        self.accenttype = {}
+        self.atype2set = collections.defaultdict(list)
+        self.atype2name2set = collections.defaultdict(lambda:collections.defaultdict(list))
+        for w in set(self.F.otype.s('word')):
+            dismatches = self.disjunct(w)
+            if not dismatches:
+                conmatches = self.conjunct(w)
+            if dismatches:
+                self.accenttype[w] = 'disjunct'
+                self.atype2set['disjunct'].append((w,))
+                self.atype2name2set['disjunct'][dismatches].append((w,))
+            elif conmatches:
+                self.accenttype[w] = 'conjunct'
+                self.atype2set['conjunct'].append((w,))
+                self.atype2name2set['conjunct'][conmatches].append((w,))
+            else:
+                self.accenttype[w] = 'unknown'
+                self.atype2set['unknown'].append((w,))
+
+    def text(self, word):
+        mword = self.T.text(self.mwords[word], fmt='text-trans-full')
+        return mword.replace('_', ' ')
+
+    def bclass(self, word):
+        book = self.T.sectionFromNode(word)[0]
+        return '3' if book in ('Psalms', 'Job', 'Proverbs') else '21'
+
+    def disjunct(self, word):
+        mword = self.text(word)
+        matches = [name for name, patt in self.disRE[self.bclass(word)].items() if patt.match(mword)]
+        if self.tiphchah_RE.match(mword) and not self.conRE['21']['mayela'].match(mword):
+            matches.append('tiphchah')
+        return tuple(matches)
+
+    def conjunct(self, word):
+        mword = self.text(word)
+        return tuple(name for name, patt in self.conRE[self.bclass(word)].items() if patt.match(mword))
+
+class Conjunction:
+    '''
+    Conjunction pairs from chains climbed from every
+    nominal word, from old/wordsets/pairs.py.
+    '''
+
+    def __init__(self, tf, **wsets):
+        self.tf = tf
+        F = tf.api.F
+        covered = set()
+        self.wsets = wsets
+        self.pairs = collections.defaultdict(set)
+        self.pairresults = collections.defaultdict(lambda:collections.defaultdict(list))
+        for w in F.otype.s('word'):
+            if w in covered or w not in wsets['noms']:
+                continue
+            chain = list(self.conj_climber(w))
+            if not chain:
+                continue
+            for i in chain:
+                for j in chain:
+                    if i == j:
+                        continue
+                    self.pairs[F.lex.v(i)].add(F.lex.v(j))
+                    self.pairresults[F.lex.v(i)][F.lex.v(j)].append((i, j))
+
+    def conj_climber(self, a):
+        yield a
+        b = Mom(a, self.tf, **self.wsets).coordinate()
+        if b:
+            yield from self.conj_climber(b)
+
+def find_prep_nominal(preposition, prep2obj, preps, nominals):
+    '''
+    Appends the nominals that a preposition governs through
+    its chain of objects, from heads/nhead.py.
+    '''
+    objects = prep2obj.get(preposition, None)
+    if objects:
+        for obj in objects:
+            if obj not in preps:
+                nominals.append(obj)
+            else:
+                find_prep_nominal(obj, prep2obj, preps, nominals)
+
+def nheads(phrase2heads, prep2obj, preps):
+    '''
+    The nominal heads of the phrases, from heads/nhead.py.
+    '''
+    nheads = collections.defaultdict(set)
+    for phrase, heads in phrase2heads.items():
+        for head in heads:
+            if head not in preps:
+                nheads[phrase].add(head)
+            else:
+                nominals = []
+                find_prep_nominal(head, prep2obj, preps, nominals)
+                if nominals:
+                    nheads[phrase] |= set(nominals)
+                else:
+                    nheads[phrase].add(head)
+    return nheads
+
+class PhraseSets:
+    '''
+    The remaining_phrases and covered_phrases
+    of a Build, from heads/pipeline.py.
+    '''
+
+    def __init__(self, phrases):
+        self.remaining_phrases = set(phrases)
+        self.covered_phrases = set()
+
+    def record_head(self, phrase):
+        self.remaining_phrases.discard(phrase)
+        self.covered_phrases.add(phrase)
@@ -0,0 +1,108 @@
+'''
+The accent tables of old/wordsets/accents.py
+against the per word regexes they replaced.
+'''
+
+import re
+import random
+import types
+
+import pytest
+
+import accents
+import original
+
+# the accent codes of the patterns, and a few others
+CODES = ('01', '02', '03', '04', '05', '10', '11', '13', '14', '33', '44', '60', '61', '62',
+         '63', '64', '65', '70', '71', '72', '73', '74', '75', '80', '81', '82', '83', '84',
+         '85', '91', '92', '93', '94', '00', '35', '52')
+
+class Feature:
+
+    def __init__(self, values):
+        self.values = values
+
+    def v(self, node):
+        return self.values.get(node)
+
+class FakeTF:
+    '''
+    A stand in for a TF app with books of words that
+    have a transcription and a trailer, and nothing else.
+    '''
+
+    def __init__(self, books):
+        self.words = {}
+        self.trailers = {}
+        self.book_words = {}
+        self.book_of = {}
+        for book, words in books:
+            nodes = []
+            for text, trailer in words:
+                node = len(self.words) + 1
+                self.words[node] = text
+                self.trailers[node] = trailer
+                nodes.append(node)
+            self.book_words[book] = nodes
+        self.books = {}
+        for node, (book, nodes) in enumerate(self.book_words.items(), len(self.words) + 1):
+            self.books[node] = nodes
+            self.book_of[node] = book
+            for word in nodes:
+                self.book_of[word] = book
+        otype = types.SimpleNamespace(s=self.nodes)
+        self.api = types.SimpleNamespace(
+            F=types.SimpleNamespace(otype=otype, trailer=Feature(self.trailers)),
+            L=types.SimpleNamespace(d=lambda node, otype: tuple(self.books[node])),
+            T=types.SimpleNamespace(text=self.text, sectionFromNode=lambda node: (self.book_of[node],)),
+        )
+
+    def nodes(self, otype):
+        return tuple(self.words) if otype == 'word' else tuple(self.books)
+
+    def text(self, nodes, fmt=None):
+        assert fmt == 'text-trans-full'
+        return ''.join(self.words[node] + self.trailers[node] for node in nodes)
+
+def random_books(seed, size=400):
+    rand = random.Random(seed)
+    books = []
+    for book in ('Genesis', 'Psalms', 'Job', 'Ruth'):
+        words = []
+        for i in range(size):
+            parts = [rand.choice(('B', '>', 'R', ':', ';', 'A', 'J', '_', 'H.')) for _ in range(4)]
+            for _ in range(rand.choice((0, 1, 1, 2, 3))):
+                parts.insert(rand.randrange(len(parts) + 1), rand.choice(CODES))
+            trailer = rand.choice((' ', ' ', ' ', '&', '', '00 ', '05 ', '_S '))
+            words.append((''.join(parts), trailer))
+        # books end on a masoretic word
+        words[-1] = (words[-1][0], ' ')
+        books.append((book, words))
+    return books
+
+@pytest.mark.parametrize('seed', range(5))
+def test_accents(seed):
+    tf = FakeTF(random_books(seed))
+    expected = original.Accents(tf)
+    found = accents.Accents(tf)
+    assert found.accenttype == expected.accenttype
+    assert set(found.accenttype.values()) == {'disjunct', 'conjunct', 'unknown'}
+    assert {atype: sorted(words) for atype, words in found.atype2set.items()} == \
+        {atype: sorted(w for w, in words) for atype, words in expected.atype2set.items()}
+    assert {atype: {names: sorted(words) for names, words in name2set.items()}
+                for atype, name2set in found.atype2name2set.items()} == \
+        {atype: {names: sorted(w for w, in words) for names, words in name2set.items()}
+            for atype, name2set in expected.atype2name2set.items()}
+    for w in list(tf.words)[::7]:
+        assert found.mwords[w] == expected.mwords[w]
+        if expected.accenttype[w] == 'disjunct':
+            assert found.disjunct(w) == expected.disjunct(w)
+        else:
+            assert found.conjunct(w) == expected.conjunct(w)
+
+def test_compile_accent():
+    text = '>:73B;_H75 '
+    codes = accents.accent_codes(text)
+    for pattern in ('.*73', '.*75', '.*73.*75', '.*75.*73', '.*(33|73)', r'.*73\S+(75|92)',
+                    '.*37', '.*(37|11)'):
+        assert accents.compile_accent(pattern)(codes, text) == bool(re.match(pattern, text))
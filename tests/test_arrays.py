@@ -0,0 +1,46 @@
+'''
+The .npy arrays of the features.
+'''
+
+import os
+import array
+
+import pytest
+
+from heads import arrays, export
+
+@pytest.mark.parametrize('typecode', sorted(arrays.DTYPES))
+def test_npy_files_agree_with_numpy(tmp_path, typecode):
+    numpy = pytest.importorskip('numpy')
+    values = array.array(typecode, [0, 1, 7, 200] + list(range(0, 255, 3)))
+    path = str(tmp_path / 'values.npy')
+    arrays.write_array(path, values)
+    assert numpy.load(path).tolist() == values.tolist()
+    # the data start is aligned as NumPy aligns it
+    assert (os.path.getsize(path) - len(values) * values.itemsize) % 64 == 0
+
+    numpy.save(path, numpy.array(values.tolist(), dtype=arrays.DTYPES[typecode]))
+    assert arrays.read_array(path).tolist() == values.tolist()
+
+def test_empty_array(tmp_path):
+    path = str(tmp_path / 'empty.npy')
+    arrays.write_array(path, array.array('I'))
+    assert len(arrays.read_array(path)) == 0
+
+def test_features(build, tmp_path):
+    arrays.save(build, location=str(tmp_path))
+    export.save(build, location=str(tmp_path / 'tf'))
+    arrays.convert(str(tmp_path / 'tf' / build.version))
+    maximum = build.api.F.otype.maxNode
+    for directory in (tmp_path / build.version / 'arrays', tmp_path / 'tf' / build.version / 'arrays'):
+        features = arrays.load(str(directory))
+        for feature, mapping in (('head', build.phrase2heads), ('nhead', build.nheads)):
+            edges = getattr(features.E, feature)
+            for node in range(1, maximum + 1):
+                assert set(edges.t(node)) == mapping.get(node, set())
+                assert set(edges.f(node)) == {phrase for phrase, heads in mapping.items() if node in heads}
+        for node in range(1, maximum + 1):
+            assert tuple(features.E.obj_prep.f(node)) == ((build.obj2prep[node],) if node in build.obj2prep else ())
+            expected = 'quant' if node in build.sets['quant'] else 'prep' if node in build.sets['prep'] else None
+            assert features.F.sem_set.v(node) == expected
+        assert list(features.F.sem_set.s('prep')) == sorted(build.sets['prep'] - build.sets['quant'])
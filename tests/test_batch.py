@@ -0,0 +1,30 @@
+'''
+Builds of several versions at once.
+'''
+
+import os
+
+import mini
+from heads import batch
+
+def load(version):
+    # every version is a copy of the test corpus
+    return mini.load(os.environ['HEADS_TEST_CORPUS'])
+
+def test_run(build, tmp_path, monkeypatch):
+    monkeypatch.setenv('HEADS_TEST_CORPUS', str(tmp_path / 'corpus'))
+    mini.make(os.environ['HEADS_TEST_CORPUS'])
+    versions = ['a', 'b']
+    # each build gets two search workers, so the
+    # version processes fork pools of their own
+    summaries = batch.run(versions, load=load, workers=4, output=str(tmp_path / 'tf'))
+    assert [summary['version'] for summary in summaries] == versions
+    for version in versions:
+        assert os.path.exists(tmp_path / 'tf' / version / 'head.tf')
+    table, flags = batch.consistency(summaries)
+    assert not flags
+    expected = batch.summary(build, 0)
+    for summary in summaries:
+        assert summary['rules'] == expected['rules']
+        assert summary['types'] == expected['types']
+        assert summary['objects'] == expected['objects']
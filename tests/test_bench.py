@@ -0,0 +1,52 @@
+'''
+The measures of heads.bench.
+'''
+
+from types import SimpleNamespace
+
+import pytest
+
+from heads import bench
+
+def timed_build():
+    return bench.TimedBuild(SimpleNamespace(api=None), 'test')
+
+def test_nested_measures():
+    build = timed_build()
+    outer = build.start()
+    inner = build.start()
+    data = bytearray(64 << 20)
+    data[::4096] = b'x' * len(data[::4096])
+    build.measure('inner', inner, {})
+    del data
+    after = build.start()
+    build.measure('after', after, {'results': 1})
+    build.measure('outer', outer, {})
+
+    measures = build.measures
+    # the 64MB of the inner measure count for both measures
+    # that ran, but not for the one that started after it
+    assert measures['inner']['rss_kb'] > 60 << 10
+    assert measures['outer']['rss_kb'] >= measures['inner']['rss_kb']
+    assert measures['after']['rss_kb'] < measures['inner']['rss_kb']
+    assert measures['after']['counts'] == {'results': 1}
+    assert not build.marks
+
+def test_regressions():
+    entry = {'seconds': 1.0, 'rss_kb': 100, 'counts': {'results': 2}}
+    record = {'measures': {'stage': dict(entry, seconds=3.0, rss_kb=200)}}
+    baseline = {'measures': {'stage': entry}}
+    flags = bench.regressions(record, baseline)
+    assert len(flags) == 2
+    # a baseline without the RSS per measure is only compared in time and counts
+    old = {'measures': {'stage': {'seconds': 1.0, 'peak_rss_kb': 100, 'counts': {'results': 2}}}}
+    assert len(bench.regressions(record, old)) == 1
+
+def test_run_loads_its_books():
+    loaded = []
+    def load(version, books=None):
+        loaded.append((version, books))
+        raise RuntimeError('loaded')
+    with pytest.raises(RuntimeError):
+        bench.run('2021', books=['Ruth'], load=load)
+    assert loaded == [('2021', ['Ruth'])]
@@ -0,0 +1,60 @@
+'''
+The compiled conditions of old/wordsets/context.py
+against the evaluated conditions they replaced.
+'''
+
+import random
+
+import pytest
+
+import context
+import original
+
+class EvalMom(context.Mom):
+    '''
+    Mom as it was: positions from Positions,
+    conditions evaluated as Python.
+    '''
+
+    def __init__(self, n, tf, **kwargs):
+        super().__init__(n, tf, **kwargs)
+        P = original.Positions(n, self.context, tf).get
+        self.P = P
+        self.conddict = original.Evaluator({'P': P, 'quants': kwargs['quants'],
+                                            'preps': kwargs['preps'],
+                                            'nominals': kwargs['noms']}).conddict
+
+def word_sets(app, seed):
+    # random word sets, so that every pattern gets to match
+    words = list(app.api.F.otype.s('word'))
+    rand = random.Random(seed)
+    return {name: set(rand.sample(words, len(words) // 3)) for name in ('quants', 'preps', 'noms')}
+
+@pytest.mark.parametrize('seed', range(10))
+def test_mom(app, seed):
+    wsets = word_sets(app, seed)
+    for w in app.api.F.otype.s('word'):
+        expected = EvalMom(w, app, **wsets)
+        expected.analyze()
+        mom = context.Mom(w, app, **wsets)
+        mom.analyze()
+        assert mom.kids == expected.kids
+        assert mom.explain == expected.explain
+
+def test_relas(app, monkeypatch):
+    wsets = word_sets(app, 0)
+    relas = context.Relas(app, **wsets)
+    monkeypatch.setattr(context, 'Mom', EvalMom)
+    expected = context.Relas(app, **wsets)
+    assert relas.mom and relas.mom == expected.mom
+    assert relas.kid == expected.kid
+
+def test_compile_cond():
+    P = {(0,): 5, (1,): None, (0, 'st'): 'a', (-1, 'sp'): 'art'}
+    sets = {'nominals': {5}, 'preps': set()}
+    namespace = dict(sets, P=lambda *args: P[args])
+    for cond in ("P(0) in nominals", "P(1) in nominals", "P(0) not in preps",
+                 "P(0,'st') in {'a', 'NA'}", "P(0, 'st') == 'c'", " P(-1,'sp') != 'art'"):
+        assert context.compile_cond(cond)(namespace['P'], sets) == eval(cond.strip(), None, namespace)
+    with pytest.raises(ValueError):
+        context.compile_cond('len(P(0)) > 1')
@@ -0,0 +1,61 @@
+'''
+The coverage tracker against the sets of
+covered and remaining phrases it replaced.
+'''
+
+import json
+import random
+
+import pytest
+
+import mini
+import original
+from heads.coverage import Coverage
+
+@pytest.mark.parametrize('seed', mini.SEEDS)
+@pytest.mark.parametrize('subset', [False, True])
+def test_coverage(app, seed, subset, tmp_path):
+    api = app.api
+    rand = random.Random(seed)
+    phrases = api.F.otype.s('phrase')
+    tracked = set(rand.sample(phrases, len(phrases) // 4)) if subset else set(phrases)
+    coverage = Coverage(api, tracked if subset else None)
+    expected = original.PhraseSets(tracked)
+
+    # phrases with several heads, and heads recorded for
+    # a word and for a node outside the corpus
+    others = (5, api.F.otype.maxNode + 100)
+    for _ in range(len(phrases)):
+        phrase = rand.choice(phrases + others)
+        coverage.cover(phrase)
+        expected.record_head(phrase)
+
+    # the original also counted phrases it did not track
+    covered = expected.covered_phrases & tracked
+    assert coverage.covered == len(covered)
+    assert coverage.remaining == len(expected.remaining_phrases)
+    assert coverage.total == len(tracked)
+    assert set(coverage.uncovered()) == expected.remaining_phrases
+    assert all(coverage.is_covered(phrase) == (phrase in covered) for phrase in phrases + others)
+
+    typ = api.F.typ.v
+    assert coverage.counts() == {t: {'covered': sum(1 for phrase in covered if typ(phrase) == t),
+                                     'remaining': sum(1 for phrase in expected.remaining_phrases
+                                                         if typ(phrase) == t)}
+                                    for t in sorted({typ(phrase) for phrase in tracked})}
+    # with a type that no phrase of the corpus has
+    for t in sorted({typ(phrase) for phrase in phrases}) + ['InjP']:
+        assert list(coverage.uncovered(t)) == sorted(phrase for phrase in expected.remaining_phrases
+                                                        if typ(phrase) == t)
+
+    coverage.write(str(tmp_path / 'uncovered.json'))
+    with open(tmp_path / 'uncovered.json') as infile:
+        written = json.load(infile)
+    assert written['counts'] == coverage.counts()
+    assert {phrase for phrases in written['uncovered'].values() for phrase in phrases} == \
+        expected.remaining_phrases
+
+def test_build(app, build):
+    phrases = set(app.api.F.otype.s('phrase'))
+    assert build.coverage.covered == len(build.phrase2heads)
+    assert set(build.coverage.uncovered()) == phrases - set(build.phrase2heads)
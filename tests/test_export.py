@@ -0,0 +1,44 @@
+'''
+The streamed export against the TF.save it replaced.
+'''
+
+import os
+import gzip
+
+from tf.fabric import Fabric
+
+from heads import export
+
+def tf_save_features(build):
+    # the feature dicts that were handed to TF.save
+    head = {head: {phrase} for phrase, heads in build.phrase2heads.items() for head in heads}
+    nhead = {head: {phrase} for phrase, heads in build.nheads.items() for head in heads}
+    obj_prep = {obj: {prep} for obj, prep in build.obj2prep.items()}
+    sem_set = {node: feature for feature, fset in {'prep': build.sets['prep'],
+                                                   'quant': build.sets['quant']}.items()
+                  for node in fset}
+    return {'sem_set': sem_set}, {'head': head, 'obj_prep': obj_prep, 'nhead': nhead}
+
+def data(path, opener=open):
+    # the lines after the metadata
+    with opener(path, 'rt') as infile:
+        lines = infile.read().split('\n')
+    return [line for line in lines[lines.index(''):] if line]
+
+def test_export_matches_tf_save(build, tmp_path):
+    node_features, edge_features = tf_save_features(build)
+    assert all(edge_features.values()) and node_features['sem_set']
+    TF = Fabric(locations=str(tmp_path / 'reference'), silent='deep')
+    TF.save(nodeFeatures=node_features, edgeFeatures=edge_features,
+            metaData=export.metadata(build.version), silent='deep')
+
+    export.save(build, location=str(tmp_path / 'heads'), compress=True)
+    for feature in export.FEATURES:
+        path = os.path.join(tmp_path, 'heads', build.version, f'{feature}.tf')
+        expected = data(os.path.join(tmp_path, 'reference', f'{feature}.tf'))
+        assert data(path) == expected
+        assert data(f'{path}.gz', gzip.open) == expected
+
+def test_spec():
+    assert export.spec([1, 2, 3, 7, 9, 10]) == '1-3,7,9-10'
+    assert export.tf_value('a\tb\\c\n') == 'a\\tb\\\\c\\n'
@@ -0,0 +1,76 @@
+'''
+The bulk lookups of HeadsIndex against the loaded
+arrays and the build they were written from.
+'''
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from heads import arrays
+from heads.index import HeadsIndex, gather
+
+@pytest.fixture(scope='module')
+def saved(build, tmp_path_factory):
+    location = tmp_path_factory.mktemp('tf')
+    arrays.save(build, location=str(location))
+    directory = str(location / build.version / 'arrays')
+    return HeadsIndex(directory), arrays.load(directory)
+
+def groups(found):
+    # the targets of each node as a set
+    offsets, targets = found
+    return [set(targets[offsets[i]:offsets[i+1]].tolist()) for i in range(len(offsets) - 1)]
+
+def all_nodes(build):
+    # every node, and some that are not in the corpus
+    return [0] + list(range(1, build.api.F.otype.maxNode + 1)) + [build.api.F.otype.maxNode + 5, -1]
+
+def test_edges(build, saved):
+    index, features = saved
+    nodes = all_nodes(build)
+    E = features.E
+    phrase2heads, nheads = build.phrase2heads, build.nheads
+    for node, heads, found_nheads, phrases, objects in zip(
+            nodes, groups(index.heads(nodes)), groups(index.nheads(nodes)),
+            groups(index.phrases(nodes)), groups(index.objects(nodes))):
+        assert heads == set(phrase2heads.get(node, ()))
+        assert found_nheads == set(nheads.get(node, ()))
+        assert phrases == {phrase for phrase, words in phrase2heads.items() if node in words}
+        assert objects == set(build.prep2obj.get(node, ()))
+        if 0 < node <= features.max_node:
+            assert heads == set(E.head.t(node))
+            assert objects == set(E.obj_prep.t(node))
+    assert groups(index.phrases(nodes, nominal=True)) == \
+        [{phrase for phrase, words in nheads.items() if node in words} for node in nodes]
+    assert index.preps(nodes).tolist() == [build.obj2prep.get(node, 0) for node in nodes]
+
+def test_sem_set(build, saved):
+    index, features = saved
+    nodes = all_nodes(build)
+    values = [features.F.sem_set.v(node) if node > 0 else None for node in nodes]
+    assert index.sem_set(nodes).tolist() == values
+    assert set(values) == {None, 'prep', 'quant'}
+    for value in ('prep', 'quant'):
+        assert index.filter(nodes, value).tolist() == [node for node, node_value in zip(nodes, values)
+                                                           if node_value == value]
+        assert index.nodes(value).tolist() == list(features.F.sem_set.s(value))
+    assert set(index.nodes('prep').tolist()) == set(build.sets['prep'])
+    assert index.filter(nodes, 'verb').tolist() == index.nodes('verb').tolist() == []
+
+def test_empty(saved):
+    index, features = saved
+    for found in (index.heads([]), index.objects([]), index.phrases([])):
+        assert found.offsets.tolist() == [0] and found.targets.tolist() == []
+    assert index.preps([]).tolist() == []
+    assert index.sem_set([]).tolist() == []
+    assert index.filter([], 'prep').tolist() == []
+
+def test_gather():
+    # nodes 1 and 3 have no targets, node 4 has the last
+    # ones, and node 5 is outside the arrays
+    offsets = np.array([0, 0, 0, 2, 2, 5])
+    targets = np.array([7, 8, 9, 10, 11])
+    found = gather(offsets, targets, [1, 2, 3, 4, 2, 5, 0])
+    assert found.offsets.tolist() == [0, 0, 2, 2, 5, 7, 7, 7]
+    assert found.targets.tolist() == [7, 8, 9, 10, 11, 7, 8]
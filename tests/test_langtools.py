@@ -0,0 +1,46 @@
+'''
+The ContextIndex of old/wordsets/langtools.py
+against the Positions and Walker it replaced.
+'''
+
+import pytest
+
+import langtools
+import original
+
+CONTEXTS = (('word', 'phrase_atom'), ('word', 'phrase'), ('word', 'clause_atom'),
+            ('phrase_atom', 'phrase'), ('subphrase', 'phrase'), ('phrase', 'clause_atom'))
+
+def in_context(app, otype, context):
+    # the originals fail on nodes outside a context
+    return [n for n in app.api.F.otype.s(otype) if app.api.L.u(n, context)]
+
+@pytest.mark.parametrize('otype, context', CONTEXTS)
+def test_positions(app, otype, context):
+    index = langtools.context_index(app, otype, context)
+    for n in in_context(app, otype, context):
+        for order in ('slot', 'node'):
+            expected = original.Positions(n, context, app, order=order)
+            positions = langtools.Positions(n, context, app, order=order, index=index)
+            get = index.getter(n, order=order)
+            for position in range(-4, 5):
+                for features in ((), ('lex',), ('lex', 'sp', 'st')):
+                    value = expected.get(position, *features)
+                    assert positions.get(position, *features) == value
+                    assert get(position, *features) == value
+
+@pytest.mark.parametrize('otype, context', CONTEXTS)
+def test_walker(app, otype, context):
+    F = app.api.F
+    index = langtools.context_index(app, otype, context)
+    tests = (lambda m: F.sp.v(m) == 'subs' if otype == 'word' else m % 2 == 0,
+             lambda m: False)
+    for n in in_context(app, otype, context):
+        expected = original.Walker(n, context, app)
+        walkers = (langtools.Walker(n, context, app), langtools.Walker(n, context, app, index=index))
+        for test in tests:
+            for kwargs in ({}, {'stop': lambda m: m % 3 == 0},
+                           {'go': lambda m: m % 5 != 0}, {'output': True}):
+                for walker in walkers:
+                    assert walker.ahead(test, **kwargs) == expected.ahead(test, **kwargs)
+                    assert walker.back(test, **kwargs) == expected.back(test, **kwargs)
@@ -0,0 +1,48 @@
+'''
+The nominal heads against the recursive
+prepositional chains they replaced.
+'''
+
+import random
+import types
+import collections
+
+import pytest
+
+import mini
+import original
+from heads import nhead
+
+def test_build(build):
+    assert build.nheads and build.nheads == original.nheads(build.phrase2heads, build.prep2obj,
+                                                            build.sets['prep'])
+
+def fake_build(seed, size=500):
+    rand = random.Random(seed)
+    preps = set(rand.sample(range(1, size), size // 3))
+    # an object follows its preposition, and
+    # a preposition may have several objects
+    prep2obj = collections.defaultdict(set)
+    for prep in preps:
+        for _ in range(rand.choice((0, 1, 1, 2))):
+            prep2obj[prep].add(rand.randint(prep + 1, min(prep + 4, size)))
+    phrase2heads = collections.defaultdict(set)
+    for phrase in range(size + 1, size + 200):
+        phrase2heads[phrase] = set(rand.sample(range(1, size + 1), rand.choice((1, 1, 2))))
+    return types.SimpleNamespace(
+        phrase2heads=phrase2heads, prep2obj=dict(prep2obj), sets={'prep': preps},
+        nheads=collections.defaultdict(set), prep_nominals=None, report=lambda mssg: None,
+        api=mini.fake_api({'word': range(1, size + 1), 'phrase': range(size + 1, size + 200)}))
+
+@pytest.mark.parametrize('seed', mini.SEEDS)
+def test_prep_nominals(seed):
+    build = fake_build(seed)
+    preps = build.sets['prep']
+    nominals = nhead.prep_nominals(build.prep2obj, preps, build.api.F.otype.maxNode)
+    assert set(nominals) == set(build.prep2obj)
+    for prep in build.prep2obj:
+        expected = []
+        original.find_prep_nominal(prep, build.prep2obj, preps, expected)
+        assert nominals[prep] == set(expected)
+    nhead.run(build)
+    assert build.nheads == original.nheads(build.phrase2heads, build.prep2obj, preps)
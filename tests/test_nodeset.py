@@ -0,0 +1,53 @@
+'''
+NodeSet against the Python sets it stands in for.
+'''
+
+import random
+
+from heads.nodeset import NodeSet
+from heads.cache import write_nodes, read_nodes
+
+FIRST, LAST = 11, 140
+
+def sample(seed, k=40):
+    return set(random.Random(seed).sample(range(FIRST, LAST + 1), k))
+
+def test_set_operations():
+    a, b = sample(1), sample(2)
+    nodes_a, nodes_b = NodeSet(FIRST, LAST, a), NodeSet(FIRST, LAST, b)
+    assert list(nodes_a) == sorted(a)
+    assert len(nodes_a) == len(a)
+    assert set(nodes_a | nodes_b) == a | b
+    assert set(nodes_a & nodes_b) == a & b
+    assert set(nodes_a - nodes_b) == a - b
+    assert set(nodes_a & b) == a & b
+    assert nodes_a == a
+    assert all((node in nodes_a) == (node in a) for node in range(LAST + 10))
+
+def test_complement():
+    a = sample(3)
+    nodes = NodeSet(FIRST, LAST, a)
+    complement = ~nodes
+    universe = set(range(FIRST, LAST + 1))
+    # no padding bits past the last node
+    assert list(complement) == sorted(universe - a)
+    assert len(complement) == len(universe - a)
+    assert ~complement == nodes
+    assert not ~NodeSet(FIRST, LAST, universe)
+    assert set(complement - nodes) == universe - a
+
+def test_count_follows_changes():
+    nodes = NodeSet(FIRST, LAST)
+    assert not nodes and len(nodes) == 0
+    nodes.add(FIRST)
+    assert nodes and len(nodes) == 1
+    nodes |= {LAST, 20}
+    assert len(nodes) == 3
+    assert list(nodes) == [FIRST, 20, LAST]
+
+def test_cache_round_trip(tmp_path):
+    nodes = ~NodeSet(FIRST, LAST, sample(4))
+    write_nodes(tmp_path / 'set', nodes)
+    assert read_nodes(tmp_path / 'set') == nodes
+    write_nodes(tmp_path / 'plain', {3, 1, 2})
+    assert read_nodes(tmp_path / 'plain') == {1, 2, 3}
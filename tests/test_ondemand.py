@@ -0,0 +1,61 @@
+'''
+The heads of a few phrases against a full build.
+'''
+
+import time
+
+import pytest
+
+import mini
+from heads import ondemand
+from heads.pipeline import Build
+
+def check(build, part, phrases):
+    # the results of a full build for the phrases
+    assert part.phrase2heads == {phrase: heads for phrase, heads in build.phrase2heads.items()
+                                    if phrase in phrases}
+    assert part.nheads == {phrase: heads for phrase, heads in build.nheads.items()
+                              if phrase in phrases}
+    words = {word for phrase in phrases for word in build.api.L.d(phrase, 'word')}
+    assert part.obj2prep == {obj: prep for obj, prep in build.obj2prep.items() if prep in words}
+
+def test_verses(app, build):
+    for verse in app.api.F.otype.s('verse'):
+        phrases = ondemand.phrases_of(app.api, [verse])
+        check(build, ondemand.heads_for(build, [verse]), phrases)
+
+def test_phrases(app, build):
+    for phrase in app.api.F.otype.s('phrase'):
+        check(build, ondemand.heads_for(build, [phrase]), {phrase})
+
+def test_section(app, build, tmp_path):
+    nodes = ondemand.section_nodes(app.api, ('Genesis', 1, 1), ('Genesis', 1, 2))
+    ondemand.prepare(app, 'test', cache=str(tmp_path))
+    # the second time the sets are read from the cache
+    part = ondemand.heads_for(ondemand.prepare(app, 'test', cache=str(tmp_path)), nodes)
+    assert part.obj2prep and part.nheads
+    check(build, part, ondemand.phrases_of(app.api, nodes))
+    with pytest.raises(Exception):
+        ondemand.section_nodes(app.api, ('Genesis', 2, 1))
+
+def timed_heads(build, section):
+    verse = build.api.T.nodeFromSection(section)
+    start = time.perf_counter()
+    part = ondemand.heads_for(build, [verse])
+    seconds = time.perf_counter() - start
+    check(build, part, ondemand.phrases_of(build.api, [verse]))
+    return seconds
+
+def test_time(build, tmp_path):
+    # Genesis 1 a hundred times over
+    app = mini.load(str(tmp_path), copies=100)
+    start = time.perf_counter()
+    big = Build(app, 'test').run()
+    full = time.perf_counter() - start
+
+    # the searches of a verse cost the same on any corpus;
+    # what is left is the cost of TF to set each search up
+    small_seconds = min(timed_heads(build, ('Genesis', 1, 2)) for _ in range(2))
+    seconds = min(timed_heads(big, ('Genesis', 50, 2)) for _ in range(2))
+    assert seconds < 2 * small_seconds
+    assert seconds < full / 3
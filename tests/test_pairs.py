@@ -0,0 +1,76 @@
+'''
+The conjunction chains of old/wordsets/pairs.py
+against the chain climbing they replaced.
+'''
+
+import random
+import collections
+import types
+
+import pytest
+
+import mini
+import pairs
+import original
+
+def check(conj, expected):
+    assert conj.pairs == expected.pairs
+    # the original lists a pair again for every
+    # nominal inside a chain that it climbs from
+    assert {lex: {other: set(words) for other, words in others.items()}
+                for lex, others in conj.pairresults.items()} == \
+        {lex: {other: set(words) for other, words in others.items()}
+            for lex, others in expected.pairresults.items()}
+    for lex, others in conj.pairresults.items():
+        for other, words in others.items():
+            assert conj.paircounts[lex][other] == len(words)
+    for root, i in conj.roots.items():
+        assert conj.chain_words[conj.chain_offsets[i]] == root
+
+def test_conjunction(app):
+    F = app.api.F
+    words = F.otype.s('word')
+    # coordinates cross phrase atoms in the test corpus
+    wsets = {'noms': {w for w in words if F.sp.v(w) in {'subs', 'nmpr'}},
+             'preps': {w for w in words if F.sp.v(w) == 'prep'},
+             'quants': set(), 'context': 'phrase'}
+    conj = pairs.Conjunction(app, **wsets)
+    assert conj.roots
+    check(conj, original.Conjunction(app, **wsets))
+
+class FakeMom:
+    '''
+    A Mom whose coordinates are given.
+    '''
+
+    def __init__(self, w, tf, **wsets):
+        self.w = w
+        self.tf = tf
+
+    def coordinate(self):
+        return self.tf.coordinates.get(self.w)
+
+def fake_tf(seed, size=300):
+    rand = random.Random(seed)
+    lexemes = [f'L{i}' for i in range(20)]
+    lex = {w: rand.choice(lexemes) for w in range(1, size + 1)}
+    # coordinates come after their words, and
+    # several words may coordinate to the same word
+    coordinates = {w: rand.randint(w + 1, min(w + 6, size)) for w in range(1, size)
+                      if rand.random() < 0.6}
+    return types.SimpleNamespace(coordinates=coordinates, api=mini.fake_api({'word': tuple(lex)}, lex=lex))
+
+@pytest.mark.parametrize('seed', mini.SEEDS)
+def test_branching_chains(seed, monkeypatch):
+    monkeypatch.setattr(pairs, 'Mom', FakeMom)
+    monkeypatch.setattr(original, 'Mom', FakeMom)
+    tf = fake_tf(seed)
+    words = tf.api.F.otype.s('word')
+    wsets = {'noms': set(random.Random(seed).sample(words, len(words) // 2))}
+    conj = pairs.Conjunction(tf, **wsets)
+    check(conj, original.Conjunction(tf, **wsets))
+    # no pair of words that only share their coordinates
+    targets = collections.Counter(tf.coordinates.values())
+    assert any(count > 1 for count in targets.values())
+    for chain in conj.chains():
+        assert all(tf.coordinates[a] == b for a, b in zip(chain, chain[1:]))
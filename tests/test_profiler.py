@@ -0,0 +1,69 @@
+'''
+The Profiler of heads/profiler.py, which swaps
+TF's private spin._doQuantifier while it runs.
+'''
+
+import json
+
+import pytest
+from tf.search import spin
+
+from heads.profiler import Profiler
+
+TEMPLATE = '''
+phrase
+    w:word sp=subs
+    /without/
+    subphrase rela=rec
+        w
+    /-/
+    /with/
+    nu=pl
+    /or/
+    st=c
+    /-/
+'''
+
+def test_blocks(app, tmp_path):
+    original = spin._doQuantifier
+    profiler = Profiler(names={TEMPLATE: 'test'})
+    results = profiler.search(app.search, TEMPLATE)
+    assert spin._doQuantifier is original
+    assert results == app.search(TEMPLATE)
+
+    entry = profiler.templates['test']
+    assert entry['calls'] == 1
+    assert entry['results'] == len(results)
+    # both blocks qualify w, on line 2 of the template
+    assert set(entry['blocks']) == {'3: /without/ w:word sp=subs', '7: /with/ w:word sp=subs'}
+    without = entry['blocks']['3: /without/ w:word sp=subs']
+    with_ = entry['blocks']['7: /with/ w:word sp=subs']
+    for block in (without, with_):
+        assert block['calls'] >= 1
+        assert block['before'] >= block['after']
+        assert block['seconds'] >= 0
+    assert without['after'] == with_['before']
+    assert with_['after'] == len(results)
+
+    calls = without['calls']
+    profiler.search(app.search, TEMPLATE)
+    assert entry['calls'] == 2
+    assert without['calls'] == 2 * calls
+    assert len(profiler.report()) == 3
+    profiler.write(str(tmp_path / 'profile.json'))
+    with open(tmp_path / 'profile.json') as infile:
+        assert json.load(infile) == profiler.templates
+
+def test_restored(app):
+    original = spin._doQuantifier
+    profiler = Profiler(names={})
+
+    def search(template, **kwargs):
+        assert spin._doQuantifier is not original
+        raise RuntimeError(template)
+
+    with pytest.raises(RuntimeError):
+        profiler.search(search, TEMPLATE)
+    assert spin._doQuantifier is original
+    assert profiler.blocks is None
+    assert profiler.templates['<phrase>']['calls'] == 0
@@ -0,0 +1,97 @@
+'''
+The provenance of a build, and diffs of two builds.
+'''
+
+from heads import provenance
+
+def test_save(build, tmp_path):
+    provenance.save(build, location=str(tmp_path))
+    store = provenance.Provenance(str(tmp_path / build.version / 'provenance'))
+    assert store.version == build.version
+
+    phrase, head, rule, typ = (store.columns[name] for name in provenance.HEAD_COLUMNS)
+    assert {(phrase[i], head[i]): store.rules[rule[i]] for i in range(len(phrase))} == \
+        {pair: str(pair_rule) for pair, pair_rule in build.head_rules.items()}
+    assert all(store.types[typ[i]] == build.api.F.typ.v(phrase[i]) for i in range(len(phrase)))
+
+    phrases = list(store.phrases())
+    assert [row[0] for row in phrases] == sorted(build.phrase2heads)
+    for node, heads, phrase_rule, phrase_typ in phrases:
+        assert set(heads) == build.phrase2heads[node]
+        assert phrase_rule == str(build.head_rules[node, heads[0]])
+        assert phrase_typ == build.api.F.typ.v(node)
+    assert list(store.objects()) == [(obj, build.obj2prep[obj], str(build.obj_rules[obj]))
+                                        for obj in sorted(build.obj_rules)]
+    assert sum(store.counts()['types'].values()) == len(build.phrase2heads)
+
+    result = provenance.diff(store, store)
+    assert not any(result['phrases'].values()) and not any(result['objects'].values())
+    assert result['rules'] == result['types'] == {}
+
+TYPES = {10: 'NP', 11: 'PP', 12: 'NP', 13: 'VP', 14: 'PP'}
+
+def write(directory, version, heads, objects):
+    # heads - phrase to (heads, rule); objects - object to (prep, rule)
+    head_rules = {(phrase, head): rule for phrase, (phrase_heads, rule) in heads.items()
+                     for head in phrase_heads}
+    provenance.write(str(directory), version, head_rules,
+                     {obj: rule for obj, (prep, rule) in objects.items()},
+                     {obj: prep for obj, (prep, rule) in objects.items()}, TYPES.get)
+    return provenance.Provenance(str(directory))
+
+def stores(tmp_path, version_b='2021'):
+    a = write(tmp_path / 'a', '2021',
+              {10: ({1}, 'NP_noqant'), 11: ({2, 3}, 'PP'), 12: ({4}, 'NP_noqant'), 14: ({6}, 'PP')},
+              {20: (30, 'PP_noqant'), 21: (31, 'PP_noqant'), 23: (34, 'PP_to_PP')})
+    b = write(tmp_path / 'b', version_b,
+              {10: ({1}, 'NP_noqant'), 11: ({2}, 'PP'), 13: ({5}, 'VP'), 14: ({6}, 'PP')},
+              {20: (30, 'PP_noqant'), 21: (32, 'PP_quantified'), 22: (33, 'PP_noqant')})
+    return a, b
+
+def test_diff(tmp_path, capsys):
+    a, b = stores(tmp_path)
+    assert a.build != b.build
+    result = provenance.diff(a, b)
+    assert result['phrases'] == {
+        'added': [{'phrase': 13, 'a': None, 'b': [5], 'rule': 'VP'}],
+        'removed': [{'phrase': 12, 'a': [4], 'b': None, 'rule': 'NP_noqant'}],
+        'changed': [{'phrase': 11, 'a': [2, 3], 'b': [2], 'rule': 'PP'}],
+    }
+    assert result['objects'] == {
+        'added': [{'obj': 22, 'a': None, 'b': 33, 'rule': 'PP_noqant'}],
+        'removed': [{'obj': 23, 'a': 34, 'b': None, 'rule': 'PP_to_PP'}],
+        'changed': [{'obj': 21, 'a': 31, 'b': 32, 'rule': 'PP_quantified'}],
+    }
+    assert result['rules'] == {'NP_noqant': {'removed': 1}, 'PP': {'changed': 1},
+                               'PP_noqant': {'added': 1}, 'PP_quantified': {'changed': 1},
+                               'PP_to_PP': {'removed': 1}, 'VP': {'added': 1}}
+    assert result['types'] == {'NP': {'removed': 1}, 'PP': {'changed': 1}, 'VP': {'added': 1}}
+    assert result['a']['types'] == {'NP': 2, 'PP': 2} and result['b']['types'] == {'NP': 1, 'PP': 2, 'VP': 1}
+
+    provenance.report(result)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[:3] == [f'a: BHSA 2021, build {a.build}', f'b: BHSA 2021, build {b.build}',
+                         'changes per rule:']
+    assert '\tPP_quantified  changed=1' in lines
+    assert '\tVP  added=1' in lines
+    assert lines[-2:] == ['phrases: 1 added, 1 removed, 1 changed',
+                          'objects: 1 added, 1 removed, 1 changed']
+
+def test_diff_versions(tmp_path, capsys):
+    a, b = stores(tmp_path, version_b='c')
+    result = provenance.diff(a, b)
+    assert result['rules'] == result['types'] == {}
+    assert not any(result['phrases'].values())
+    provenance.report(result)
+    out = capsys.readouterr().out
+    assert 'only the phrase counts can be compared' in out
+    assert f"\t{2:>8} {1:>8}  NP_noqant" in out
+    assert f"\t{0:>8} {1:>8}  VP" in out
+
+def test_merge():
+    a = [(1, 'a'), (3, 'a'), (4, 'a')]
+    b = [(2, 'b'), (3, 'b'), (5, 'b')]
+    assert list(provenance.merge(a, b)) == [(1, (1, 'a'), None), (2, None, (2, 'b')),
+                                            (3, (3, 'a'), (3, 'b')), (4, (4, 'a'), None),
+                                            (5, None, (5, 'b'))]
+    assert list(provenance.merge([], b[:1])) == [(2, None, (2, 'b'))]
@@ -0,0 +1,50 @@
+'''
+The stand ins of heads/snapshot.py for F, E, and L,
+checked against the live TF API on the mini corpus.
+'''
+
+import pytest
+
+from heads import snapshot
+
+@pytest.fixture(scope='module')
+def apis(app, tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('snapshot'))
+    snapshot.write(app, directory, 'test')
+    return app.api, snapshot.Snapshot(directory).api
+
+def test_otype(apis):
+    api, snap = apis
+    F, S = api.F.otype, snap.F.otype
+    assert (S.slotType, S.maxSlot, S.maxNode) == (F.slotType, F.maxSlot, F.maxNode)
+    assert S.all == tuple(F.all)
+    for otype in F.all:
+        assert S.s(otype) == tuple(F.s(otype))
+        assert S.sInterval(otype) == tuple(F.sInterval(otype))
+    assert S.s('clause') == ()
+    for node in range(F.maxNode + 2):
+        assert S.v(node) == F.v(node)
+
+def test_node_features(apis):
+    api, snap = apis
+    for feature in snapshot.NODE_FEATURES:
+        F, S = getattr(api.F, feature), getattr(snap.F, feature)
+        for node in range(api.F.otype.maxNode + 2):
+            assert S.v(node) == F.v(node), (feature, node)
+        assert dict(S.items()) == dict(F.items())
+        for value in set(dict(F.items()).values()):
+            assert S.s(value) == tuple(F.s(value)), (feature, value)
+
+def test_edges(apis):
+    api, snap = apis
+    for node in range(api.F.otype.maxNode + 1):
+        assert snap.E.oslots.s(node) == tuple(api.E.oslots.s(node))
+        assert tuple(snap.E.mother.f(node)) == tuple(api.E.mother.f(node) or ())
+        assert tuple(snap.E.mother.t(node)) == tuple(api.E.mother.t(node) or ())
+
+def test_locality(apis):
+    api, snap = apis
+    for node in range(1, api.F.otype.maxNode + 1):
+        for otype in api.F.otype.all:
+            assert snap.L.u(node, otype) == tuple(api.L.u(node, otype)), (node, otype)
+            assert snap.L.d(node, otype) == tuple(api.L.d(node, otype)), (node, otype)
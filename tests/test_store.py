@@ -0,0 +1,47 @@
+'''
+The columnar word set store of old/wordsets/store.py.
+'''
+
+import array
+
+import pytest
+
+import store
+
+@pytest.fixture
+def wsets():
+    return {
+        'noms': {3, 9, 4, 12},
+        'preps': {1, 7},
+        'quants': set(),
+        'accent_type': {1: 'disjunct', 2: 'conjunct', 3: 'conjunct', 5: 'unknown'},
+        'mwords': {1: (1,), 2: (2, 3), 3: (2, 3), 12: (12,)},
+        'conj_pairs': {'>RY/': {'CMJM/'}, 'CMJM/': {'>RY/', 'JWM/'}},
+        'cons_pairs': {'KL/': {'<M/'}},
+    }
+
+def test_round_trip(wsets, tmp_path):
+    store.write(str(tmp_path), 'test', wsets)
+    loaded = store.WordSetStore(str(tmp_path))
+    assert loaded.version == 'test'
+    assert set(loaded) == set(wsets)
+    for name in store.SETS:
+        assert isinstance(loaded[name], store.SortedNodes)
+        assert set(loaded[name]) == wsets[name]
+        assert all(node in loaded[name] for node in wsets[name])
+        assert not any(node in loaded[name] for node in range(20) if node not in wsets[name])
+    assert dict(loaded['accent_type']) == wsets['accent_type']
+    assert dict(loaded['mwords']) == wsets['mwords']
+    for name in store.PAIRS:
+        assert {lex: set(lexs) for lex, lexs in loaded[name].items()} == wsets[name]
+    with pytest.raises(KeyError):
+        loaded['cons_pairs']['CMJM/']
+
+@pytest.mark.parametrize('typecode', ['I', 'H', 'B'])
+def test_npy(typecode, tmp_path):
+    numpy = pytest.importorskip('numpy')
+    path = str(tmp_path / 'values.npy')
+    values = array.array(typecode, [0, 1, 200, 255, 7])
+    store.write_array(path, values)
+    assert numpy.load(path).tolist() == values.tolist()
+    assert store.read_array(path).tolist() == values.tolist()
@@ -0,0 +1,72 @@
+'''
+The word flags against the checks that
+the templates made inline before.
+'''
+
+import re
+
+from heads import wordflags, phrase_heads, obj_prep
+
+# the checks as they were written in the templates,
+# for a word named {word}
+INLINE = {
+    'modword': 'subphrase rela=adj|atr|rec|mod|dem\n    {word}',
+    'postconstr': 'phrase_atom\n    word st=c\n    <: {word}',
+    'postpdpprep': 'phrase_atom\n    word pdp=prep\n    <: {word}',
+    'afterprep': 'prep\n<: {word}',
+    'afterprepart': 'prep\n<: word pdp=art\n<: {word}',
+}
+
+flag_re = re.compile(rf"^([ \t]*)= ({'|'.join(wordflags.SETS)})$")
+atom_re = re.compile(r'^[ \t]*(\w+):\w+')
+
+def parent(lines, indent):
+    # the name of the atom that a quantifier at indent
+    # is on: the last line above it outside other quantifiers
+    depth = 0
+    for line in reversed(lines):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('%') or len(line) - len(line.lstrip()) > len(indent):
+            continue
+        if stripped == '/-/':
+            depth += 1
+        elif stripped in ('/with/', '/without/', '/where/'):
+            depth = max(depth - 1, 0)
+        elif not stripped.startswith('/') and not depth:
+            return atom_re.match(line).group(1)
+
+def inline(template):
+    '''
+    Returns the template with its flags written out
+    as checks on the word that their quantifier is on.
+    '''
+    lines = template.split('\n')
+    for i, line in enumerate(lines):
+        match = flag_re.match(line)
+        if match:
+            indent, flag = match.groups()
+            check = INLINE[flag].format(word=parent(lines[:i], indent))
+            lines[i] = '\n'.join(indent + check_line for check_line in check.split('\n'))
+    return '\n'.join(lines)
+
+def templates():
+    for querydict, phrasei, headi in phrase_heads.HEAD_QUERIES:
+        yield from querydict.items()
+    for name, query in obj_prep.pp_obj_queries.items():
+        yield name, query['template']
+
+def test_inline(build):
+    assert set(INLINE) == set(wordflags.SETS)
+    flagged = 0
+    for name, template in templates():
+        if not any(map(flag_re.match, template.split('\n'))):
+            continue
+        flagged += 1
+        results = build.search(template, sets=build.sets)
+        assert build.search(inline(template), sets=build.sets) == results, name
+    assert flagged
+
+def test_parent():
+    template = obj_prep.pp_obj_queries['PP_quantified']['template']
+    # the quantifier is on w1, not on the atoms above it
+    assert re.search(r'^[ \t]*prep\n[ \t]*<: w1$', inline(template), re.M)